@@ -7,7 +7,9 @@ from frappe.utils import add_days, add_months, comma_sep, getdate, today
 
 from erpnext.setup.doctype.employee.employee import get_all_employee_emails, get_employee_email
 
-from hrms.hr.utils import get_holidays_for_employee
+from hrms.utils.holiday_list import get_holidays_by_holiday_list
+
+HOLIDAY_REMINDER_BATCH_SIZE = 100
 
 
 # -----------------
@@ -34,6 +36,9 @@ def send_reminders_in_advance_monthly():
 def send_advance_holiday_reminders(frequency):
 	"""Send Holiday Reminders in Advance to Employees
 	`frequency` (str): 'Weekly' or 'Monthly'
+
+	Employees are grouped by their holiday list, so holidays are fetched
+	and the reminder is rendered once per holiday list.
 	"""
 	if frequency == "Weekly":
 		start_date = getdate()
@@ -45,13 +50,43 @@ def send_advance_holiday_reminders(frequency):
 	else:
 		return
 
-	employees = frappe.db.get_all("Employee", filters={"status": "Active"}, pluck="name")
+	recipients_by_holiday_list = get_employee_emails_by_holiday_list()
+	holidays_by_holiday_list = get_holidays_by_holiday_list(
+		list(recipients_by_holiday_list), start_date, end_date, only_non_weekly=True
+	)
+	reminder_text = _("Hey! This email is to remind you about the upcoming holidays.")
+
+	for holiday_list, recipients in recipients_by_holiday_list.items():
+		holidays = holidays_by_holiday_list.get(holiday_list)
+		if not holidays:
+			continue
+
+		for idx in range(0, len(recipients), HOLIDAY_REMINDER_BATCH_SIZE):
+			send_holidays_reminder(
+				recipients[idx : idx + HOLIDAY_REMINDER_BATCH_SIZE], holidays, reminder_text, frequency
+			)
+
+
+def get_employee_emails_by_holiday_list() -> dict:
+	"""Returns emails of active employees grouped by their holiday list,
+	falling back to the company's default holiday list like `get_holiday_list_for_employee`"""
+	default_holiday_lists = dict(
+		frappe.get_all("Company", fields=["name", "default_holiday_list"], as_list=True)
+	)
+	employees = frappe.get_all(
+		"Employee",
+		filters={"status": "Active"},
+		fields=["holiday_list", "company", "user_id", "personal_email", "company_email"],
+	)
+
+	recipients = {}
 	for employee in employees:
-		holidays = get_holidays_for_employee(
-			employee, start_date, end_date, only_non_weekly=True, raise_exception=False
-		)
+		holiday_list = employee.holiday_list or default_holiday_lists.get(employee.company)
+		employee_email = get_employee_email(employee)
+		if holiday_list and employee_email:
+			recipients.setdefault(holiday_list, {})[employee_email] = None
 
-		send_holidays_reminder_in_advance(employee, holidays)
+	return {holiday_list: list(emails) for holiday_list, emails in recipients.items()}
 
 
 def send_holidays_reminder_in_advance(employee, holidays):
@@ -62,15 +97,20 @@ def send_holidays_reminder_in_advance(employee, holidays):
 	employee_email = get_employee_email(employee_doc)
 	frequency = frappe.db.get_single_value("HR Settings", "frequency")
 
+	reminder_text = _("Hey {}! This email is to remind you about the upcoming holidays.").format(
+		employee_doc.get("first_name")
+	)
+	send_holidays_reminder([employee_email], holidays, reminder_text, frequency)
+
+
+def send_holidays_reminder(recipients, holidays, reminder_text, frequency):
 	email_header = _("Holidays this Month.") if frequency == "Monthly" else _("Holidays this Week.")
 	frappe.sendmail(
-		recipients=[employee_email],
+		recipients=recipients,
 		subject=_("Upcoming Holidays Reminder"),
 		template="holiday_reminder",
 		args=dict(
-			reminder_text=_("Hey {}! This email is to remind you about the upcoming holidays.").format(
-				employee_doc.get("first_name")
-			),
+			reminder_text=reminder_text,
 			message=_("Below is the list of upcoming holidays for you:"),
 			advance_holiday_reminder=True,
 			holidays=holidays,
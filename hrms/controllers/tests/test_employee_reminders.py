@@ -102,6 +102,38 @@ class TestEmployeeReminders(FrappeTestCase):
 		self.assertTrue(has_holiday)
 		self.assertTrue("test holiday1" in descriptions)
 
+	def test_holiday_calendar(self):
+		from hrms.utils.holiday_list import get_holiday_calendar
+
+		holiday_list = self.test_employee.holiday_list
+		calendar = get_holiday_calendar(holiday_list)
+
+		self.assertTrue(calendar.is_holiday(self.test_holiday_dates[1]))
+		self.assertFalse(calendar.is_holiday(getdate() - timedelta(days=1)))
+
+		# weekly offs
+		self.assertTrue(calendar.is_holiday(self.test_holiday_dates[2]))
+		self.assertFalse(calendar.is_holiday(self.test_holiday_dates[2], only_non_weekly=True))
+
+		start_date, end_date = getdate() - timedelta(days=4), getdate() + timedelta(days=3)
+		self.assertEqual(calendar.count(start_date, end_date), 5)
+		self.assertEqual(calendar.count(start_date, end_date, only_non_weekly=True), 4)
+		self.assertEqual(
+			[d.description for d in calendar.get_holidays(start_date, end_date, only_non_weekly=True)],
+			["test holiday2", "test holiday1", "test holiday4", "test holiday5"],
+		)
+
+		# calendar is rebuilt after the holiday list changes
+		new_holiday = getdate() - timedelta(days=1)
+		doc = frappe.get_doc("Holiday List", holiday_list)
+		doc.append("holidays", {"holiday_date": new_holiday, "description": "test holiday7"})
+		doc.save()
+		self.assertTrue(get_holiday_calendar(holiday_list).is_holiday(new_holiday))
+
+		doc.holidays = [d for d in doc.holidays if d.description != "test holiday7"]
+		doc.save()
+		self.assertFalse(get_holiday_calendar(holiday_list).is_holiday(new_holiday))
+
 	def test_birthday_reminders(self):
 		employee = frappe.get_doc(
 			"Employee", frappe.db.sql_list("select name from tabEmployee limit 1")[0]
@@ -245,6 +277,32 @@ class TestEmployeeReminders(FrappeTestCase):
 			{"status": "Active", "holiday_list": self.holiday_list_2.name},
 		)
 
+	def test_advance_holiday_reminders_grouped_by_holiday_list(self):
+		from hrms.controllers.employee_reminders import send_reminders_in_advance_weekly
+
+		setup_hr_settings("Weekly")
+
+		# set same holiday list for emp 2
+		frappe.db.set_value(
+			"Employee", self.test_employee_2.name, "holiday_list", self.test_employee.holiday_list
+		)
+
+		send_reminders_in_advance_weekly()
+
+		# single email for employees sharing the holiday list
+		recipients = frappe.db.get_all(
+			"Email Queue Recipient",
+			filters={"recipient": ("in", [self.test_employee.user_id, self.test_employee_2.user_id])},
+			fields=["recipient", "parent"],
+		)
+		self.assertEqual(len(recipients), 2)
+		self.assertEqual(recipients[0].parent, recipients[1].parent)
+
+		# teardown: reset holiday list of emp 2
+		frappe.db.set_value(
+			"Employee", self.test_employee_2.name, "holiday_list", self.holiday_list_2.name
+		)
+
 	def test_reminder_not_sent_if_no_holdays(self):
 		setup_hr_settings("Monthly")
 
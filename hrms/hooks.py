@@ -163,6 +163,10 @@ doc_events = {
 		"on_update": "hrms.utils.holiday_list.invalidate_cache",
 		"on_trash": "hrms.utils.holiday_list.invalidate_cache",
 	},
+	"Leave Application": {
+		"on_change": "hrms.hr.doctype.leave_application.leave_application.invalidate_leave_calendar_cache",
+		"on_trash": "hrms.hr.doctype.leave_application.leave_application.invalidate_leave_calendar_cache",
+	},
 	"Timesheet": {"validate": "hrms.hr.utils.validate_active_employee"},
 	"Payment Entry": {
 		"on_submit": "hrms.hr.doctype.expense_claim.expense_claim.update_payment_for_expense_claim",
@@ -185,8 +189,16 @@ doc_events = {
 	"Loan": {"validate": "hrms.hr.utils.validate_loan_repay_from_salary"},
 	"Employee": {
 		"validate": "hrms.overrides.employee_master.validate_onboarding_process",
-		"on_update": "hrms.overrides.employee_master.update_approver_role",
-		"on_trash": "hrms.overrides.employee_master.update_employee_transfer",
+		"on_update": [
+			"hrms.overrides.employee_master.update_approver_role",
+			"hrms.hr.doctype.shift_assignment.shift_assignment.invalidate_employee_shift_index",
+			"hrms.hr.page.organizational_chart.organizational_chart.invalidate_org_chart_cache",
+			"hrms.hr.doctype.leave_application.leave_application.invalidate_leave_calendar_cache",
+		],
+		"on_trash": [
+			"hrms.overrides.employee_master.update_employee_transfer",
+			"hrms.hr.page.organizational_chart.organizational_chart.invalidate_org_chart_cache",
+		],
 	},
 	"Project": {
 		"validate": "hrms.controllers.employee_boarding_controller.update_employee_boarding_status"
@@ -203,6 +215,7 @@ scheduler_events = {
 	],
 	"hourly": [
 		"hrms.hr.doctype.daily_work_summary_group.daily_work_summary_group.trigger_emails",
+		"hrms.payroll.doctype.payroll_entry.payroll_entry.mark_stale_salary_slip_creations",
 	],
 	"hourly_long": [
 		"hrms.hr.doctype.shift_type.shift_type.process_auto_attendance_for_all_shifts",
@@ -212,6 +225,7 @@ scheduler_events = {
 		"hrms.controllers.employee_reminders.send_work_anniversary_reminders",
 		"hrms.hr.doctype.daily_work_summary_group.daily_work_summary_group.send_summary",
 		"hrms.hr.doctype.interview.interview.send_daily_feedback_reminder",
+		"hrms.payroll.report.salary_register.salary_register.delete_expired_salary_register_exports",
 	],
 	"daily_long": [
 		"hrms.hr.doctype.leave_ledger_entry.leave_ledger_entry.process_expired_allocation",
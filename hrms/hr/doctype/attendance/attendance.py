@@ -5,19 +5,26 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.model.naming import get_default_naming_series
 from frappe.utils import (
 	add_days,
 	cint,
 	cstr,
 	format_date,
-	get_datetime,
+	get_fullname,
 	get_link_to_form,
 	getdate,
+	now,
 	nowdate,
 )
 
 from hrms.hr.doctype.shift_assignment.shift_assignment import has_overlapping_timings
 from hrms.hr.utils import get_holiday_dates_for_employee, validate_active_employee
+from hrms.utils import get_names_from_series
+
+
+ATTENDANCE_BATCH_SIZE = 500
+ATTENDANCE_STATUSES = ("Present", "Absent", "On Leave", "Half Day", "Work From Home")
 
 
 class DuplicateAttendanceError(frappe.ValidationError):
@@ -32,7 +39,7 @@ class Attendance(Document):
 	def validate(self):
 		from erpnext.controllers.status_updater import validate_status
 
-		validate_status(self.status, ["Present", "Absent", "On Leave", "Half Day", "Work From Home"])
+		validate_status(self.status, list(ATTENDANCE_STATUSES))
 		validate_active_employee(self.employee)
 		self.validate_attendance_date()
 		self.validate_duplicate_record()
@@ -290,6 +297,344 @@ def mark_attendance(
 	return attendance.name
 
 
+def bulk_insert_attendance(records: list[dict], comment: str | None = None) -> list[str]:
+	"""Inserts submitted Attendance for records that are already validated by the caller, without loading documents.
+	Each record needs `employee`, `employee_name`, `company`, `department`, `attendance_date`, `status` and optionally `shift`.
+	Records falling on approved leaves are marked On Leave or Half Day like `Attendance.check_leave_record`.
+
+	:param comment: (optional) Comment to be added to every inserted Attendance.
+	:return: Names of the inserted Attendance records.
+	"""
+	if not records:
+		return []
+
+	set_leave_details(records)
+
+	naming_series = get_default_naming_series("Attendance") or "HR-ATT-.YYYY.-"
+	names = get_names_from_series(naming_series, len(records))
+	timestamp, user = now(), frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Attendance",
+		fields=[
+			"name",
+			"naming_series",
+			"employee",
+			"employee_name",
+			"company",
+			"department",
+			"attendance_date",
+			"status",
+			"leave_type",
+			"shift",
+			"late_entry",
+			"early_exit",
+			"docstatus",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				name,
+				naming_series,
+				record.employee,
+				record.employee_name,
+				record.company,
+				record.department,
+				record.attendance_date,
+				record.status,
+				record.leave_type,
+				record.shift,
+				cint(record.late_entry),
+				cint(record.early_exit),
+				1,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for name, record in zip(names, records)
+		],
+	)
+
+	if comment:
+		frappe.db.bulk_insert(
+			"Comment",
+			fields=[
+				"name",
+				"comment_type",
+				"reference_doctype",
+				"reference_name",
+				"content",
+				"comment_email",
+				"comment_by",
+				"creation",
+				"modified",
+				"owner",
+				"modified_by",
+			],
+			values=[
+				(
+					frappe.generate_hash(length=10),
+					"Comment",
+					"Attendance",
+					name,
+					comment,
+					user,
+					get_fullname(user),
+					timestamp,
+					timestamp,
+					user,
+					user,
+				)
+				for name in names
+			],
+		)
+
+	return names
+
+
+def set_leave_details(records: list[dict]) -> None:
+	"""Sets leave type and status of attendance records falling on approved leave applications"""
+	LeaveApplication = frappe.qb.DocType("Leave Application")
+	leaves = (
+		frappe.qb.from_(LeaveApplication)
+		.select(
+			LeaveApplication.employee,
+			LeaveApplication.leave_type,
+			LeaveApplication.from_date,
+			LeaveApplication.to_date,
+			LeaveApplication.half_day_date,
+		)
+		.where(
+			(LeaveApplication.employee.isin(list({record.employee for record in records})))
+			& (LeaveApplication.status == "Approved")
+			& (LeaveApplication.docstatus == 1)
+			& (LeaveApplication.from_date <= max(getdate(record.attendance_date) for record in records))
+			& (LeaveApplication.to_date >= min(getdate(record.attendance_date) for record in records))
+		)
+	).run(as_dict=True)
+
+	leaves_by_employee = {}
+	for leave in leaves:
+		leaves_by_employee.setdefault(leave.employee, []).append(leave)
+
+	for record in records:
+		attendance_date = getdate(record.attendance_date)
+		for leave in leaves_by_employee.get(record.employee, []):
+			if leave.from_date <= attendance_date <= leave.to_date:
+				record.leave_type = leave.leave_type
+				record.status = "Half Day" if leave.half_day_date == attendance_date else "On Leave"
+
+		if record.status not in ("On Leave", "Half Day"):
+			record.leave_type = None
+
+
+def mark_attendance_in_bulk(records: list[dict], comment: str | None = None) -> frappe._dict:
+	"""Validates and inserts submitted Attendance for many records using set-based queries per batch.
+	Each record needs `employee`, `attendance_date` and `status` and optionally `shift`, `leave_type`, `late_entry` and `early_exit`.
+	Records failing validation are skipped instead of failing the whole batch.
+
+	:param comment: (optional) Comment to be added to every inserted Attendance.
+	:return: `marked` with names of the inserted Attendance and `failed` with the skipped records and their `error`.
+	"""
+	result = frappe._dict(marked=[], failed=[])
+
+	for start in range(0, len(records), ATTENDANCE_BATCH_SIZE):
+		batch = [frappe._dict(record) for record in records[start : start + ATTENDANCE_BATCH_SIZE]]
+		valid_records, failed_records = validate_attendance_records(batch)
+
+		result.marked.extend(bulk_insert_attendance(valid_records, comment))
+		result.failed.extend(failed_records)
+
+	return result
+
+
+def validate_attendance_records(records: list[dict]) -> tuple[list[dict], list[dict]]:
+	"""Runs the validations of `Attendance.validate` for a batch of records with one query per check.
+	Failed records get the validation message in `error`"""
+	for record in records:
+		record.attendance_date = getdate(record.attendance_date)
+
+	employees = get_employee_details_for_attendance(list({record.employee for record in records}))
+	existing_attendance = get_existing_attendance(
+		list(employees),
+		min(record.attendance_date for record in records),
+		max(record.attendance_date for record in records),
+	)
+
+	overlapping_shifts = {}
+
+	def is_overlapping(shift_1: str, shift_2: str) -> bool:
+		if (shift_1, shift_2) not in overlapping_shifts:
+			overlapping_shifts[(shift_1, shift_2)] = has_overlapping_timings(shift_1, shift_2)
+		return overlapping_shifts[(shift_1, shift_2)]
+
+	today = getdate()
+	valid_records, failed_records = [], []
+	for record in records:
+		employee = employees.get(record.employee)
+		same_date_attendance = existing_attendance.setdefault(
+			(record.employee, record.attendance_date), []
+		)
+		record.error = get_attendance_record_error(
+			record, employee, same_date_attendance, today, is_overlapping
+		)
+		if record.error:
+			failed_records.append(record)
+			continue
+
+		record.update(
+			{
+				"employee_name": employee.employee_name,
+				"company": employee.company,
+				"department": employee.department,
+				"leave_type": record.leave_type if record.status in ("On Leave", "Half Day") else None,
+			}
+		)
+		# later records in the batch are validated against this one
+		same_date_attendance.append(frappe._dict(name=None, shift=record.shift))
+		valid_records.append(record)
+
+	return valid_records, failed_records
+
+
+def get_attendance_record_error(
+	record: dict, employee: dict | None, same_date_attendance: list[dict], today, is_overlapping
+) -> str | None:
+	attendance_date = frappe.bold(format_date(record.attendance_date))
+
+	if record.status not in ATTENDANCE_STATUSES:
+		return _("Status must be one of {0}").format(", ".join(ATTENDANCE_STATUSES))
+
+	if not employee:
+		return _("Employee {0} not found").format(frappe.bold(record.employee))
+
+	if employee.status == "Inactive":
+		return _("Cannot mark attendance for an Inactive employee {0}").format(record.employee)
+
+	if record.status != "On Leave" and record.attendance_date > today:
+		return _("Attendance can not be marked for future dates: {0}").format(attendance_date)
+
+	if employee.date_of_joining and record.attendance_date < employee.date_of_joining:
+		return _("Attendance date {0} can not be less than employee {1}'s joining date: {2}").format(
+			attendance_date,
+			frappe.bold(record.employee),
+			frappe.bold(format_date(employee.date_of_joining)),
+		)
+
+	for attendance in same_date_attendance:
+		if not record.shift or not attendance.shift or attendance.shift == record.shift:
+			return _("Attendance for employee {0} is already marked for the date {1}: {2}").format(
+				frappe.bold(record.employee),
+				attendance_date,
+				get_attendance_reference(attendance),
+			)
+
+	for attendance in same_date_attendance:
+		if is_overlapping(record.shift, attendance.shift):
+			return _(
+				"Attendance for employee {0} is already marked for an overlapping shift {1}: {2}"
+			).format(
+				frappe.bold(record.employee),
+				frappe.bold(attendance.shift),
+				get_attendance_reference(attendance),
+			)
+
+
+def get_attendance_reference(attendance: dict) -> str:
+	if attendance.name:
+		return get_link_to_form("Attendance", attendance.name)
+	# marked by an earlier record of the same batch
+	return _("another record in this batch")
+
+
+def get_employee_details_for_attendance(employees: list[str]) -> dict:
+	return {
+		employee.name: employee
+		for employee in frappe.get_all(
+			"Employee",
+			filters={"name": ("in", employees)},
+			fields=["name", "employee_name", "company", "department", "status", "date_of_joining"],
+		)
+	}
+
+
+def get_existing_attendance(employees: list[str], from_date, to_date) -> dict:
+	"""Returns non-cancelled attendance by (employee, attendance_date)"""
+	if not employees:
+		return {}
+
+	Attendance = frappe.qb.DocType("Attendance")
+	records = (
+		frappe.qb.from_(Attendance)
+		.select(Attendance.name, Attendance.employee, Attendance.attendance_date, Attendance.shift)
+		.where(
+			(Attendance.employee.isin(employees))
+			& (Attendance.docstatus < 2)
+			& (Attendance.attendance_date.between(from_date, to_date))
+		)
+	).run(as_dict=True)
+
+	existing_attendance = {}
+	for record in records:
+		existing_attendance.setdefault((record.employee, record.attendance_date), []).append(record)
+
+	return existing_attendance
+
+
+def get_permitted_attendance_records(records: list[dict]) -> tuple[list[dict], list[dict]]:
+	"""Splits records into those the user can create and submit Attendance for and those they cannot,
+	applying user permissions to the Attendance of each employee. Rejected records get the reason in `error`"""
+	frappe.has_permission("Attendance", "create", throw=True)
+	frappe.has_permission("Attendance", "submit", throw=True)
+
+	records = [frappe._dict(record) for record in records]
+	employees = get_employee_details_for_attendance(list({record.employee for record in records}))
+
+	permitted_employees = set()
+	for employee in employees.values():
+		attendance = frappe.get_doc(
+			{
+				"doctype": "Attendance",
+				"employee": employee.name,
+				"company": employee.company,
+				"department": employee.department,
+			}
+		)
+		if frappe.has_permission("Attendance", "create", doc=attendance) and frappe.has_permission(
+			"Attendance", "submit", doc=attendance
+		):
+			permitted_employees.add(employee.name)
+
+	permitted_records, failed_records = [], []
+	for record in records:
+		# unknown employees are reported by the attendance validations
+		if record.employee in permitted_employees or record.employee not in employees:
+			permitted_records.append(record)
+		else:
+			record.error = _("Not permitted to mark attendance for employee {0}").format(
+				frappe.bold(record.employee)
+			)
+			failed_records.append(record)
+
+	return permitted_records, failed_records
+
+
+def show_failed_attendance(failed_records: list[dict]) -> None:
+	if not failed_records:
+		return
+
+	frappe.msgprint(
+		[record.error for record in failed_records],
+		title=_("Attendance not marked for {0} records").format(len(failed_records)),
+		indicator="orange",
+		as_list=True,
+	)
+
+
 @frappe.whitelist()
 def mark_bulk_attendance(data):
 	import json
@@ -301,15 +646,17 @@ def mark_bulk_attendance(data):
 		frappe.throw(_("Please select a date."))
 		return
 
-	for date in data.unmarked_days:
-		doc_dict = {
-			"doctype": "Attendance",
-			"employee": data.employee,
-			"attendance_date": get_datetime(date),
-			"status": data.status,
-		}
-		attendance = frappe.get_doc(doc_dict).insert()
-		attendance.submit()
+	records, failed_records = get_permitted_attendance_records(
+		[
+			{"employee": data.employee, "attendance_date": date, "status": data.status}
+			for date in data.unmarked_days
+		]
+	)
+	result = mark_attendance_in_bulk(records)
+	result.failed.extend(failed_records)
+	show_failed_attendance(result.failed)
+
+	return result
 
 
 @frappe.whitelist()
@@ -109,7 +109,7 @@ frappe.listview_settings["Attendance"] = {
 										data: data,
 									},
 									callback: function (r) {
-										if (r.message === 1) {
+										if (r.message?.marked.length) {
 											frappe.show_alert({
 												message: __("Attendance Marked"),
 												indicator: "blue",
@@ -7,9 +7,10 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import add_days, date_diff, format_date, get_link_to_form, getdate
 
-from erpnext.setup.doctype.employee.employee import is_holiday
+from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employee
 
 from hrms.hr.utils import validate_active_employee, validate_dates
+from hrms.utils.holiday_list import is_holiday
 
 
 class OverlappingAttendanceRequestError(frappe.ValidationError):
@@ -118,7 +119,7 @@ class AttendanceRequest(Document):
 
 	def should_mark_attendance(self, attendance_date: str) -> bool:
 		# Check if attendance_date is a holiday
-		if is_holiday(self.employee, attendance_date):
+		if is_holiday(get_holiday_list_for_employee(self.employee), attendance_date):
 			frappe.msgprint(
 				_("Attendance not submitted for {0} as it is a Holiday.").format(
 					frappe.bold(format_date(attendance_date))
@@ -174,7 +175,7 @@ class AttendanceRequest(Document):
 		for day in range(request_days):
 			attendance_date = add_days(self.from_date, day)
 
-			if is_holiday(self.employee, attendance_date):
+			if is_holiday(get_holiday_list_for_employee(self.employee), attendance_date):
 				attendance_warnings.append({"date": attendance_date, "reason": "Holiday", "action": "Skip"})
 			elif self.has_leave_record(attendance_date):
 				attendance_warnings.append({"date": attendance_date, "reason": "On Leave", "action": "Skip"})
@@ -7,9 +7,8 @@ import frappe.utils
 from frappe import _
 from frappe.model.document import Document
 
-from erpnext.setup.doctype.holiday_list.holiday_list import is_holiday
-
 from hrms.hr.doctype.daily_work_summary.daily_work_summary import get_user_emails_from_group
+from hrms.utils.holiday_list import is_holiday
 
 
 class DailyWorkSummaryGroup(Document):
@@ -215,7 +215,9 @@ frappe.ui.form.on("Employee Attendance Tool", {
 			freeze_message: __("Marking Attendance")
 		}).then((r) => {
 			if (!r.exc) {
-				frappe.show_alert({ message: __("Attendance marked successfully"), indicator: "green" });
+				if (r.message?.marked.length) {
+					frappe.show_alert({ message: __("Attendance marked successfully"), indicator: "green" });
+				}
 				frm.refresh();
 			}
 		});
@@ -9,6 +9,12 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import getdate
 
+from hrms.hr.doctype.attendance.attendance import (
+	get_permitted_attendance_records,
+	mark_attendance_in_bulk,
+	show_failed_attendance,
+)
+
 
 class EmployeeAttendanceTool(Document):
 	pass
@@ -43,14 +49,8 @@ def get_employees(
 
 
 def _get_unmarked_attendance(employee_list: list[dict], attendance_list: list[dict]) -> list[dict]:
-	marked_employees = [entry.employee for entry in attendance_list]
-	unmarked_attendance = []
-
-	for entry in employee_list:
-		if entry.employee not in marked_employees:
-			unmarked_attendance.append(entry)
-
-	return unmarked_attendance
+	marked_employees = {entry.employee for entry in attendance_list}
+	return [entry for entry in employee_list if entry.employee not in marked_employees]
 
 
 @frappe.whitelist()
@@ -63,26 +63,29 @@ def mark_employee_attendance(
 	late_entry: int = None,
 	early_exit: int = None,
 	shift: str = None,
-) -> None:
+) -> dict:
 	if isinstance(employee_list, str):
 		employee_list = json.loads(employee_list)
 
-	for employee in employee_list:
+	if status != "On Leave":
 		leave_type = None
-		if status == "On Leave" and leave_type:
-			leave_type = leave_type
-
-		attendance = frappe.get_doc(
-			dict(
-				doctype="Attendance",
-				employee=employee,
-				attendance_date=getdate(date),
-				status=status,
-				leave_type=leave_type,
-				late_entry=late_entry,
-				early_exit=early_exit,
-				shift=shift,
-			)
-		)
-		attendance.insert()
-		attendance.submit()
+
+	records, failed_records = get_permitted_attendance_records(
+		[
+			{
+				"employee": employee,
+				"attendance_date": getdate(date),
+				"status": status,
+				"leave_type": leave_type,
+				"late_entry": late_entry,
+				"early_exit": early_exit,
+				"shift": shift,
+			}
+			for employee in employee_list
+		]
+	)
+	result = mark_attendance_in_bulk(records)
+	result.failed.extend(failed_records)
+	show_failed_attendance(result.failed)
+
+	return result
@@ -66,3 +66,27 @@ class TestEmployeeAttendanceTool(FrappeTestCase):
 		self.assertEqual(attendance.status, "Present")
 		self.assertEqual(attendance.shift, shift.name)
 		self.assertEqual(attendance.late_entry, 1)
+
+	def test_mark_employee_attendance_skips_invalid_records(self):
+		date = getdate("28-02-2023")
+		mark_attendance(self.employee1, date, "Present")
+		frappe.db.set_value("Employee", self.employee3, "date_of_joining", getdate("01-03-2023"))
+
+		result = mark_employee_attendance(
+			[self.employee1, self.employee2, self.employee3, self.employee2], "Absent", date
+		)
+
+		# only the first record of employee 2 is marked
+		self.assertEqual(len(result.marked), 1)
+		self.assertEqual(
+			frappe.db.get_value("Attendance", result.marked[0], ["employee", "status"]),
+			(self.employee2, "Absent"),
+		)
+
+		# duplicate, joining date and repeated records are reported
+		self.assertEqual(
+			[record.employee for record in result.failed],
+			[self.employee1, self.employee3, self.employee2],
+		)
+		self.assertEqual(frappe.db.count("Attendance", {"employee": self.employee1}), 1)
+		self.assertFalse(frappe.db.exists("Attendance", {"employee": self.employee3}))
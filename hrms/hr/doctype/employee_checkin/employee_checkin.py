@@ -2,15 +2,21 @@
 # For license information, please see license.txt
 
 
+import json
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import cint, get_datetime
+from frappe.utils import cint, get_datetime, now
 
 from hrms.hr.doctype.shift_assignment.shift_assignment import (
 	get_actual_start_end_datetime_of_shift,
+	prime_employee_shift_index,
 )
 from hrms.hr.utils import validate_active_employee
+from hrms.utils import get_names_from_series
+
+CHECKIN_NAMING_SERIES = "EMP-CKIN-.MM.-.YYYY.-.######"
 
 
 class EmployeeCheckin(Document):
@@ -19,6 +25,13 @@ class EmployeeCheckin(Document):
 		self.validate_duplicate_log()
 		self.fetch_shift()
 
+	def after_insert(self):
+		from hrms.hr.doctype.shift_type.shift_type import rewind_auto_attendance_checkpoints
+
+		# checkins synced late for already processed shifts
+		if self.shift and self.shift_start:
+			rewind_auto_attendance_checkpoints(self.shift, shift_start=self.shift_start)
+
 	def validate_duplicate_log(self):
 		doc = frappe.db.exists(
 			"Employee Checkin",
@@ -40,27 +53,39 @@ class EmployeeCheckin(Document):
 			self.employee, get_datetime(self.time), True
 		)
 		if shift_actual_timings:
-			if (
-				shift_actual_timings.shift_type.determine_check_in_and_check_out
-				== "Strictly based on Log Type in Employee Checkin"
-				and not self.log_type
-				and not self.skip_auto_attendance
-			):
-				frappe.throw(
-					_("Log Type is required for check-ins falling in the shift: {0}.").format(
-						shift_actual_timings.shift_type.name
-					)
-				)
+			validate_log_type_for_shift(shift_actual_timings, self.log_type, self.skip_auto_attendance)
 			if not self.attendance:
-				self.shift = shift_actual_timings.shift_type.name
-				self.shift_actual_start = shift_actual_timings.actual_start
-				self.shift_actual_end = shift_actual_timings.actual_end
-				self.shift_start = shift_actual_timings.start_datetime
-				self.shift_end = shift_actual_timings.end_datetime
+				self.update(get_shift_fields(shift_actual_timings))
 		else:
 			self.shift = None
 
 
+def validate_log_type_for_shift(
+	shift_actual_timings: dict, log_type: str | None, skip_auto_attendance
+) -> None:
+	if (
+		shift_actual_timings.shift_type.determine_check_in_and_check_out
+		== "Strictly based on Log Type in Employee Checkin"
+		and not log_type
+		and not skip_auto_attendance
+	):
+		frappe.throw(
+			_("Log Type is required for check-ins falling in the shift: {0}.").format(
+				shift_actual_timings.shift_type.name
+			)
+		)
+
+
+def get_shift_fields(shift_actual_timings: dict) -> dict:
+	return {
+		"shift": shift_actual_timings.shift_type.name,
+		"shift_actual_start": shift_actual_timings.actual_start,
+		"shift_actual_end": shift_actual_timings.actual_end,
+		"shift_start": shift_actual_timings.start_datetime,
+		"shift_end": shift_actual_timings.end_datetime,
+	}
+
+
 @frappe.whitelist()
 def add_log_based_on_employee_field(
 	employee_field_value,
@@ -111,6 +136,213 @@ def add_log_based_on_employee_field(
 	return doc
 
 
+@frappe.whitelist()
+def add_logs_based_on_employee_field(logs, employee_fieldname="attendance_device_id"):
+	"""Creates Employee Checkins for a batch of punches, e.g. when a biometric device flushes its logs.
+	Employees, existing logs and shift assignments are fetched for the whole batch at once and the
+	checkins are bulk inserted. Invalid or duplicate punches are reported without failing the batch.
+
+	:param logs: List (or JSON string) of dicts with the keys `employee_field_value`, `timestamp` and optionally
+	        `device_id`, `log_type` and `skip_auto_attendance`, same as `add_log_based_on_employee_field`.
+	:param employee_fieldname: (Default: attendance_device_id)Name of the field in Employee DocType based on which employee lookup will happen.
+	:return: List of dicts with `idx` (position in `logs`), `status` (Created, Duplicate or Failed) and `name` or `error`.
+	"""
+	frappe.has_permission("Employee Checkin", "create", throw=True)
+
+	if isinstance(logs, str):
+		logs = json.loads(logs)
+
+	results = [frappe._dict(idx=idx) for idx in range(len(logs))]
+	logs = [frappe._dict(log) for log in logs]
+	for log, result in zip(logs, results):
+		if not log.employee_field_value or not log.timestamp:
+			set_log_error(result, _("'employee_field_value' and 'timestamp' are required."))
+			continue
+
+		try:
+			log.time = get_datetime(log.timestamp)
+		except Exception:
+			set_log_error(result, _("Invalid timestamp: {0}").format(log.timestamp))
+			continue
+
+		log.log_type = log.log_type or None
+		log.skip_auto_attendance = cint(log.skip_auto_attendance)
+
+	employee_field_values = {
+		log.employee_field_value for log, result in zip(logs, results) if not result.status
+	}
+	employees = get_employees_by_field_value(employee_fieldname, employee_field_values)
+	for log, result in zip(logs, results):
+		if result.status:
+			continue
+
+		employee = employees.get(str(log.employee_field_value))
+		if not employee:
+			set_log_error(
+				result,
+				_("No Employee found for the given employee field value. '{}': {}").format(
+					employee_fieldname, log.employee_field_value
+				),
+			)
+		elif employee.status == "Inactive":
+			set_log_error(
+				result,
+				_("Transactions cannot be created for an Inactive Employee {0}.").format(employee.name),
+			)
+		else:
+			log.employee = employee.name
+			log.employee_name = employee.employee_name
+
+	valid_logs = [(log, result) for log, result in zip(logs, results) if not result.status]
+	existing_logs = get_existing_logs([log for log, result in valid_logs])
+	prime_employee_shift_index([log.employee for log, result in valid_logs])
+
+	checkins, duplicates = [], []
+	for log, result in valid_logs:
+		key = (log.employee, log.time, log.log_type)
+		if key in existing_logs:
+			duplicates.append((result, existing_logs[key]))
+			continue
+
+		try:
+			checkins.append((log, result, get_shift_fields_for_log(log)))
+		except frappe.ValidationError as e:
+			frappe.clear_messages()
+			set_log_error(result, str(e))
+			continue
+
+		# punches repeated within the batch are duplicates of the first one
+		existing_logs[key] = result
+
+	insert_checkins(checkins)
+
+	for result, existing_log in duplicates:
+		result.update(
+			status="Duplicate",
+			name=existing_log.name if isinstance(existing_log, dict) else existing_log,
+		)
+
+	return results
+
+
+def set_log_error(result: dict, error: str) -> None:
+	result.update(status="Failed", error=error)
+
+
+def get_employees_by_field_value(employee_fieldname: str, values: set) -> dict:
+	if not values:
+		return {}
+
+	employees = frappe.get_all(
+		"Employee",
+		filters={employee_fieldname: ("in", list(values))},
+		fields=["name", "employee_name", "status", employee_fieldname],
+		order_by="creation asc",
+	)
+
+	employee_map = {}
+	for employee in employees:
+		employee_map.setdefault(str(employee[employee_fieldname]), employee)
+
+	return employee_map
+
+
+def get_existing_logs(logs: list[dict]) -> dict:
+	"""Returns existing checkin names keyed by (employee, time, log_type) for the given logs"""
+	if not logs:
+		return {}
+
+	Checkin = frappe.qb.DocType("Employee Checkin")
+	existing = (
+		frappe.qb.from_(Checkin)
+		.select(Checkin.name, Checkin.employee, Checkin.time, Checkin.log_type)
+		.where(
+			(Checkin.employee.isin(list({log.employee for log in logs})))
+			& (Checkin.time.isin(list({log.time for log in logs})))
+		)
+	).run(as_dict=True)
+
+	return {(d.employee, get_datetime(d.time), d.log_type or None): d.name for d in existing}
+
+
+def get_shift_fields_for_log(log: dict) -> dict:
+	shift_actual_timings = get_actual_start_end_datetime_of_shift(log.employee, log.time, True)
+	if not shift_actual_timings:
+		return {"shift": None}
+
+	validate_log_type_for_shift(shift_actual_timings, log.log_type, log.skip_auto_attendance)
+	return get_shift_fields(shift_actual_timings)
+
+
+def insert_checkins(checkins: list[tuple]) -> None:
+	if not checkins:
+		return
+
+	fields = [
+		"name",
+		"employee",
+		"employee_name",
+		"time",
+		"device_id",
+		"log_type",
+		"skip_auto_attendance",
+		"shift",
+		"shift_start",
+		"shift_end",
+		"shift_actual_start",
+		"shift_actual_end",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+	]
+	names = get_names_from_series(CHECKIN_NAMING_SERIES, len(checkins))
+	timestamp, user = now(), frappe.session.user
+
+	values = []
+	for name, (log, result, shift_fields) in zip(names, checkins):
+		values.append(
+			(
+				name,
+				log.employee,
+				log.employee_name,
+				log.time,
+				log.device_id,
+				log.log_type,
+				log.skip_auto_attendance,
+				shift_fields.get("shift"),
+				shift_fields.get("shift_start"),
+				shift_fields.get("shift_end"),
+				shift_fields.get("shift_actual_start"),
+				shift_fields.get("shift_actual_end"),
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+		)
+		result.update(status="Created", name=name)
+
+	frappe.db.bulk_insert("Employee Checkin", fields=fields, values=values)
+	rewind_auto_attendance_checkpoints_for_checkins(
+		[shift_fields for log, result, shift_fields in checkins]
+	)
+
+
+def rewind_auto_attendance_checkpoints_for_checkins(shifts: list[dict]) -> None:
+	from hrms.hr.doctype.shift_type.shift_type import rewind_auto_attendance_checkpoints
+
+	earliest_shift_start = {}
+	for shift in shifts:
+		if shift.get("shift") and shift.get("shift_start"):
+			earliest_shift_start[shift["shift"]] = min(
+				shift["shift_start"], earliest_shift_start.get(shift["shift"], shift["shift_start"])
+			)
+
+	for shift_type, shift_start in earliest_shift_start.items():
+		rewind_auto_attendance_checkpoints(shift_type, shift_start=shift_start)
+
+
 def mark_attendance_and_link_log(
 	logs,
 	attendance_status,
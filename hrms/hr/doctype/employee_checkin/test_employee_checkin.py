@@ -20,10 +20,12 @@ from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_lis
 
 from hrms.hr.doctype.employee_checkin.employee_checkin import (
 	add_log_based_on_employee_field,
+	add_logs_based_on_employee_field,
 	calculate_working_hours,
 	mark_attendance_and_link_log,
 )
 from hrms.hr.doctype.leave_application.test_leave_application import get_first_sunday
+from hrms.hr.doctype.shift_assignment.shift_assignment import clear_employee_shift_index
 from hrms.hr.doctype.shift_type.test_shift_type import make_shift_assignment, setup_shift_type
 from hrms.payroll.doctype.salary_slip.test_salary_slip import make_holiday_list
 
@@ -33,6 +35,7 @@ class TestEmployeeCheckin(FrappeTestCase):
 		frappe.db.delete("Shift Type")
 		frappe.db.delete("Shift Assignment")
 		frappe.db.delete("Employee Checkin")
+		clear_employee_shift_index()
 
 		from_date = get_year_start(getdate())
 		to_date = get_year_ending(getdate())
@@ -51,6 +54,39 @@ class TestEmployeeCheckin(FrappeTestCase):
 		self.assertEqual(employee_checkin.device_id, "mumbai_first_floor")
 		self.assertEqual(employee_checkin.log_type, "IN")
 
+	def test_add_logs_based_on_employee_field(self):
+		employee = make_employee("test_add_logs_based_on_employee_field@example.com")
+		employee = frappe.get_doc("Employee", employee)
+		employee.attendance_device_id = "3345"
+		employee.save()
+
+		shift_type = setup_shift_type()
+		date = getdate()
+		make_shift_assignment(shift_type.name, employee.name, date)
+		existing_log = make_checkin(employee.name, datetime.combine(date, get_time("08:00:00")))
+
+		results = add_logs_based_on_employee_field(
+			[
+				{"employee_field_value": "3345", "timestamp": f"{date} 08:00:00", "log_type": "IN"},
+				{"employee_field_value": "3345", "timestamp": f"{date} 12:30:00", "log_type": "OUT"},
+				{"employee_field_value": "3345", "timestamp": f"{date} 12:30:00", "log_type": "OUT"},
+				{"employee_field_value": "invalid", "timestamp": f"{date} 12:30:00"},
+				{"employee_field_value": "3345"},
+			]
+		)
+
+		self.assertEqual(
+			[d.status for d in results], ["Duplicate", "Created", "Duplicate", "Failed", "Failed"]
+		)
+		self.assertEqual(results[0].name, existing_log.name)
+		self.assertEqual(results[2].name, results[1].name)
+
+		log = frappe.get_doc("Employee Checkin", results[1].name)
+		self.assertEqual(log.employee, employee.name)
+		self.assertEqual(log.log_type, "OUT")
+		self.assertEqual(log.shift, shift_type.name)
+		self.assertEqual(log.shift_end, datetime.combine(date, get_time("12:00:00")))
+
 	def test_mark_attendance_and_link_log(self):
 		employee = make_employee("test_mark_attendance_and_link_log@example.com")
 		logs = make_n_checkins(employee, 3)
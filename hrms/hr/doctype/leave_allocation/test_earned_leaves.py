@@ -340,6 +340,40 @@ class TestLeaveAllocation(FrappeTestCase):
 		# balance is still 2
 		self.assertEqual(leaves_allocated, 2)
 
+	def test_earned_leave_dry_run(self):
+		"""Tests dry run reports the accruals without allocating leaves"""
+		prev_month_last_day = get_last_day(add_months(getdate(), -1))
+		last_day = get_last_day(getdate())
+
+		frappe.flags.current_date = prev_month_last_day
+		leave_policy_assignments = make_policy_assignment(
+			self.employee, allocate_on_day="Last Day", start_date=prev_month_last_day
+		)
+		allocation = frappe.db.get_value(
+			"Leave Allocation", {"leave_policy_assignment": leave_policy_assignments[0]}, "name"
+		)
+
+		frappe.flags.current_date = last_day
+		accruals = allocate_earned_leaves(dry_run=True)
+		self.assertEqual([d.leave_allocation for d in accruals], [allocation])
+		self.assertEqual(accruals[0].leaves, 1)
+		self.assertEqual(accruals[0].total_leaves_allocated, 2)
+		self.assertEqual(get_allocated_leaves(leave_policy_assignments[0]), 1)
+
+		allocate_earned_leaves()
+		self.assertEqual(get_allocated_leaves(leave_policy_assignments[0]), 2)
+		self.assertEqual(
+			frappe.db.count(
+				"Comment",
+				{
+					"comment_type": "Info",
+					"reference_doctype": "Leave Allocation",
+					"reference_name": allocation,
+				},
+			),
+			1,
+		)
+
 	def test_allocate_on_date_of_joining(self):
 		"""Tests assignment with 'Allocate On=Date of Joining'"""
 		start_date = get_first_day(add_months(getdate(), -1))
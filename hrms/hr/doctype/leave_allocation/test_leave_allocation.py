@@ -324,6 +324,32 @@ class TestLeaveAllocation(FrappeTestCase):
 
 		self.assertEqual(leave_allocation_1.unused_leaves, leave_allocation.new_leaves_allocated)
 
+	def test_incremental_leave_expiry(self):
+		leave_allocation = create_leave_allocation(
+			employee=self.employee.name,
+			employee_name=self.employee.employee_name,
+			from_date=add_months(nowdate(), -12),
+			to_date=add_days(nowdate(), -1),
+			new_leaves_allocated=10,
+		)
+		leave_allocation.submit()
+
+		process_expired_allocation()
+		self.assertTrue(frappe.db.get_single_value("HR Settings", "leave_expiry_processed_on"))
+		self.assertEqual(frappe.db.get_value("Leave Allocation", leave_allocation.name, "expired"), 1)
+
+		expiry_filters = {"transaction_name": leave_allocation.name, "is_expired": 1}
+		expiry_entry = frappe.db.get_value(
+			"Leave Ledger Entry", expiry_filters, ["leaves", "to_date", "company"], as_dict=True
+		)
+		self.assertEqual(expiry_entry.leaves, -10)
+		self.assertEqual(expiry_entry.to_date, getdate(leave_allocation.to_date))
+		self.assertEqual(expiry_entry.company, self.employee.company)
+
+		# allocation is not expired again in the next run
+		process_expired_allocation()
+		self.assertEqual(frappe.db.count("Leave Ledger Entry", expiry_filters), 1)
+
 	def test_creation_of_leave_ledger_entry_on_submit(self):
 		leave_allocation = create_leave_allocation(
 			employee=self.employee.name, employee_name=self.employee.employee_name
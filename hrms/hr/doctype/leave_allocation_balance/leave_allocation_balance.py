@@ -0,0 +1,354 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max, Min
+from frappe.utils import cint, flt, getdate, now, nowdate
+
+from hrms.hr.doctype.leave_ledger_entry.leave_balance import LeaveBalances, get_remaining_leaves
+
+REBUILD_BATCH_SIZE = 500
+BALANCE_FIELDS = (
+	"from_date",
+	"to_date",
+	"last_allocation_date",
+	"carry_forward_expiry",
+	"new_leaves_allocated",
+	"unused_leaves",
+	"total_leaves_allocated",
+	"leaves_taken",
+	"new_leaves_taken",
+	"cf_leaves_taken",
+)
+DATE_FIELDS = ("from_date", "to_date", "last_allocation_date", "carry_forward_expiry")
+
+
+class LeaveAllocationBalance(Document):
+	"""
+	Balance of a leave allocation computed from its submitted Leave Ledger Entries, considering all leaves
+	taken in the allocation period.
+
+	Balances of an employee and leave type are rebuilt whenever ledger entries are submitted, cancelled
+	or deleted, so that balance lookups read a single record instead of the ledger. Leave days are counted
+	with the holidays at the time of the rebuild, use `check_leave_allocation_balances` and
+	`rebuild_leave_allocation_balances` after changing holiday lists retroactively.
+	"""
+
+	pass
+
+
+def update_leave_allocation_balances(
+	employee: str, leave_type: str, from_date=None, to_date=None
+) -> None:
+	"""Rebuilds balances of the employee's allocations of the leave type overlapping the period"""
+	filters = {"employee": employee, "leave_type": leave_type}
+	if from_date and to_date:
+		filters.update({"from_date": ("<=", to_date), "to_date": (">=", from_date)})
+
+	frappe.db.delete("Leave Allocation Balance", filters)
+	allocations = get_ledger_allocations(employee, leave_type, from_date, to_date)
+	insert_leave_allocation_balances(build_leave_allocation_balances(allocations))
+
+
+def update_leave_allocation_balances_for_allocations(allocations: list[str]) -> None:
+	"""Rebuilds balances of the allocations, e.g. after ledger entries were inserted in bulk"""
+	if not allocations:
+		return
+
+	frappe.db.delete("Leave Allocation Balance", {"leave_allocation": ("in", allocations)})
+	ledger_allocations = get_ledger_allocations(allocations=allocations)
+	for idx in range(0, len(ledger_allocations), REBUILD_BATCH_SIZE):
+		insert_leave_allocation_balances(
+			build_leave_allocation_balances(ledger_allocations[idx : idx + REBUILD_BATCH_SIZE])
+		)
+
+
+def get_ledger_allocations(
+	employee: str | None = None,
+	leave_type: str | None = None,
+	from_date=None,
+	to_date=None,
+	allocations: list[str] | None = None,
+) -> list[dict]:
+	"""Returns allocations with submitted ledger entries along with the period of the entries"""
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	query = (
+		frappe.qb.from_(Ledger)
+		.select(
+			Ledger.transaction_name.as_("name"),
+			Ledger.employee,
+			Ledger.leave_type,
+			Min(Ledger.from_date).as_("from_date"),
+			Max(Ledger.to_date).as_("to_date"),
+		)
+		.where(
+			(Ledger.docstatus == 1)
+			& (Ledger.transaction_type == "Leave Allocation")
+			& (Ledger.is_expired == 0)
+			& (Ledger.is_lwp == 0)
+		)
+		.groupby(Ledger.transaction_name, Ledger.employee, Ledger.leave_type)
+		.orderby(Ledger.employee)
+	)
+
+	if employee:
+		query = query.where(Ledger.employee == employee)
+	if leave_type:
+		query = query.where(Ledger.leave_type == leave_type)
+	if from_date and to_date:
+		query = query.where((Ledger.from_date <= to_date) & (Ledger.to_date >= from_date))
+	if allocations:
+		query = query.where(Ledger.transaction_name.isin(allocations))
+
+	return query.run(as_dict=True)
+
+
+def build_leave_allocation_balances(allocations: list[dict]) -> list[dict]:
+	"""Computes balances of the allocations from ledger entries loaded at once"""
+	if not allocations:
+		return []
+
+	leave_balances = LeaveBalances(
+		[
+			(allocation.employee, allocation.leave_type, date)
+			for allocation in allocations
+			for date in (allocation.from_date, allocation.to_date)
+		],
+		to_date=max(getdate(allocation.to_date) for allocation in allocations),
+	)
+
+	balances = []
+	for allocation in allocations:
+		employee, leave_type = allocation.employee, allocation.leave_type
+		entries = [
+			entry
+			for entry in leave_balances.ledger_entries.get((employee, leave_type), [])
+			if entry.transaction_name == allocation.name
+			and entry.transaction_type == "Leave Allocation"
+			and not entry.is_expired
+			and not entry.is_lwp
+		]
+		if not entries:
+			continue
+
+		from_date = min(entry.from_date for entry in entries)
+		to_date = max(entry.to_date for entry in entries)
+		unused_leaves = sum(flt(entry.leaves) for entry in entries if entry.is_carry_forward)
+		new_leaves_allocated = sum(flt(entry.leaves) for entry in entries if not entry.is_carry_forward)
+
+		cf_expiry = leave_balances.get_allocation_expiry_for_cf_leaves(
+			employee, leave_type, to_date, from_date
+		)
+		leaves_taken = leave_balances.get_leaves_for_period(employee, leave_type, from_date, to_date)
+		new_leaves_taken = cf_leaves_taken = 0
+		if cf_expiry and unused_leaves:
+			new_leaves_taken, cf_leaves_taken = leave_balances.get_new_and_cf_leaves_taken(
+				frappe._dict(
+					employee=employee,
+					leave_type=leave_type,
+					from_date=from_date,
+					to_date=to_date,
+					unused_leaves=unused_leaves,
+				),
+				cf_expiry,
+			)
+
+		# leaves taken are -ve numbers in the ledger
+		balances.append(
+			frappe._dict(
+				employee=employee,
+				leave_type=leave_type,
+				leave_allocation=allocation.name,
+				from_date=from_date,
+				to_date=to_date,
+				last_allocation_date=max(entry.from_date for entry in entries),
+				carry_forward_expiry=cf_expiry or None,
+				new_leaves_allocated=new_leaves_allocated,
+				unused_leaves=unused_leaves,
+				total_leaves_allocated=new_leaves_allocated + unused_leaves,
+				leaves_taken=-flt(leaves_taken),
+				new_leaves_taken=-flt(new_leaves_taken),
+				cf_leaves_taken=-flt(cf_leaves_taken),
+			)
+		)
+
+	return balances
+
+
+def insert_leave_allocation_balances(balances: list[dict]) -> None:
+	fields = ["employee", "leave_type", "leave_allocation", *BALANCE_FIELDS]
+	timestamp, user = now(), frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Leave Allocation Balance",
+		fields=["name", *fields, "creation", "modified", "owner", "modified_by"],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				*(d[field] for field in fields),
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for d in balances
+		],
+	)
+
+
+def get_leave_allocation_balances(employee: str, date, leave_type: str | None = None) -> dict:
+	"""Returns balances of the employee's allocations effective on the date by leave type"""
+	Balance = frappe.qb.DocType("Leave Allocation Balance")
+	LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+
+	query = (
+		frappe.qb.from_(Balance)
+		# ignore balances of allocations that were removed without cancellation
+		.join(LeaveAllocation)
+		.on((LeaveAllocation.name == Balance.leave_allocation) & (LeaveAllocation.docstatus == 1))
+		.select(Balance.leave_type, *(Balance[field] for field in BALANCE_FIELDS))
+		.where(
+			(Balance.employee == employee) & (Balance.from_date <= date) & (Balance.to_date >= date)
+		)
+	)
+	if leave_type:
+		query = query.where(Balance.leave_type == leave_type)
+
+	return {d.leave_type: d for d in query.run(as_dict=True)}
+
+
+def get_leave_balance_from_allocation_balance(
+	balance: dict | None, date, to_date=None, for_consumption: bool = False
+):
+	"""Returns the same balance as `get_leave_balance_on` considering all leaves in the allocation period.
+
+	Returns None if leaves were allocated after the date, the balance has to be computed from the ledger"""
+	date = getdate(date)
+	if not balance:
+		# no allocation effective on the date
+		balance = frappe._dict()
+		leaves_taken, cf_expiry, new_and_cf_leaves_taken = 0, "", None
+	else:
+		if date < getdate(balance.last_allocation_date):
+			return
+
+		to_date = getdate(to_date or nowdate())
+		cf_expiry = balance.carry_forward_expiry
+		if not cf_expiry or getdate(cf_expiry) > to_date:
+			cf_expiry = ""
+
+		leaves_taken = -flt(balance.leaves_taken)
+		new_and_cf_leaves_taken = (-flt(balance.new_leaves_taken), -flt(balance.cf_leaves_taken))
+
+	remaining_leaves = get_remaining_leaves(
+		balance, leaves_taken, date, cf_expiry, new_and_cf_leaves_taken
+	)
+	if for_consumption:
+		return remaining_leaves
+	else:
+		return remaining_leaves.get("leave_balance")
+
+
+def get_leave_details_from_allocation_balances(employee: str, date) -> dict | None:
+	"""Returns the leave allocation details of `get_leave_details` from allocation balances.
+
+	Returns None if leaves of any allocation were allocated after the date"""
+	from hrms.hr.doctype.leave_application.leave_application import (
+		get_leaves_pending_approval_for_period,
+	)
+
+	precision = cint(frappe.db.get_single_value("System Settings", "float_precision", cache=True))
+	leave_allocation = {}
+
+	for leave_type, balance in get_leave_allocation_balances(employee, date).items():
+		remaining_leaves = get_leave_balance_from_allocation_balance(
+			balance, date, to_date=balance.to_date
+		)
+		if remaining_leaves is None:
+			return
+
+		leaves_taken = flt(balance.leaves_taken)
+		leaves_pending = get_leaves_pending_approval_for_period(
+			employee, leave_type, balance.from_date, balance.to_date
+		)
+		expired_leaves = flt(balance.total_leaves_allocated) - (remaining_leaves + leaves_taken)
+
+		leave_allocation[leave_type] = {
+			"total_leaves": flt(balance.total_leaves_allocated, precision),
+			"expired_leaves": flt(expired_leaves, precision) if expired_leaves > 0 else 0,
+			"leaves_taken": flt(leaves_taken, precision),
+			"leaves_pending_approval": flt(leaves_pending, precision),
+			"remaining_leaves": flt(remaining_leaves, precision),
+		}
+
+	return leave_allocation
+
+
+@frappe.whitelist()
+def check_leave_allocation_balances(employee: str | None = None) -> list[dict]:
+	"""Compares stored balances with balances rebuilt from the ledger and returns the mismatches"""
+	frappe.only_for("System Manager")
+
+	allocations = get_ledger_allocations(employee)
+	mismatches = []
+	for idx in range(0, len(allocations), REBUILD_BATCH_SIZE):
+		expected_balances = build_leave_allocation_balances(allocations[idx : idx + REBUILD_BATCH_SIZE])
+		stored_balances = {
+			d.leave_allocation: d
+			for d in frappe.get_all(
+				"Leave Allocation Balance",
+				filters={"leave_allocation": ("in", [d.leave_allocation for d in expected_balances])},
+				fields=["leave_allocation", *BALANCE_FIELDS],
+			)
+		}
+
+		for expected in expected_balances:
+			stored = stored_balances.get(expected.leave_allocation)
+			if not stored:
+				mismatches.append(frappe._dict(leave_allocation=expected.leave_allocation, field=None))
+				continue
+
+			for field in BALANCE_FIELDS:
+				if is_mismatch(field, stored[field], expected[field]):
+					mismatches.append(
+						frappe._dict(
+							leave_allocation=expected.leave_allocation,
+							field=field,
+							expected=expected[field],
+							actual=stored[field],
+						)
+					)
+
+	return mismatches
+
+
+def is_mismatch(field: str, actual, expected) -> bool:
+	if field in DATE_FIELDS:
+		return (getdate(actual) if actual else None) != (getdate(expected) if expected else None)
+
+	return flt(actual, 6) != flt(expected, 6)
+
+
+@frappe.whitelist()
+def rebuild_leave_allocation_balances(
+	employee: str | None = None, leave_type: str | None = None
+) -> None:
+	"""Rebuilds allocation balances from the ledger, e.g. after data was patched directly.
+
+	Can be run via `bench --site <site> execute
+	hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance.rebuild_leave_allocation_balances`"""
+	frappe.only_for("System Manager")
+
+	filters = {}
+	if employee:
+		filters["employee"] = employee
+	if leave_type:
+		filters["leave_type"] = leave_type
+
+	frappe.db.delete("Leave Allocation Balance", filters)
+	allocations = get_ledger_allocations(employee, leave_type)
+	for idx in range(0, len(allocations), REBUILD_BATCH_SIZE):
+		insert_leave_allocation_balances(
+			build_leave_allocation_balances(allocations[idx : idx + REBUILD_BATCH_SIZE])
+		)
@@ -0,0 +1,125 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_year_ending, get_year_start, getdate
+
+from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_list
+
+from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+	check_leave_allocation_balances,
+	get_leave_allocation_balances,
+	get_leave_balance_from_allocation_balance,
+	rebuild_leave_allocation_balances,
+)
+from hrms.hr.doctype.leave_application.leave_application import get_leave_balance_on
+from hrms.hr.doctype.leave_application.test_leave_application import (
+	create_carry_forwarded_allocation,
+	get_employee,
+	set_leave_approver,
+)
+from hrms.hr.doctype.leave_type.test_leave_type import create_leave_type
+from hrms.payroll.doctype.salary_slip.test_salary_slip import (
+	make_holiday_list,
+	make_leave_application,
+)
+
+
+class TestLeaveAllocationBalance(FrappeTestCase):
+	def setUp(self):
+		for dt in [
+			"Leave Application",
+			"Leave Allocation",
+			"Leave Ledger Entry",
+			"Leave Allocation Balance",
+		]:
+			frappe.db.delete(dt)
+
+		frappe.set_user("Administrator")
+		set_leave_approver()
+
+		self.employee = get_employee()
+		self.leave_type = create_leave_type(
+			leave_type_name="_Test_CF_leave_expiry",
+			is_carry_forward=1,
+			expire_carry_forwarded_leaves_after_days=90,
+		)
+		make_holiday_list(
+			"Holiday List w/o Weekly Offs",
+			from_date=get_year_start(getdate()),
+			to_date=get_year_ending(getdate()),
+			add_weekly_offs=False,
+		)
+
+	def get_balance(self, date):
+		return get_leave_allocation_balances(self.employee.name, date, self.leave_type.name).get(
+			self.leave_type.name
+		)
+
+	def assert_balance_matches_ledger(self, date, to_date):
+		self.assertEqual(
+			get_leave_balance_from_allocation_balance(
+				self.get_balance(date), date, to_date=to_date, for_consumption=True
+			),
+			get_leave_balance_on(
+				self.employee.name,
+				self.leave_type.name,
+				date,
+				to_date,
+				consider_all_leaves_in_the_allocation_period=True,
+				for_consumption=True,
+			),
+		)
+
+	@set_holiday_list("Holiday List w/o Weekly Offs", "_Test Company")
+	def test_balance_updated_from_ledger(self):
+		leave_alloc = create_carry_forwarded_allocation(self.employee, self.leave_type)
+		cf_expiry = frappe.db.get_value(
+			"Leave Ledger Entry", {"transaction_name": leave_alloc.name, "is_carry_forward": 1}, "to_date"
+		)
+
+		balance = self.get_balance(leave_alloc.from_date)
+		self.assertEqual(balance.total_leaves_allocated, 30)
+		self.assertEqual(balance.unused_leaves, 15)
+		self.assertEqual(getdate(balance.carry_forward_expiry), getdate(cf_expiry))
+		self.assertEqual(balance.leaves_taken, 0)
+
+		# leave application across cf expiry
+		application = make_leave_application(
+			self.employee.name, add_days(cf_expiry, -1), add_days(cf_expiry, 2), self.leave_type.name
+		)
+		balance = self.get_balance(leave_alloc.from_date)
+		self.assertEqual(balance.leaves_taken, 4)
+		self.assertEqual(balance.cf_leaves_taken, 2)
+		self.assertEqual(balance.new_leaves_taken, 2)
+
+		for date in (leave_alloc.from_date, cf_expiry, add_days(cf_expiry, 1)):
+			self.assert_balance_matches_ledger(date, leave_alloc.to_date)
+			self.assert_balance_matches_ledger(date, add_days(cf_expiry, -1))
+
+		application.cancel()
+		self.assertEqual(self.get_balance(leave_alloc.from_date).leaves_taken, 0)
+		self.assertEqual(check_leave_allocation_balances(self.employee.name), [])
+
+		leave_alloc.cancel()
+		self.assertIsNone(self.get_balance(leave_alloc.from_date))
+
+	@set_holiday_list("Holiday List w/o Weekly Offs", "_Test Company")
+	def test_rebuild_balances(self):
+		leave_alloc = create_carry_forwarded_allocation(self.employee, self.leave_type)
+		make_leave_application(
+			self.employee.name,
+			add_days(leave_alloc.from_date, 1),
+			add_days(leave_alloc.from_date, 3),
+			self.leave_type.name,
+		)
+		expected = self.get_balance(leave_alloc.from_date)
+
+		frappe.db.delete("Leave Allocation Balance")
+		mismatches = check_leave_allocation_balances(self.employee.name)
+		self.assertEqual([d.leave_allocation for d in mismatches], [leave_alloc.name])
+
+		rebuild_leave_allocation_balances(employee=self.employee.name)
+		self.assertEqual(self.get_balance(leave_alloc.from_date), expected)
+		self.assertEqual(check_leave_allocation_balances(self.employee.name), [])
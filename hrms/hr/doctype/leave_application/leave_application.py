@@ -9,12 +9,15 @@ from frappe import _
 from frappe.query_builder.functions import Max, Min, Sum
 from frappe.utils import (
 	add_days,
+	add_months,
 	cint,
 	cstr,
 	date_diff,
 	flt,
 	formatdate,
+	get_first_day,
 	get_fullname,
+	get_last_day,
 	get_link_to_form,
 	getdate,
 	nowdate,
@@ -33,6 +36,10 @@ from hrms.hr.utils import (
 	validate_active_employee,
 )
 from hrms.utils import get_employee_email
+from hrms.utils.holiday_list import get_holiday_calendar
+
+
+LEAVE_CALENDAR_CACHE_KEY = "leave_calendar"
 
 
 class LeaveDayBlockedError(frappe.ValidationError):
@@ -356,13 +363,8 @@ class LeaveApplication(Document):
 				)
 
 			if not is_lwp(self.leave_type):
-				leave_balance = get_leave_balance_on(
-					self.employee,
-					self.leave_type,
-					self.from_date,
-					self.to_date,
-					consider_all_leaves_in_the_allocation_period=True,
-					for_consumption=True,
+				leave_balance = get_leave_balance_for_application(
+					self.employee, self.leave_type, self.from_date, self.to_date
 				)
 				self.leave_balance = leave_balance.get("leave_balance")
 				leave_balance_for_consumption = leave_balance.get("leave_balance_for_consumption")
@@ -484,11 +486,10 @@ class LeaveApplication(Document):
 			frappe.throw(
 				_("Optional Holiday List not set for leave period {0}").format(leave_period[0]["name"])
 			)
+		calendar = get_holiday_calendar(optional_holiday_list)
 		day = getdate(self.from_date)
 		while day <= getdate(self.to_date):
-			if not frappe.db.exists(
-				{"doctype": "Holiday", "parent": optional_holiday_list, "holiday_date": day}
-			):
+			if not calendar.is_holiday(day):
 				frappe.throw(
 					_("{0} is not in Optional Holiday List").format(formatdate(day)), NotAnOptionalHoliday
 				)
@@ -762,30 +763,14 @@ def get_number_of_leave_days(
 
 @frappe.whitelist()
 def get_leave_details(employee, date):
-	allocation_records = get_leave_allocation_records(employee, date)
-	leave_allocation = {}
-	precision = cint(frappe.db.get_single_value("System Settings", "float_precision", cache=True))
-
-	for d in allocation_records:
-		allocation = allocation_records.get(d, frappe._dict())
-		remaining_leaves = get_leave_balance_on(
-			employee, d, date, to_date=allocation.to_date, consider_all_leaves_in_the_allocation_period=True
-		)
-
-		end_date = allocation.to_date
-		leaves_taken = get_leaves_for_period(employee, d, allocation.from_date, end_date) * -1
-		leaves_pending = get_leaves_pending_approval_for_period(
-			employee, d, allocation.from_date, end_date
-		)
-		expired_leaves = allocation.total_leaves_allocated - (remaining_leaves + leaves_taken)
+	from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+		get_leave_details_from_allocation_balances,
+	)
+	from hrms.hr.doctype.leave_ledger_entry.leave_balance import LeaveBalances
 
-		leave_allocation[d] = {
-			"total_leaves": flt(allocation.total_leaves_allocated, precision),
-			"expired_leaves": flt(expired_leaves, precision) if expired_leaves > 0 else 0,
-			"leaves_taken": flt(leaves_taken, precision),
-			"leaves_pending_approval": flt(leaves_pending, precision),
-			"remaining_leaves": flt(remaining_leaves, precision),
-		}
+	leave_allocation = get_leave_details_from_allocation_balances(employee, date)
+	if leave_allocation is None:
+		leave_allocation = LeaveBalances([(employee, None, date)]).get_leave_details(employee, date)
 
 	# is used in set query
 	lwp = frappe.get_list("Leave Type", filters={"is_lwp": 1}, pluck="name")
@@ -841,6 +826,33 @@ def get_leave_balance_on(
 		return remaining_leaves.get("leave_balance")
 
 
+def get_leave_balance_for_application(
+	employee: str, leave_type: str, from_date: datetime.date, to_date: datetime.date
+) -> Dict[str, float]:
+	"""Returns leave balance for consumption considering all leaves in the allocation period,
+	from the allocation balance if it applies to the date"""
+	from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+		get_leave_allocation_balances,
+		get_leave_balance_from_allocation_balance,
+	)
+
+	balance = get_leave_allocation_balances(employee, from_date, leave_type).get(leave_type)
+	leave_balance = get_leave_balance_from_allocation_balance(
+		balance, from_date, to_date=to_date, for_consumption=True
+	)
+	if leave_balance is None:
+		leave_balance = get_leave_balance_on(
+			employee,
+			leave_type,
+			from_date,
+			to_date,
+			consider_all_leaves_in_the_allocation_period=True,
+			for_consumption=True,
+		)
+
+	return leave_balance
+
+
 def get_leave_allocation_records(employee, date, leave_type=None):
 	"""Returns the total allocated leaves and carry forwarded leaves based on ledger entries"""
 	Ledger = frappe.qb.DocType("Leave Ledger Entry")
@@ -1077,14 +1089,7 @@ def get_holidays(employee, from_date, to_date, holiday_list=None):
 	if not holiday_list:
 		holiday_list = get_holiday_list_for_employee(employee)
 
-	holidays = frappe.db.sql(
-		"""select count(distinct holiday_date) from `tabHoliday` h1, `tabHoliday List` h2
-		where h1.parent = h2.name and h1.holiday_date between %s and %s
-		and h2.name = %s""",
-		(from_date, to_date, holiday_list),
-	)[0][0]
-
-	return holidays
+	return get_holiday_calendar(holiday_list).count(from_date, to_date)
 
 
 def is_lwp(leave_type):
@@ -1126,30 +1131,88 @@ def add_department_leaves(events, start, end, employee, company):
 	if not department:
 		return
 
-	# department leaves
-	department_employees = frappe.db.sql_list(
-		"""select name from tabEmployee where department=%s
-		and company=%s""",
-		(department, company),
+	start, end = getdate(start), getdate(end)
+
+	leaves = []
+	month_start = get_first_day(start)
+	while month_start <= end:
+		leaves.extend(
+			frappe.cache.hget(
+				get_leave_calendar_cache_key(department),
+				f"{company}:{month_start}",
+				generator=lambda: get_department_leaves(
+					department, company, month_start, get_last_day(month_start)
+				),
+			)
+		)
+		month_start = add_months(month_start, 1)
+
+	leaves = [leave for leave in leaves if leave["from_date"] <= end and leave["to_date"] >= start]
+
+	# cached windows are shared by all users, user permissions are applied on every request
+	match_conditions = get_leave_match_conditions()
+	if match_conditions and leaves:
+		permitted = set(
+			frappe.db.sql_list(
+				f"""SELECT name FROM `tabLeave Application`
+				WHERE name in %(names)s AND {match_conditions}""",
+				{"names": tuple(leave["name"] for leave in leaves)},
+			)
+		)
+		leaves = [leave for leave in leaves if leave["name"] in permitted]
+
+	# cached windows hold untranslated leaves, titles are built in the user's language
+	add_leave_events(events, [get_leave_event(leave) for leave in leaves])
+
+
+def get_department_leaves(department, company, start, end) -> list[dict]:
+	department_employees = frappe.get_all(
+		"Employee", filters={"department": department, "company": company}, pluck="name"
 	)
+	if not department_employees:
+		return []
 
-	filter_conditions = ' and employee in ("%s")' % '", "'.join(department_employees)
-	add_leaves(events, start, end, filter_conditions=filter_conditions)
+	return get_leaves(start, end, employees=department_employees)
 
 
 def add_leaves(events, start, end, filter_conditions=None):
-	from frappe.desk.reportview import build_match_conditions
+	match_conditions = get_leave_match_conditions()
+	add_leave_events(
+		events,
+		[
+			get_leave_event(leave)
+			for leave in get_leaves(
+				start,
+				end,
+				conditions=[match_conditions] if match_conditions else [],
+				filter_conditions=filter_conditions,
+			)
+		],
+	)
 
-	conditions = []
 
-	if not cint(
-		frappe.db.get_value("HR Settings", None, "show_leaves_of_all_department_members_in_calendar")
+def add_leave_events(events, leave_events):
+	"""Adds leave events that are not already in the calendar"""
+	added = {event["name"] for event in events if event["doctype"] == "Leave Application"}
+	for event in leave_events:
+		if event["name"] not in added:
+			added.add(event["name"])
+			events.append(event)
+
+
+def get_leave_match_conditions() -> str:
+	if cint(
+		frappe.db.get_single_value("HR Settings", "show_leaves_of_all_department_members_in_calendar")
 	):
-		match_conditions = build_match_conditions("Leave Application")
+		return ""
+
+	from frappe.desk.reportview import build_match_conditions
+
+	return build_match_conditions("Leave Application")
 
-		if match_conditions:
-			conditions.append(match_conditions)
 
+def get_leaves(start, end, conditions=None, filter_conditions=None, employees=None) -> list[dict]:
+	"""Returns open and approved leaves overlapping the period"""
 	query = """SELECT
 		docstatus,
 		name,
@@ -1163,32 +1226,60 @@ def add_leaves(events, start, end, filter_conditions=None):
 		color
 	FROM `tabLeave Application`
 	WHERE
-		from_date <= %(end)s AND to_date >= %(start)s <= to_date
+		from_date <= %(end)s AND to_date >= %(start)s
 		AND docstatus < 2
 		AND status in ('Approved', 'Open')
 	"""
 
+	if employees:
+		query += " AND employee in %(employees)s"
+
 	if conditions:
 		query += " AND " + " AND ".join(conditions)
 
 	if filter_conditions:
 		query += filter_conditions
 
-	for d in frappe.db.sql(query, {"start": start, "end": end}, as_dict=True):
-		e = {
-			"name": d.name,
-			"doctype": "Leave Application",
-			"from_date": d.from_date,
-			"to_date": d.to_date,
-			"docstatus": d.docstatus,
-			"color": d.color,
-			"all_day": int(not d.half_day),
-			"title": cstr(d.employee_name)
-			+ f" ({cstr(d.leave_type)})"
-			+ (" " + _("(Half Day)") if d.half_day else ""),
-		}
-		if e not in events:
-			events.append(e)
+	return frappe.db.sql(
+		query,
+		{"start": start, "end": end, "employees": tuple(employees or ())},
+		as_dict=True,
+	)
+
+
+def get_leave_event(leave: dict) -> dict:
+	return {
+		"name": leave["name"],
+		"doctype": "Leave Application",
+		"from_date": leave["from_date"],
+		"to_date": leave["to_date"],
+		"docstatus": leave["docstatus"],
+		"color": leave["color"],
+		"all_day": int(not leave["half_day"]),
+		"title": cstr(leave["employee_name"])
+		+ f" ({cstr(leave['leave_type'])})"
+		+ (" " + _("(Half Day)") if leave["half_day"] else ""),
+	}
+
+
+def get_leave_calendar_cache_key(department: str) -> str:
+	return f"{LEAVE_CALENDAR_CACHE_KEY}::{department}"
+
+
+def invalidate_leave_calendar_cache(doc, method=None):
+	"""Clears cached calendar windows of the departments of the employee"""
+	if doc.doctype == "Employee":
+		if method == "on_update" and not any(
+			doc.has_value_changed(field) for field in ("department", "company", "employee_name")
+		):
+			return
+		departments = {doc.department, (doc.get_doc_before_save() or frappe._dict()).get("department")}
+	else:
+		departments = {doc.department, frappe.db.get_value("Employee", doc.employee, "department")}
+
+	for department in departments:
+		if department:
+			frappe.cache.delete_value(get_leave_calendar_cache_key(department))
 
 
 def add_block_dates(events, start, end, employee, company):
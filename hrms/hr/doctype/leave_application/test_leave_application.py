@@ -25,11 +25,13 @@ from hrms.hr.doctype.leave_application.leave_application import (
 	LeaveDayBlockedError,
 	NotAnOptionalHoliday,
 	OverlapError,
+	add_department_leaves,
 	get_leave_allocation_records,
 	get_leave_balance_on,
 	get_leave_details,
 	get_new_and_cf_leaves_taken,
 )
+from hrms.hr.doctype.leave_ledger_entry.leave_balance import get_leave_balances
 from hrms.hr.doctype.leave_policy_assignment.leave_policy_assignment import (
 	create_assignment_for_multiple_employees,
 )
@@ -1124,6 +1126,71 @@ class TestLeaveApplication(FrappeTestCase):
 		# filters out old CF leaves (15 i.e total 45)
 		self.assertEqual(details[leave_type.name]["total_leaves_allocated"], 30.0)
 
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_leave_balances_in_batch(self):
+		"""Tests if balances computed in a batch match the balances of individual lookups"""
+		employee = get_employee()
+		leave_type = create_leave_type(
+			leave_type_name="_Test_CF_leave_expiry",
+			is_carry_forward=1,
+			expire_carry_forwarded_leaves_after_days=90,
+		)
+
+		leave_alloc = create_carry_forwarded_allocation(employee, leave_type)
+		cf_expiry = frappe.db.get_value(
+			"Leave Ledger Entry", {"transaction_name": leave_alloc.name, "is_carry_forward": 1}, "to_date"
+		)
+
+		# half day application across cf expiry with holidays in between
+		make_leave_application(
+			employee.name,
+			add_days(cf_expiry, -3),
+			add_days(cf_expiry, 10),
+			leave_type.name,
+			half_day=True,
+			half_day_date=add_days(cf_expiry, 2),
+		)
+
+		queries = [
+			(employee.name, leave_type.name, add_days(cf_expiry, days)) for days in (-10, -1, 0, 1, 15)
+		]
+		balances = get_leave_balances(queries)
+		for (employee_name, leave_type_name, date), balance in zip(queries, balances):
+			self.assertEqual(
+				balance, get_leave_balance_on(employee_name, leave_type_name, date, for_consumption=True)
+			)
+
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_department_leave_calendar(self):
+		frappe.db.set_single_value(
+			"HR Settings", "show_leaves_of_all_department_members_in_calendar", 1
+		)
+		employee = get_employee()
+		leave_type = create_leave_type(leave_type_name="_Test Calendar Leave", is_lwp=1)
+		month_end = get_last_day(nowdate())
+		start, end = get_first_day(nowdate()), get_last_day(add_days(month_end, 1))
+
+		# leave across the month boundary is shown once
+		leave = make_leave_application(
+			employee.name, add_days(month_end, -2), add_days(month_end, 2), leave_type.name, submit=False
+		)
+		events = []
+		add_department_leaves(events, start, end, employee.name, employee.company)
+		self.assertEqual([event["name"] for event in events], [leave.name])
+
+		# cached month windows are invalidated on changes
+		new_leave = make_leave_application(
+			employee.name, add_days(start, 7), add_days(start, 11), leave_type.name, submit=False
+		)
+		events = []
+		add_department_leaves(events, start, end, employee.name, employee.company)
+		self.assertCountEqual([event["name"] for event in events], [leave.name, new_leave.name])
+
+		# events outside the requested window are excluded
+		events = []
+		add_department_leaves(events, start, add_days(start, 10), employee.name, employee.company)
+		self.assertEqual([event["name"] for event in events], [new_leave.name])
+
 
 def create_carry_forwarded_allocation(employee, leave_type, date=None):
 	date = date or nowdate()
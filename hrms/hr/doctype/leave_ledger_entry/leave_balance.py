@@ -0,0 +1,516 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe.utils import add_days, cint, date_diff, flt, getdate, nowdate
+
+from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employee
+
+from hrms.utils.holiday_list import get_holiday_calendar, get_holiday_calendars
+
+
+@frappe.whitelist()
+def get_leave_balances(
+	queries, to_date=None, consider_all_leaves_in_the_allocation_period=False
+) -> list[dict]:
+	"""Returns leave balances for many (employee, leave_type, date) queries at once.
+
+	:param queries: List (or JSON string) of [employee, leave_type, date] lists or dicts with those keys.
+	:param to_date: future date to check for allocation expiry, defaults to today.
+	:param consider_all_leaves_in_the_allocation_period: consider all leaves taken till the allocation end date.
+	:return: List of dicts with `leave_balance` and `leave_balance_for_consumption` in the order of queries.
+	"""
+	if isinstance(queries, str):
+		queries = json.loads(queries)
+	if not queries:
+		return []
+
+	queries = [
+		(d["employee"], d["leave_type"], d["date"]) if isinstance(d, dict) else tuple(d)
+		for d in queries
+	]
+	for employee, leave_type, date in queries:
+		if not frappe.has_permission("Employee", "read", employee):
+			frappe.throw(
+				frappe._("Not permitted to read leave balance of Employee {0}").format(employee),
+				frappe.PermissionError,
+			)
+
+	balances = LeaveBalances(queries, to_date=to_date)
+	return [
+		balances.get_leave_balance_on(
+			employee,
+			leave_type,
+			date,
+			to_date=to_date,
+			consider_all_leaves_in_the_allocation_period=consider_all_leaves_in_the_allocation_period,
+			for_consumption=True,
+		)
+		for employee, leave_type, date in queries
+	]
+
+
+class LeaveBalances:
+	"""
+	Computes leave balances for many (employee, leave_type, date) tuples from ledger entries, allocations
+	and holidays loaded in a few set-based queries. Methods mirror `get_leave_balance_on`,
+	`get_leave_allocation_records` and `get_leave_details` in Leave Application and return the same values.
+	"""
+
+	def __init__(self, queries: list[tuple], to_date=None):
+		"""
+		:param queries: (employee, leave_type, date) tuples. Leave type can be None for all leave types.
+		:param to_date: latest future date balances are checked for allocation expiry, defaults to today.
+		        Balances checked for expiry beyond this date and the allocation periods of the queries can
+		        miss carry forward allocations that are not loaded.
+		"""
+		self.queries = [(employee, leave_type, getdate(date)) for employee, leave_type, date in queries]
+		self.employees = list({employee for employee, leave_type, date in self.queries})
+		self.to_date = getdate(to_date or nowdate())
+
+		self.load_allocations()
+		self.load_ledger_entries()
+		self.load_half_day_dates()
+		self.load_holidays()
+		self.load_pending_leaves()
+
+	def load_allocations(self):
+		"""Sets the window of dates to load ledger entries and holidays for"""
+		dates = [date for employee, leave_type, date in self.queries]
+		allocations = frappe.get_all(
+			"Leave Allocation",
+			filters={
+				"employee": ("in", self.employees),
+				"docstatus": 1,
+				"from_date": ("<=", max(dates)),
+				"to_date": (">=", min(dates)),
+			},
+			fields=["from_date", "to_date"],
+		)
+
+		self.from_date = min([*dates, *(getdate(d.from_date) for d in allocations)])
+		self.till_date = max([*dates, self.to_date, *(getdate(d.to_date) for d in allocations)])
+
+	def load_ledger_entries(self):
+		Ledger = frappe.qb.DocType("Leave Ledger Entry")
+		LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+		query = (
+			frappe.qb.from_(Ledger)
+			.left_join(LeaveAllocation)
+			.on(Ledger.transaction_name == LeaveAllocation.name)
+			.select(
+				Ledger.employee,
+				Ledger.leave_type,
+				Ledger.from_date,
+				Ledger.to_date,
+				Ledger.leaves,
+				Ledger.transaction_name,
+				Ledger.transaction_type,
+				Ledger.holiday_list,
+				Ledger.is_carry_forward,
+				Ledger.is_expired,
+				Ledger.is_lwp,
+				LeaveAllocation.name.as_("allocation"),
+				LeaveAllocation.from_date.as_("allocation_from_date"),
+				LeaveAllocation.to_date.as_("allocation_to_date"),
+			)
+			.where(
+				(Ledger.docstatus == 1)
+				& (Ledger.employee.isin(self.employees))
+				& (Ledger.to_date >= self.from_date)
+				& (Ledger.from_date <= self.till_date)
+			)
+			# same as the default sort order of the doctype, used to pick the carry forward expiry
+			.orderby(Ledger.modified)
+		)
+
+		leave_types = {leave_type for employee, leave_type, date in self.queries}
+		if None not in leave_types:
+			query = query.where(Ledger.leave_type.isin(list(leave_types)))
+
+		self.ledger_entries = {}
+		for entry in query.run(as_dict=True):
+			for fieldname in ("from_date", "to_date", "allocation_from_date", "allocation_to_date"):
+				if entry[fieldname]:
+					entry[fieldname] = getdate(entry[fieldname])
+
+			self.ledger_entries.setdefault((entry.employee, entry.leave_type), []).append(entry)
+
+		# leave types with ledger entries per employee, to look up an employee's entries by key
+		self.leave_types_by_employee = {}
+		for employee, leave_type in self.ledger_entries:
+			self.leave_types_by_employee.setdefault(employee, []).append(leave_type)
+
+	def load_half_day_dates(self):
+		leave_applications = {
+			entry.transaction_name
+			for entries in self.ledger_entries.values()
+			for entry in entries
+			if entry.transaction_type == "Leave Application" and flt(entry.leaves) % 1
+		}
+
+		self.half_day_dates = {}
+		if leave_applications:
+			self.half_day_dates = dict(
+				frappe.get_all(
+					"Leave Application",
+					filters={"name": ("in", list(leave_applications))},
+					fields=["name", "half_day_date"],
+					as_list=True,
+				)
+			)
+
+	def load_holidays(self):
+		employees = frappe.get_all(
+			"Employee",
+			filters={"name": ("in", self.employees)},
+			fields=["name", "holiday_list", "company"],
+		)
+		default_holiday_lists = dict(
+			frappe.get_all(
+				"Company",
+				filters={"name": ("in", list({d.company for d in employees}))},
+				fields=["name", "default_holiday_list"],
+				as_list=True,
+			)
+		)
+		self.employee_holiday_lists = {
+			d.name: d.holiday_list or default_holiday_lists.get(d.company) for d in employees
+		}
+
+		self.include_holiday = dict(
+			frappe.get_all("Leave Type", fields=["name", "include_holiday"], as_list=True)
+		)
+
+		holiday_lists = {
+			*self.employee_holiday_lists.values(),
+			*(
+				entry.holiday_list
+				for entries in self.ledger_entries.values()
+				for entry in entries
+				if entry.holiday_list
+			),
+		}
+		holiday_lists.discard(None)
+
+		self.holidays = get_holiday_calendars(list(holiday_lists))
+
+	def load_pending_leaves(self):
+		self.pending_leaves = {}
+		for d in frappe.get_all(
+			"Leave Application",
+			filters={
+				"employee": ("in", self.employees),
+				"status": "Open",
+				"to_date": (">=", self.from_date),
+				"from_date": ("<=", self.till_date),
+			},
+			fields=["employee", "leave_type", "from_date", "to_date", "total_leave_days"],
+		):
+			self.pending_leaves.setdefault((d.employee, d.leave_type), []).append(d)
+
+	def get_leave_balance_on(
+		self,
+		employee: str,
+		leave_type: str,
+		date,
+		to_date=None,
+		consider_all_leaves_in_the_allocation_period: bool = False,
+		for_consumption: bool = False,
+	):
+		"""Returns leave balance till date, see `get_leave_balance_on` in Leave Application"""
+		date = getdate(date)
+		to_date = getdate(to_date or nowdate())
+
+		allocation = self.get_leave_allocation_records(employee, date, leave_type).get(
+			leave_type, frappe._dict()
+		)
+
+		end_date = allocation.to_date if cint(consider_all_leaves_in_the_allocation_period) else date
+		cf_expiry = self.get_allocation_expiry_for_cf_leaves(
+			employee, leave_type, to_date, allocation.from_date
+		)
+		leaves_taken = self.get_leaves_for_period(employee, leave_type, allocation.from_date, end_date)
+		remaining_leaves = self.get_remaining_leaves(allocation, leaves_taken, date, cf_expiry)
+
+		if for_consumption:
+			return remaining_leaves
+		else:
+			return remaining_leaves.get("leave_balance")
+
+	def get_leave_allocation_records(
+		self, employee: str, date, leave_type: str | None = None
+	) -> dict:
+		"""Returns the total allocated leaves and carry forwarded leaves based on ledger entries"""
+		date = getdate(date)
+		allocated_leaves = frappe._dict()
+
+		leave_types = [leave_type] if leave_type else self.leave_types_by_employee.get(employee, [])
+		for entry_leave_type in leave_types:
+			entries = self.ledger_entries.get((employee, entry_leave_type), [])
+			records = [entry for entry in entries if self.is_allocated_leave(entry, date)]
+			if not records:
+				continue
+
+			cf_leaves = sum(flt(d.leaves) for d in records if d.is_carry_forward)
+			new_leaves = sum(flt(d.leaves) for d in records if not d.is_carry_forward)
+			allocated_leaves[entry_leave_type] = frappe._dict(
+				{
+					"from_date": min(d.from_date for d in records),
+					"to_date": max(d.to_date for d in records),
+					"total_leaves_allocated": cf_leaves + new_leaves,
+					"unused_leaves": cf_leaves,
+					"new_leaves_allocated": new_leaves,
+					"leave_type": entry_leave_type,
+					"employee": employee,
+				}
+			)
+
+		return allocated_leaves
+
+	def is_allocated_leave(self, entry: dict, date) -> bool:
+		if (
+			entry.transaction_type != "Leave Allocation"
+			or not entry.allocation
+			or entry.is_expired
+			or entry.is_lwp
+			or entry.from_date > date
+		):
+			return False
+
+		if not entry.is_carry_forward:
+			# newly allocated leave's end date is same as the leave allocation's to date
+			return entry.to_date >= date
+
+		# carry forwarded leave's end date is between the leave allocation's from and to date
+		# only consider cf leaves from current allocation
+		return (
+			entry.allocation_from_date <= entry.to_date <= entry.allocation_to_date
+			and entry.allocation_from_date <= date <= entry.allocation_to_date
+		)
+
+	def get_allocation_expiry_for_cf_leaves(self, employee: str, leave_type: str, to_date, from_date):
+		"""Returns expiry of carry forward allocation in leave ledger entry"""
+		if not from_date:
+			return ""
+
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		return next(
+			(
+				entry.to_date
+				for entry in self.ledger_entries.get((employee, leave_type), [])
+				if entry.is_carry_forward
+				and entry.transaction_type == "Leave Allocation"
+				and from_date <= entry.to_date <= to_date
+			),
+			"",
+		)
+
+	def get_remaining_leaves(self, allocation: dict, leaves_taken: float, date, cf_expiry) -> dict:
+		new_and_cf_leaves_taken = None
+		if cf_expiry and allocation.unused_leaves:
+			new_and_cf_leaves_taken = self.get_new_and_cf_leaves_taken(allocation, cf_expiry)
+
+		return get_remaining_leaves(allocation, leaves_taken, date, cf_expiry, new_and_cf_leaves_taken)
+
+	def get_new_and_cf_leaves_taken(self, allocation: dict, cf_expiry) -> tuple[float, float]:
+		cf_leaves_taken = self.get_leaves_for_period(
+			allocation.employee, allocation.leave_type, allocation.from_date, cf_expiry
+		)
+		new_leaves_taken = self.get_leaves_for_period(
+			allocation.employee, allocation.leave_type, add_days(cf_expiry, 1), allocation.to_date
+		)
+
+		# using abs because leaves taken is a -ve number in the ledger
+		if abs(cf_leaves_taken) > allocation.unused_leaves:
+			new_leaves_taken += -(abs(cf_leaves_taken) - allocation.unused_leaves)
+			cf_leaves_taken = -allocation.unused_leaves
+
+		return new_leaves_taken, cf_leaves_taken
+
+	def get_leaves_for_period(
+		self, employee: str, leave_type: str, from_date, to_date, skip_expired_leaves: bool = True
+	) -> float:
+		"""Returns leaves taken in the period, see `get_leaves_for_period` in Leave Application"""
+		if not from_date or not to_date:
+			return 0
+
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		leave_days = 0
+
+		for entry in self.ledger_entries.get((employee, leave_type), []):
+			if not (flt(entry.leaves) < 0 or entry.is_expired):
+				continue
+
+			if not (
+				from_date <= entry.from_date <= to_date
+				or from_date <= entry.to_date <= to_date
+				or (entry.from_date < from_date and entry.to_date > to_date)
+			):
+				continue
+
+			inclusive_period = entry.from_date >= from_date and entry.to_date <= to_date
+
+			if inclusive_period and entry.transaction_type == "Leave Encashment":
+				leave_days += entry.leaves
+
+			elif (
+				inclusive_period
+				and entry.transaction_type == "Leave Allocation"
+				and entry.is_expired
+				and not skip_expired_leaves
+			):
+				leave_days += entry.leaves
+
+			elif entry.transaction_type == "Leave Application":
+				entry_from_date = max(entry.from_date, from_date)
+				entry_to_date = min(entry.to_date, to_date)
+
+				half_day = 0
+				half_day_date = None
+				if flt(entry.leaves) % 1:
+					half_day = 1
+					half_day_date = self.half_day_dates.get(entry.transaction_name)
+
+				leave_days += (
+					self.get_number_of_leave_days(
+						employee,
+						leave_type,
+						entry_from_date,
+						entry_to_date,
+						half_day,
+						half_day_date,
+						holiday_list=entry.holiday_list,
+					)
+					* -1
+				)
+
+		return leave_days
+
+	def get_number_of_leave_days(
+		self,
+		employee,
+		leave_type,
+		from_date,
+		to_date,
+		half_day=None,
+		half_day_date=None,
+		holiday_list=None,
+	) -> float:
+		"""Returns number of leave days between 2 dates after considering half day and holidays"""
+		if cint(half_day) == 1:
+			if from_date == to_date:
+				number_of_days = 0.5
+			elif half_day_date and from_date <= getdate(half_day_date) <= to_date:
+				number_of_days = date_diff(to_date, from_date) + 0.5
+			else:
+				number_of_days = date_diff(to_date, from_date) + 1
+		else:
+			number_of_days = date_diff(to_date, from_date) + 1
+
+		if not self.include_holiday.get(leave_type):
+			number_of_days = flt(number_of_days) - self.get_holidays(
+				employee, from_date, to_date, holiday_list
+			)
+
+		return number_of_days
+
+	def get_holidays(self, employee, from_date, to_date, holiday_list=None) -> int:
+		if not holiday_list:
+			holiday_list = self.employee_holiday_lists.get(employee)
+			if not holiday_list:
+				# throws the same error as a lookup without a holiday list
+				holiday_list = get_holiday_list_for_employee(employee)
+
+		calendar = self.holidays.get(holiday_list) or get_holiday_calendar(holiday_list)
+		return calendar.count(from_date, to_date)
+
+	def get_leaves_pending_approval_for_period(
+		self, employee, leave_type, from_date, to_date
+	) -> float:
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		return sum(
+			flt(d.total_leave_days)
+			for d in self.pending_leaves.get((employee, leave_type), [])
+			if from_date <= d.from_date <= to_date or from_date <= d.to_date <= to_date
+		)
+
+	def get_leave_details(self, employee: str, date) -> dict:
+		"""Returns allocated, expired, taken, pending and remaining leaves of every leave type
+		allocated to the employee on the date, see `get_leave_details` in Leave Application"""
+		precision = cint(frappe.db.get_single_value("System Settings", "float_precision", cache=True))
+		leave_allocation = {}
+
+		for leave_type, allocation in self.get_leave_allocation_records(employee, date).items():
+			remaining_leaves = self.get_leave_balance_on(
+				employee,
+				leave_type,
+				date,
+				to_date=allocation.to_date,
+				consider_all_leaves_in_the_allocation_period=True,
+			)
+
+			leaves_taken = (
+				self.get_leaves_for_period(employee, leave_type, allocation.from_date, allocation.to_date)
+				* -1
+			)
+			leaves_pending = self.get_leaves_pending_approval_for_period(
+				employee, leave_type, allocation.from_date, allocation.to_date
+			)
+			expired_leaves = allocation.total_leaves_allocated - (remaining_leaves + leaves_taken)
+
+			leave_allocation[leave_type] = {
+				"total_leaves": flt(allocation.total_leaves_allocated, precision),
+				"expired_leaves": flt(expired_leaves, precision) if expired_leaves > 0 else 0,
+				"leaves_taken": flt(leaves_taken, precision),
+				"leaves_pending_approval": flt(leaves_pending, precision),
+				"remaining_leaves": flt(remaining_leaves, precision),
+			}
+
+		return leave_allocation
+
+
+def get_remaining_leaves(
+	allocation: dict,
+	leaves_taken: float,
+	date,
+	cf_expiry,
+	new_and_cf_leaves_taken: tuple[float, float] | None = None,
+) -> dict:
+	"""Returns a dict of leave_balance and leave_balance_for_consumption from the leaves taken,
+	see `get_remaining_leaves` in Leave Application
+
+	:param new_and_cf_leaves_taken: new and carry forwarded leaves taken (as -ve numbers),
+	        required if the allocation has carry forwarded leaves with an expiry
+	"""
+
+	def _get_remaining_leaves(remaining_leaves, end_date):
+		if remaining_leaves > 0:
+			remaining_days = date_diff(end_date, date) + 1
+			remaining_leaves = min(remaining_days, remaining_leaves)
+
+		return remaining_leaves
+
+	if cf_expiry and allocation.unused_leaves:
+		new_leaves_taken, cf_leaves_taken = new_and_cf_leaves_taken
+
+		if getdate(date) > getdate(cf_expiry):
+			# carry forwarded leaves have expired
+			cf_leaves = remaining_cf_leaves = 0
+		else:
+			cf_leaves = flt(allocation.unused_leaves) + flt(cf_leaves_taken)
+			remaining_cf_leaves = _get_remaining_leaves(cf_leaves, cf_expiry)
+
+		leave_balance = (flt(allocation.new_leaves_allocated) + flt(new_leaves_taken)) + flt(cf_leaves)
+		leave_balance_for_consumption = (
+			flt(allocation.new_leaves_allocated) + flt(new_leaves_taken)
+		) + flt(remaining_cf_leaves)
+	else:
+		leave_balance = leave_balance_for_consumption = flt(allocation.total_leaves_allocated) + flt(
+			leaves_taken
+		)
+
+	remaining_leaves = _get_remaining_leaves(leave_balance_for_consumption, allocation.to_date)
+	return frappe._dict(leave_balance=leave_balance, leave_balance_for_consumption=remaining_leaves)
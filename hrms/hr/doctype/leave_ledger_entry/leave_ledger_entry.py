@@ -5,7 +5,26 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import DATE_FORMAT, flt, getdate, today
+from frappe.query_builder.functions import Sum
+from frappe.utils import DATE_FORMAT, flt, getdate, now, today
+
+EXPIRY_BATCH_SIZE = 500
+# fields of bulk inserted entries with their defaults
+LEDGER_ENTRY_FIELDS = {
+	"employee": None,
+	"employee_name": None,
+	"leave_type": None,
+	"transaction_type": None,
+	"transaction_name": None,
+	"leaves": 0,
+	"from_date": None,
+	"to_date": None,
+	"is_carry_forward": 0,
+	"is_expired": 0,
+	"is_lwp": 0,
+	"holiday_list": None,
+	"company": None,
+}
 
 
 class LeaveLedgerEntry(Document):
@@ -13,10 +32,14 @@ class LeaveLedgerEntry(Document):
 		if getdate(self.from_date) > getdate(self.to_date):
 			frappe.throw(_("To date needs to be before from date"))
 
+	def on_submit(self):
+		refresh_leave_allocation_balances(self)
+
 	def on_cancel(self):
 		# allow cancellation of expiry leaves
 		if self.is_expired:
 			frappe.db.set_value("Leave Allocation", self.transaction_name, "expired", 0)
+			refresh_leave_allocation_balances(self)
 		else:
 			frappe.throw(_("Only expired allocation can be cancelled"))
 
@@ -81,6 +104,18 @@ def delete_ledger_entry(ledger):
 			OR `name`=%s""",
 		(ledger.transaction_name, expired_entry),
 	)
+	refresh_leave_allocation_balances(ledger)
+
+
+def refresh_leave_allocation_balances(ledger):
+	"""Rebuilds balances of allocations overlapping the ledger entry"""
+	from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+		update_leave_allocation_balances,
+	)
+
+	update_leave_allocation_balances(
+		ledger.employee, ledger.leave_type, ledger.from_date, ledger.to_date
+	)
 
 
 def get_previous_expiry_ledger_entry(ledger):
@@ -117,51 +152,191 @@ def process_expired_allocation():
 	        create a separate leave expiry entry against each entry of carry forwarded and non carry forwarded leaves
 	Case 2: leave type has no specific expiry period for carry forwarded leaves
 	        and there is no carry forwarded leave allocation, create a single expiry against the remaining leaves.
+
+	Only allocation entries that ended or were created since the last run are considered,
+	the time of the run is tracked in HR Settings.
 	"""
+	processed_on = now()
+	last_processed_on = frappe.db.get_single_value("HR Settings", "leave_expiry_processed_on")
+
+	expired_allocations = get_expired_allocations(today(), last_processed_on)
+	for idx in range(0, len(expired_allocations), EXPIRY_BATCH_SIZE):
+		create_expiry_ledger_entries(expired_allocations[idx : idx + EXPIRY_BATCH_SIZE])
+
+	frappe.db.set_single_value("HR Settings", "leave_expiry_processed_on", processed_on)
 
+
+def get_expired_allocations(date, last_processed_on=None) -> list[dict]:
+	"""Returns allocation entries ending before the date that have not been expired yet,
+	i.e. there is no other entry of the allocation for the same (carry forwarded) leaves"""
 	# fetch leave type records that has carry forwarded leaves expiry
-	leave_type_records = frappe.db.get_values(
-		"Leave Type", filters={"expire_carry_forwarded_leaves_after_days": (">", 0)}, fieldname=["name"]
+	leave_types = frappe.get_all(
+		"Leave Type", filters={"expire_carry_forwarded_leaves_after_days": (">", 0)}, pluck="name"
 	)
 
-	leave_type = [record[0] for record in leave_type_records] or [""]
-
-	# fetch non expired leave ledger entry of transaction_type allocation
-	expire_allocation = frappe.db.sql(
-		"""
-		SELECT
-			leaves, to_date, employee, leave_type,
-			is_carry_forward, transaction_name as name, transaction_type
-		FROM `tabLeave Ledger Entry` l
-		WHERE (NOT EXISTS
-			(SELECT name
-				FROM `tabLeave Ledger Entry`
-				WHERE
-					transaction_name = l.transaction_name
-					AND transaction_type = 'Leave Allocation'
-					AND name<>l.name
-					AND docstatus = 1
-					AND (
-						is_carry_forward=l.is_carry_forward
-						OR (is_carry_forward = 0 AND leave_type not in %s)
-			)))
-			AND transaction_type = 'Leave Allocation'
-			AND to_date < %s""",
-		(leave_type, today()),
-		as_dict=1,
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	OtherEntry = frappe.qb.DocType("Leave Ledger Entry").as_("other_entry")
+
+	query = (
+		frappe.qb.from_(Ledger)
+		.left_join(OtherEntry)
+		.on(
+			(OtherEntry.transaction_name == Ledger.transaction_name)
+			& (OtherEntry.transaction_type == "Leave Allocation")
+			& (OtherEntry.name != Ledger.name)
+			& (OtherEntry.docstatus == 1)
+			& (
+				(OtherEntry.is_carry_forward == Ledger.is_carry_forward)
+				| ((OtherEntry.is_carry_forward == 0) & Ledger.leave_type.notin(leave_types or [""]))
+			)
+		)
+		.select(
+			Ledger.transaction_name.as_("name"),
+			Ledger.employee,
+			Ledger.employee_name,
+			Ledger.leave_type,
+			Ledger.company,
+			Ledger.leaves,
+			Ledger.to_date,
+			Ledger.is_carry_forward,
+		)
+		.where(
+			(Ledger.transaction_type == "Leave Allocation")
+			& (Ledger.docstatus == 1)
+			& (Ledger.to_date < date)
+			& (OtherEntry.name.isnull())
+		)
+		# expiry of earlier allocations is considered in the remaining leaves of the later ones
+		.orderby(Ledger.employee)
+		.orderby(Ledger.leave_type)
+		.orderby(Ledger.to_date)
 	)
 
-	if expire_allocation:
-		create_expiry_ledger_entry(expire_allocation)
+	if last_processed_on:
+		query = query.where(
+			(Ledger.to_date >= getdate(last_processed_on)) | (Ledger.creation >= last_processed_on)
+		)
+
+	return query.run(as_dict=True)
 
 
-def create_expiry_ledger_entry(allocations):
-	"""Create ledger entry for expired allocation"""
+def create_expiry_ledger_entries(allocations: list[dict]) -> None:
+	"""Creates expiry ledger entries for the allocations in bulk and marks non carry forwarded
+	allocations as expired, see `expire_allocation`"""
+	precision = frappe.get_precision("Leave Ledger Entry", "leaves")
+	leaves_by_date = get_leaves_by_date(
+		[allocation for allocation in allocations if not allocation.is_carry_forward]
+	)
+
+	entries, expired_allocations = [], []
 	for allocation in allocations:
+		key = (allocation.employee, allocation.leave_type)
 		if allocation.is_carry_forward:
-			expire_carried_forward_allocation(allocation)
+			# expire all carry forwarded leaves
+			leaves = flt(allocation.leaves)
+			if leaves <= 0:
+				continue
 		else:
-			expire_allocation(allocation)
+			expired_allocations.append(allocation.name)
+			leaves = flt(
+				sum(
+					leaves
+					for to_date, leaves in leaves_by_date.get(key, {}).items()
+					if to_date <= allocation.to_date
+				),
+				precision,
+			)
+			# allows expired leaves entry to be created/reverted
+			if not leaves:
+				continue
+
+		entries.append(
+			frappe._dict(
+				employee=allocation.employee,
+				employee_name=allocation.employee_name,
+				leave_type=allocation.leave_type,
+				transaction_type="Leave Allocation",
+				transaction_name=allocation.name,
+				leaves=leaves * -1,
+				from_date=allocation.to_date,
+				to_date=allocation.to_date,
+				is_carry_forward=allocation.is_carry_forward,
+				is_expired=1,
+				company=allocation.company,
+			)
+		)
+
+		dates = leaves_by_date.setdefault(key, {})
+		dates[allocation.to_date] = flt(dates.get(allocation.to_date)) - leaves
+
+	# expired entries are not part of allocation balances, no need to rebuild them
+	insert_leave_ledger_entries(entries)
+
+	if expired_allocations:
+		LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+		(
+			frappe.qb.update(LeaveAllocation)
+			.set(LeaveAllocation.expired, 1)
+			.where(LeaveAllocation.name.isin(expired_allocations))
+		).run()
+
+
+def get_leaves_by_date(allocations: list[dict]) -> dict:
+	"""Returns leaves in the ledger for the employees and leave types of the allocations
+	by the end date of the entries, see `get_remaining_leaves`"""
+	if not allocations:
+		return {}
+
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	entries = (
+		frappe.qb.from_(Ledger)
+		.select(Ledger.employee, Ledger.leave_type, Ledger.to_date, Sum(Ledger.leaves).as_("leaves"))
+		.where(
+			(Ledger.docstatus == 1)
+			& (Ledger.employee.isin(list({allocation.employee for allocation in allocations})))
+			& (Ledger.leave_type.isin(list({allocation.leave_type for allocation in allocations})))
+			& (Ledger.to_date <= max(allocation.to_date for allocation in allocations))
+		)
+		.groupby(Ledger.employee, Ledger.leave_type, Ledger.to_date)
+	).run(as_dict=True)
+
+	leaves_by_date = {}
+	for entry in entries:
+		leaves_by_date.setdefault((entry.employee, entry.leave_type), {})[entry.to_date] = flt(
+			entry.leaves
+		)
+
+	return leaves_by_date
+
+
+def insert_leave_ledger_entries(entries: list[dict]) -> None:
+	"""Inserts submitted ledger entries in bulk, without running validations and hooks of the entries"""
+	timestamp, user = now(), frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Leave Ledger Entry",
+		fields=[
+			"name",
+			*LEDGER_ENTRY_FIELDS,
+			"docstatus",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				*(entry.get(field) or default for field, default in LEDGER_ENTRY_FIELDS.items()),
+				1,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for entry in entries
+		],
+	)
 
 
 def get_remaining_leaves(allocation):
@@ -200,28 +375,6 @@ def expire_allocation(allocation, expiry_date=None):
 	frappe.db.set_value("Leave Allocation", allocation.name, "expired", 1)
 
 
-def expire_carried_forward_allocation(allocation):
-	"""Expires remaining leaves in the on carried forward allocation"""
-	from hrms.hr.doctype.leave_application.leave_application import get_leaves_for_period
-
-	leaves_taken = get_leaves_for_period(
-		allocation.employee,
-		allocation.leave_type,
-		allocation.from_date,
-		allocation.to_date,
-		skip_expired_leaves=False,
-	)
-	leaves = flt(allocation.leaves) + flt(leaves_taken)
-
-	# allow expired leaves entry to be created
-	if leaves > 0:
-		args = frappe._dict(
-			transaction_name=allocation.name,
-			transaction_type="Leave Allocation",
-			leaves=allocation.leaves * -1,
-			is_carry_forward=allocation.is_carry_forward,
-			is_expired=1,
-			from_date=allocation.to_date,
-			to_date=allocation.to_date,
-		)
-		create_leave_ledger_entry(allocation, args)
+def on_doctype_update():
+	frappe.db.add_index("Leave Ledger Entry", ["transaction_type", "transaction_name"])
+	frappe.db.add_index("Leave Ledger Entry", ["transaction_type", "to_date"])
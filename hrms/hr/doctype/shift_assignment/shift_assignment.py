@@ -2,7 +2,8 @@
 # For license information, please see license.txt
 
 
-from datetime import datetime, timedelta
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
 from typing import Dict, List
 
 import frappe
@@ -13,6 +14,8 @@ from frappe.utils import add_days, cstr, get_link_to_form, get_time, getdate, no
 
 from hrms.hr.utils import validate_active_employee
 
+EMPLOYEE_SHIFT_INDEX = "employee_shift_index"
+
 
 class OverlappingShiftError(frappe.ValidationError):
 	pass
@@ -26,6 +29,24 @@ class ShiftAssignment(Document):
 		if self.end_date:
 			self.validate_from_to_dates("start_date", "end_date")
 
+	def on_update(self):
+		clear_employee_shift_index(self.employee)
+
+	def on_submit(self):
+		from hrms.hr.doctype.shift_type.shift_type import rewind_auto_attendance_checkpoints
+
+		# absentees need to be marked again for backdated assignments
+		rewind_auto_attendance_checkpoints(self.shift_type, date=self.start_date)
+
+	def on_update_after_submit(self):
+		clear_employee_shift_index(self.employee)
+
+	def on_cancel(self):
+		clear_employee_shift_index(self.employee)
+
+	def on_trash(self):
+		clear_employee_shift_index(self.employee)
+
 	def validate_overlapping_shifts(self):
 		overlapping_dates = self.get_overlapping_dates()
 		if len(overlapping_dates):
@@ -263,31 +284,109 @@ def _adjust_overlapping_shifts(shifts: dict):
 def get_shifts_for_date(employee: str, for_timestamp: datetime) -> List[Dict[str, str]]:
 	"""Returns list of shifts with details for given date"""
 	for_date = for_timestamp.date()
+	# for midnight shifts, valid assignments are upto 1 day prior
 	prev_day = add_days(for_date, -1)
 
-	assignment = frappe.qb.DocType("Shift Assignment")
-	return (
-		frappe.qb.from_(assignment)
-		.select(assignment.name, assignment.shift_type, assignment.start_date, assignment.end_date)
-		.where(
-			(assignment.employee == employee)
-			& (assignment.docstatus == 1)
-			& (assignment.status == "Active")
-			& (assignment.start_date <= for_date)
-			& (
-				Criterion.any(
-					[
-						assignment.end_date.isnull(),
-						(
-							assignment.end_date.isnotnull()
-							# for midnight shifts, valid assignments are upto 1 day prior
-							& (prev_day <= assignment.end_date)
-						),
-					]
-				)
-			)
+	index = get_employee_shift_index(employee)
+	shifts = []
+
+	# walk back from the last assignment starting on or before the date until
+	# no earlier assignment can end on or after the previous day
+	for idx in range(bisect_right(index.start_dates, for_date) - 1, -1, -1):
+		if index.max_end_dates[idx] < prev_day:
+			break
+
+		assignment = index.assignments[idx]
+		if not assignment.end_date or prev_day <= assignment.end_date:
+			shifts.append(frappe._dict(assignment))
+
+	return shifts
+
+
+def get_employee_shift_index(employee: str) -> dict:
+	"""Returns active shift assignments of the employee sorted by start date along with the default shift.
+	Cached per employee and cleared whenever a Shift Assignment, Shift Type or the default shift changes"""
+	return frappe.cache.hget(
+		EMPLOYEE_SHIFT_INDEX, employee, generator=lambda: build_employee_shift_index(employee)
+	)
+
+
+def build_employee_shift_index(employee: str) -> dict:
+	assignments = frappe.get_all(
+		"Shift Assignment",
+		filters={"employee": employee, "docstatus": 1, "status": "Active"},
+		fields=["name", "shift_type", "start_date", "end_date"],
+		order_by="start_date asc",
+	)
+	default_shift = frappe.db.get_value("Employee", employee, "default_shift")
+
+	return make_employee_shift_index(assignments, default_shift)
+
+
+def prime_employee_shift_index(employees: list[str]) -> None:
+	"""Builds shift indexes of all employees missing from the cache in a single query,
+	used before resolving shifts for a batch of checkins"""
+	employees = [
+		employee
+		for employee in set(employees)
+		if frappe.cache.hget(EMPLOYEE_SHIFT_INDEX, employee) is None
+	]
+	if not employees:
+		return
+
+	assignments = frappe.get_all(
+		"Shift Assignment",
+		filters={"employee": ("in", employees), "docstatus": 1, "status": "Active"},
+		fields=["employee", "name", "shift_type", "start_date", "end_date"],
+		order_by="start_date asc",
+	)
+	default_shifts = dict(
+		frappe.get_all(
+			"Employee", filters={"name": ("in", employees)}, fields=["name", "default_shift"], as_list=True
+		)
+	)
+
+	assignments_by_employee = {}
+	for assignment in assignments:
+		assignments_by_employee.setdefault(assignment.pop("employee"), []).append(assignment)
+
+	for employee in employees:
+		frappe.cache.hset(
+			EMPLOYEE_SHIFT_INDEX,
+			employee,
+			make_employee_shift_index(
+				assignments_by_employee.get(employee, []), default_shifts.get(employee)
+			),
 		)
-	).run(as_dict=True)
+
+
+def make_employee_shift_index(assignments: list[dict], default_shift: str | None) -> dict:
+	max_end_dates = []
+	max_end_date = date.min
+	for assignment in assignments:
+		max_end_date = max(max_end_date, assignment.end_date or date.max)
+		max_end_dates.append(max_end_date)
+
+	return frappe._dict(
+		default_shift=default_shift,
+		assignments=assignments,
+		start_dates=[assignment.start_date for assignment in assignments],
+		# latest end date among assignments up to each position, open ended assignments never end
+		max_end_dates=max_end_dates,
+	)
+
+
+def clear_employee_shift_index(employee: str | None = None) -> None:
+	if employee:
+		frappe.cache.hdel(EMPLOYEE_SHIFT_INDEX, employee)
+	else:
+		frappe.cache.delete_value(EMPLOYEE_SHIFT_INDEX)
+
+
+def invalidate_employee_shift_index(doc, method=None):
+	"""Clears the shift index of an employee whose default shift has changed"""
+	if doc.has_value_changed("default_shift"):
+		clear_employee_shift_index(doc.name)
 
 
 def get_shift_for_timestamp(employee: str, for_timestamp: datetime) -> Dict:
@@ -316,7 +415,7 @@ def get_employee_shift(
 	shift_details = get_shift_for_timestamp(employee, for_timestamp)
 
 	# if shift assignment is not found, consider default shift
-	default_shift = frappe.db.get_value("Employee", employee, "default_shift", cache=True)
+	default_shift = get_employee_shift_index(employee).default_shift
 	if not shift_details and consider_default_shift:
 		shift_details = get_shift_details(default_shift, for_timestamp)
 
@@ -348,21 +447,13 @@ def get_prev_or_next_shift(
 			if shift_details:
 				break
 	else:
-		direction = "<" if next_shift_direction == "reverse" else ">"
-		sort_order = "desc" if next_shift_direction == "reverse" else "asc"
-		dates = frappe.db.get_all(
-			"Shift Assignment",
-			["start_date", "end_date"],
-			{
-				"employee": employee,
-				"start_date": (direction, for_timestamp.date()),
-				"docstatus": 1,
-				"status": "Active",
-			},
-			as_list=True,
-			limit=MAX_DAYS,
-			order_by="start_date " + sort_order,
-		)
+		index = get_employee_shift_index(employee)
+		if next_shift_direction == "reverse":
+			assignments = index.assignments[: bisect_left(index.start_dates, for_timestamp.date())][::-1]
+		else:
+			assignments = index.assignments[bisect_right(index.start_dates, for_timestamp.date()) :]
+
+		dates = [(assignment.start_date, assignment.end_date) for assignment in assignments[:MAX_DAYS]]
 
 		if dates:
 			for date in dates:
@@ -9,8 +9,10 @@ from erpnext.setup.doctype.employee.test_employee import make_employee
 
 from hrms.hr.doctype.shift_assignment.shift_assignment import (
 	OverlappingShiftError,
+	clear_employee_shift_index,
 	get_actual_start_end_datetime_of_shift,
 	get_events,
+	get_shifts_for_date,
 )
 from hrms.hr.doctype.shift_type.test_shift_type import make_shift_assignment, setup_shift_type
 
@@ -21,6 +23,7 @@ class TestShiftAssignment(FrappeTestCase):
 	def setUp(self):
 		frappe.db.delete("Shift Assignment")
 		frappe.db.delete("Shift Type")
+		clear_employee_shift_index()
 
 	def test_make_shift_assignment(self):
 		setup_shift_type(shift_type="Day Shift")
@@ -245,3 +248,29 @@ class TestShiftAssignment(FrappeTestCase):
 		self.assertEqual(checkin.shift_type, checkout.shift_type)
 		self.assertEqual(checkin.actual_start.date(), today)
 		self.assertEqual(checkout.actual_end.date(), today)
+
+	def test_shifts_for_date_from_shift_index(self):
+		employee = make_employee("test_shift_assignment@example.com", company="_Test Company")
+		today = getdate()
+
+		day_shift = setup_shift_type(shift_type="Shift 1", start_time="08:00:00", end_time="12:00:00")
+		night_shift = setup_shift_type(
+			shift_type="Shift 2", start_time="22:00:00", end_time="02:00:00"
+		)
+		make_shift_assignment(day_shift.name, employee, add_days(today, -10), add_days(today, -5))
+		night_assignment = make_shift_assignment(
+			night_shift.name, employee, add_days(today, -1), add_days(today, -1)
+		)
+		day_assignment = make_shift_assignment(day_shift.name, employee, today)
+
+		# assignments ending the previous day are considered for midnight shifts
+		shifts = get_shifts_for_date(employee, get_datetime(f"{today} 01:00:00"))
+		self.assertEqual({d.name for d in shifts}, {night_assignment.name, day_assignment.name})
+
+		shifts = get_shifts_for_date(employee, get_datetime(f"{add_days(today, 1)} 09:00:00"))
+		self.assertEqual([d.name for d in shifts], [day_assignment.name])
+
+		# index is invalidated on cancellation
+		day_assignment.cancel()
+		shifts = get_shifts_for_date(employee, get_datetime(f"{add_days(today, 1)} 09:00:00"))
+		self.assertEqual(shifts, [])
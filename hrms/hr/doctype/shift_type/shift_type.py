@@ -6,23 +6,45 @@ import itertools
 from datetime import datetime, timedelta
 
 import frappe
+from frappe import _
 from frappe.model.document import Document
-from frappe.utils import cint, get_datetime, get_time, getdate
+from frappe.utils import add_days, cint, get_datetime, get_time, getdate
 
 from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employee
-from erpnext.setup.doctype.holiday_list.holiday_list import is_holiday
 
-from hrms.hr.doctype.attendance.attendance import mark_attendance
+from hrms.hr.doctype.attendance.attendance import bulk_insert_attendance
 from hrms.hr.doctype.employee_checkin.employee_checkin import (
 	calculate_working_hours,
 	mark_attendance_and_link_log,
 )
-from hrms.hr.doctype.shift_assignment.shift_assignment import get_employee_shift, get_shift_details
+from hrms.hr.doctype.shift_assignment.shift_assignment import (
+	clear_employee_shift_index,
+	get_employee_shift,
+	get_shift_details,
+	has_overlapping_timings,
+	prime_employee_shift_index,
+)
 from hrms.utils import get_date_range
-from hrms.utils.holiday_list import get_holiday_dates_between
+from hrms.utils.holiday_list import get_holiday_dates_between, is_holiday
+
+AUTO_ATTENDANCE_TIMEOUT = 3000
+ABSENT_MARKING_BATCH_SIZE = 500
 
 
 class ShiftType(Document):
+	def validate(self):
+		if self.has_value_changed("process_attendance_after"):
+			# reprocess everything after the new date
+			self.last_processed_shift_start = None
+			self.absent_marked_upto = None
+
+	# the shift index only holds shift type names, timings are always read from the Shift Type itself
+	def after_rename(self, old, new, merge):
+		clear_employee_shift_index()
+
+	def on_trash(self):
+		clear_employee_shift_index()
+
 	@frappe.whitelist()
 	def process_auto_attendance(self):
 		if (
@@ -32,41 +54,78 @@ class ShiftType(Document):
 		):
 			return
 
+		self.process_employee_checkins()
+		self.mark_absent_for_assigned_employees()
+
+	def commit_progress(self):
+		"""Commits checkpoints when processing in the background job, so that an interrupted run resumes
+		from the last checkpoint. Manual runs and tests keep everything in the request's transaction"""
+		if self.flags.commit_progress:
+			frappe.db.commit()  # nosemgrep
+
+	def process_employee_checkins(self):
+		"""Marks attendance from checkins shift by shift. Progress is checkpointed after every shift so that
+		an interrupted run resumes from the last processed shift instead of `process_attendance_after`"""
 		logs = self.get_employee_checkins()
 
-		for key, group in itertools.groupby(logs, key=lambda x: (x["employee"], x["shift_start"])):
-			single_shift_logs = list(group)
-			attendance_date = single_shift_logs[0].shift_actual_start.date()
-			employee = key[0]
-
-			if not self.should_mark_attendance(employee, attendance_date):
-				continue
-
-			(
-				attendance_status,
-				working_hours,
-				late_entry,
-				early_exit,
-				in_time,
-				out_time,
-			) = self.get_attendance(single_shift_logs)
-
-			mark_attendance_and_link_log(
-				single_shift_logs,
-				attendance_status,
-				attendance_date,
-				working_hours,
-				late_entry,
-				early_exit,
-				in_time,
-				out_time,
-				self.name,
-			)
+		for shift_start, shift_logs in itertools.groupby(logs, key=lambda x: x["shift_start"]):
+			for employee, group in itertools.groupby(shift_logs, key=lambda x: x["employee"]):
+				single_shift_logs = list(group)
+				attendance_date = single_shift_logs[0].shift_actual_start.date()
 
-		for employee in self.get_assigned_employees(self.process_attendance_after, True):
-			self.mark_absent_for_dates_with_no_attendance(employee)
+				if not self.should_mark_attendance(employee, attendance_date):
+					continue
+
+				(
+					attendance_status,
+					working_hours,
+					late_entry,
+					early_exit,
+					in_time,
+					out_time,
+				) = self.get_attendance(single_shift_logs)
+
+				mark_attendance_and_link_log(
+					single_shift_logs,
+					attendance_status,
+					attendance_date,
+					working_hours,
+					late_entry,
+					early_exit,
+					in_time,
+					out_time,
+					self.name,
+				)
+
+			self.db_set("last_processed_shift_start", shift_start, update_modified=False)
+			self.commit_progress()
+
+	def mark_absent_for_assigned_employees(self):
+		"""Marks absentees upto the last shift before `last_sync_of_checkin` in batches of employees.
+		Every employee is processed upto the same end date, so dates upto `absent_marked_upto`
+		are skipped in the next run"""
+		end_date = self.get_absent_marking_end_date()
+
+		employees = list(self.get_assigned_employees(self.process_attendance_after, True))
+		for idx in range(0, len(employees), ABSENT_MARKING_BATCH_SIZE):
+			self.mark_absent_for_employees(employees[idx : idx + ABSENT_MARKING_BATCH_SIZE], end_date)
+			self.commit_progress()
+
+		if not self.absent_marked_upto or getdate(self.absent_marked_upto) < end_date:
+			self.db_set("absent_marked_upto", end_date, update_modified=False)
+			self.commit_progress()
 
 	def get_employee_checkins(self) -> list[dict]:
+		filters = {
+			"skip_auto_attendance": 0,
+			"attendance": ("is", "not set"),
+			"time": (">=", self.process_attendance_after),
+			"shift_actual_end": ("<", self.last_sync_of_checkin),
+			"shift": self.name,
+		}
+		if self.last_processed_shift_start:
+			filters["shift_start"] = (">=", self.last_processed_shift_start)
+
 		return frappe.get_all(
 			"Employee Checkin",
 			fields=[
@@ -81,14 +140,8 @@ class ShiftType(Document):
 				"shift_actual_end",
 				"device_id",
 			],
-			filters={
-				"skip_auto_attendance": 0,
-				"attendance": ("is", "not set"),
-				"time": (">=", self.process_attendance_after),
-				"shift_actual_end": ("<", self.last_sync_of_checkin),
-				"shift": self.name,
-			},
-			order_by="employee,time",
+			filters=filters,
+			order_by="shift_start,employee,time",
 		)
 
 	def get_attendance(self, logs):
@@ -134,28 +187,91 @@ class ShiftType(Document):
 		"""Marks Absents for the given employee on working days in this shift that have no attendance marked.
 		The Absent status is marked starting from 'process_attendance_after' or employee creation date.
 		"""
-		start_time = get_time(self.start_time)
-		dates = self.get_dates_for_attendance(employee)
+		self.mark_absent_for_employees([employee])
+
+	def mark_absent_for_employees(self, employees: list[str], end_date=None) -> list[str]:
+		"""Marks Absents for a batch of employees using set-based queries and bulk inserts"""
+		return bulk_insert_attendance(
+			self.get_absentees(employees, end_date),
+			comment=_("Employee was marked Absent due to missing Employee Checkins."),
+		)
 
-		for date in dates:
-			timestamp = datetime.combine(date, start_time)
-			shift_details = get_employee_shift(employee, timestamp, True)
+	def get_absentees(self, employees: list[str], end_date=None) -> list[dict]:
+		"""Returns attendance records to be marked absent for working days in this shift without attendance.
+		If `end_date` is passed, every employee is checked upto that date"""
+		prime_employee_shift_index(employees)
+		employee_details = self.get_employee_details(employees)
 
-			if shift_details and shift_details.shift_type.name == self.name:
-				attendance = mark_attendance(employee, date, "Absent", self.name)
+		date_ranges = {}
+		for employee, details in employee_details.items():
+			dates = self.get_start_and_end_dates(employee, details, end_date)
+			# no shift assignment found, no need to process absent attendance records
+			if dates[0] is not None:
+				date_ranges[employee] = dates
 
-				if not attendance:
+		if not date_ranges:
+			return []
+
+		from_date = min(start_date for start_date, end_date in date_ranges.values())
+		to_date = max(end_date for start_date, end_date in date_ranges.values())
+
+		holiday_dates = {}
+		for holiday_list in {self.get_holiday_list(employee_details[e]) for e in date_ranges}:
+			holiday_dates[holiday_list] = set(
+				get_holiday_dates_between(holiday_list, from_date, to_date) if holiday_list else []
+			)
+		marked_attendance_dates = self.get_marked_attendance_dates_for_employees(
+			list(date_ranges), from_date, to_date
+		)
+
+		start_time = get_time(self.start_time)
+		absentees = []
+		for employee, (start_date, end_date) in date_ranges.items():
+			details = employee_details[employee]
+			# skip marking absent on holidays and dates with attendance
+			skip_dates = holiday_dates[self.get_holiday_list(details)] | marked_attendance_dates.get(
+				employee, set()
+			)
+
+			for date in get_date_range(start_date, end_date):
+				date = getdate(date)
+				if date in skip_dates:
 					continue
 
-				frappe.get_doc(
-					{
-						"doctype": "Comment",
-						"comment_type": "Comment",
-						"reference_doctype": "Attendance",
-						"reference_name": attendance,
-						"content": frappe._("Employee was marked Absent due to missing Employee Checkins."),
-					}
-				).insert(ignore_permissions=True)
+				shift_details = get_employee_shift(employee, datetime.combine(date, start_time), True)
+				if shift_details and shift_details.shift_type.name == self.name:
+					absentees.append(
+						frappe._dict(
+							employee=employee,
+							employee_name=details.employee_name,
+							company=details.company,
+							department=details.department,
+							attendance_date=date,
+							status="Absent",
+							shift=self.name,
+						)
+					)
+
+		return absentees
+
+	def get_employee_details(self, employees: list[str]) -> dict:
+		return {
+			employee.name: employee
+			for employee in frappe.get_all(
+				"Employee",
+				filters={"name": ("in", employees)},
+				fields=[
+					"name",
+					"employee_name",
+					"company",
+					"department",
+					"holiday_list",
+					"date_of_joining",
+					"relieving_date",
+					"creation",
+				],
+			)
+		}
 
 	def get_dates_for_attendance(self, employee: str) -> set[str]:
 		start_date, end_date = self.get_start_and_end_dates(employee)
@@ -176,40 +292,66 @@ class ShiftType(Document):
 
 		return set(date_range) - set(holiday_dates) - set(marked_attendance_dates)
 
-	def get_start_and_end_dates(self, employee):
+	def get_start_and_end_dates(self, employee, employee_details: dict | None = None, end_date=None):
 		"""Returns start and end dates for checking attendance and marking absent
 		return: start date = max of `process_attendance_after` and DOJ
-		return: end date = min of shift before `last_sync_of_checkin` and Relieving Date
+		return: end date = min of `end_date` or the shift before `last_sync_of_checkin` and Relieving Date
 		"""
-		date_of_joining, relieving_date, employee_creation = frappe.get_cached_value(
-			"Employee", employee, ["date_of_joining", "relieving_date", "creation"]
-		)
+		if employee_details:
+			date_of_joining, relieving_date, employee_creation = (
+				employee_details.date_of_joining,
+				employee_details.relieving_date,
+				employee_details.creation,
+			)
+		else:
+			date_of_joining, relieving_date, employee_creation = frappe.get_cached_value(
+				"Employee", employee, ["date_of_joining", "relieving_date", "creation"]
+			)
 
 		if not date_of_joining:
 			date_of_joining = employee_creation.date()
 
 		start_date = max(getdate(self.process_attendance_after), date_of_joining)
-		end_date = None
+		if self.absent_marked_upto:
+			# resume from the last run
+			start_date = max(start_date, add_days(self.absent_marked_upto, 1))
 
-		shift_details = get_shift_details(self.name, get_datetime(self.last_sync_of_checkin))
-		last_shift_time = (
-			shift_details.actual_end if shift_details else get_datetime(self.last_sync_of_checkin)
-		)
-
-		# check if shift is found for 1 day before the last sync of checkin
-		# absentees are auto-marked 1 day after the shift to wait for any manual attendance records
-		prev_shift = get_employee_shift(employee, last_shift_time - timedelta(days=1), True, "reverse")
-		if prev_shift and prev_shift.shift_type.name == self.name:
-			end_date = (
-				min(prev_shift.start_datetime.date(), relieving_date)
-				if relieving_date
-				else prev_shift.start_datetime.date()
-			)
+		if end_date:
+			# shift of each date is checked while marking absentees
+			end_date = min(getdate(end_date), relieving_date) if relieving_date else getdate(end_date)
 		else:
-			# no shift found
+			# check if shift is found for 1 day before the last sync of checkin
+			# absentees are auto-marked 1 day after the shift to wait for any manual attendance records
+			prev_shift = get_employee_shift(
+				employee, self.get_last_shift_time() - timedelta(days=1), True, "reverse"
+			)
+			if prev_shift and prev_shift.shift_type.name == self.name:
+				end_date = (
+					min(prev_shift.start_datetime.date(), relieving_date)
+					if relieving_date
+					else prev_shift.start_datetime.date()
+				)
+			else:
+				# no shift found
+				return None, None
+
+		if start_date > end_date:
 			return None, None
 		return start_date, end_date
 
+	def get_last_shift_time(self) -> datetime:
+		shift_details = get_shift_details(self.name, get_datetime(self.last_sync_of_checkin))
+		return shift_details.actual_end if shift_details else get_datetime(self.last_sync_of_checkin)
+
+	def get_absent_marking_end_date(self):
+		"""Returns the start date of the last shift that ended a day before the last sync of checkin,
+		which is the latest date absentees can be marked for in this run"""
+		timestamp = self.get_last_shift_time() - timedelta(days=1)
+		shift_details = get_shift_details(self.name, timestamp)
+		if shift_details.start_datetime > timestamp:
+			return add_days(shift_details.start_datetime.date(), -1)
+		return shift_details.start_datetime.date()
+
 	def get_marked_attendance_dates_between(
 		self, employee: str, start_date: str, end_date: str
 	) -> list[str]:
@@ -225,6 +367,35 @@ class ShiftType(Document):
 			)
 		).run(pluck=True)
 
+	def get_marked_attendance_dates_for_employees(
+		self, employees: list[str], start_date, end_date
+	) -> dict[str, set]:
+		"""Returns dates with attendance for this shift, without a shift or for an overlapping shift per employee"""
+		Attendance = frappe.qb.DocType("Attendance")
+		attendance = (
+			frappe.qb.from_(Attendance)
+			.select(Attendance.employee, Attendance.attendance_date, Attendance.shift)
+			.where(
+				(Attendance.employee.isin(employees))
+				& (Attendance.docstatus < 2)
+				& (Attendance.attendance_date.between(start_date, end_date))
+			)
+		).run(as_dict=True)
+
+		overlapping_shifts = {}
+		marked_dates = {}
+		for record in attendance:
+			if record.shift and record.shift != self.name:
+				# absent can't be marked if the other shift overlaps with this one
+				if record.shift not in overlapping_shifts:
+					overlapping_shifts[record.shift] = has_overlapping_timings(self.name, record.shift)
+				if not overlapping_shifts[record.shift]:
+					continue
+
+			marked_dates.setdefault(record.employee, set()).add(getdate(record.attendance_date))
+
+		return marked_dates
+
 	def get_assigned_employees(self, from_date=None, consider_default_shift=False):
 		filters = {"shift_type": self.name, "docstatus": "1", "status": "Active"}
 		if from_date:
@@ -261,9 +432,18 @@ class ShiftType(Document):
 
 		return list(set(default_shift_employees) - set(active_shift_assignments))
 
-	def get_holiday_list(self, employee: str) -> str:
-		holiday_list_name = self.holiday_list or get_holiday_list_for_employee(employee, False)
-		return holiday_list_name
+	def get_holiday_list(self, employee: str | dict) -> str:
+		"""Returns the holiday list of the shift or the employee. Accepts employee details
+		with `holiday_list` and `company` to avoid a lookup per employee"""
+		if self.holiday_list:
+			return self.holiday_list
+
+		if isinstance(employee, dict):
+			return employee.holiday_list or frappe.get_cached_value(
+				"Company", employee.company, "default_holiday_list"
+			)
+
+		return get_holiday_list_for_employee(employee, False)
 
 	def should_mark_attendance(self, employee: str, attendance_date: str) -> bool:
 		"""Determines whether attendance should be marked on holidays or not"""
@@ -279,7 +459,44 @@ class ShiftType(Document):
 
 
 def process_auto_attendance_for_all_shifts():
+	"""Enqueues auto attendance for every shift type as a separate job so that shifts are processed in parallel"""
 	shift_list = frappe.get_all("Shift Type", filters={"enable_auto_attendance": "1"}, pluck="name")
 	for shift in shift_list:
-		doc = frappe.get_cached_doc("Shift Type", shift)
-		doc.process_auto_attendance()
+		frappe.enqueue(
+			process_auto_attendance_for_shift,
+			queue="long",
+			timeout=AUTO_ATTENDANCE_TIMEOUT,
+			job_id=f"process_auto_attendance_for_shift::{shift}",
+			deduplicate=True,
+			shift_type=shift,
+		)
+
+
+def process_auto_attendance_for_shift(shift_type: str):
+	shift = frappe.get_doc("Shift Type", shift_type)
+	shift.flags.commit_progress = True
+	shift.process_auto_attendance()
+
+
+def rewind_auto_attendance_checkpoints(shift_type: str, shift_start=None, date=None):
+	"""Moves the checkpoints of the shift type back when checkins or shift assignments
+	are added for shifts that were already processed"""
+	checkpoints = frappe.db.get_value(
+		"Shift Type", shift_type, ["last_processed_shift_start", "absent_marked_upto"], as_dict=True
+	)
+	if not checkpoints:
+		return
+
+	values = {}
+	if (
+		shift_start
+		and checkpoints.last_processed_shift_start
+		and get_datetime(shift_start) < checkpoints.last_processed_shift_start
+	):
+		values["last_processed_shift_start"] = shift_start
+
+	if date and checkpoints.absent_marked_upto and getdate(date) <= checkpoints.absent_marked_upto:
+		values["absent_marked_upto"] = add_days(date, -1)
+
+	if values:
+		frappe.db.set_value("Shift Type", shift_type, values, update_modified=False)
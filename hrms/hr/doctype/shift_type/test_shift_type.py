@@ -4,12 +4,21 @@ from datetime import datetime, timedelta
 
 import frappe
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import add_days, get_time, get_year_ending, get_year_start, getdate, now_datetime
+from frappe.utils import (
+	add_days,
+	get_datetime,
+	get_time,
+	get_year_ending,
+	get_year_start,
+	getdate,
+	now_datetime,
+)
 
 from erpnext.setup.doctype.employee.test_employee import make_employee
 from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_list
 
 from hrms.hr.doctype.leave_application.test_leave_application import get_first_sunday
+from hrms.hr.doctype.shift_assignment.shift_assignment import clear_employee_shift_index
 from hrms.payroll.doctype.salary_slip.test_salary_slip import make_holiday_list
 
 
@@ -19,6 +28,7 @@ class TestShiftType(FrappeTestCase):
 		frappe.db.delete("Shift Assignment")
 		frappe.db.delete("Employee Checkin")
 		frappe.db.delete("Attendance")
+		clear_employee_shift_index()
 
 		from_date = get_year_start(getdate())
 		to_date = get_year_ending(getdate())
@@ -48,6 +58,40 @@ class TestShiftType(FrappeTestCase):
 		)
 		self.assertEqual(attendance.status, "Present")
 
+	def test_auto_attendance_checkpoints(self):
+		from hrms.hr.doctype.employee_checkin.test_employee_checkin import make_checkin
+
+		employee = make_employee("test_employee_checkin@example.com", company="_Test Company")
+		shift_type = setup_shift_type()
+		date = getdate()
+		make_shift_assignment(shift_type.name, employee, date)
+
+		make_checkin(employee, datetime.combine(date, get_time("08:00:00")))
+		make_checkin(employee, datetime.combine(date, get_time("12:00:00")))
+
+		shift_type.process_auto_attendance()
+		shift_type.reload()
+		self.assertEqual(
+			get_datetime(shift_type.last_processed_shift_start),
+			datetime.combine(date, get_time("08:00:00")),
+		)
+		self.assertEqual(getdate(shift_type.absent_marked_upto), date)
+
+		# backdated assignments rewind the absentee checkpoint
+		employee2 = make_employee("test_employee_checkin2@example.com", company="_Test Company")
+		make_shift_assignment(shift_type.name, employee2, add_days(date, -1))
+		self.assertEqual(
+			getdate(frappe.db.get_value("Shift Type", shift_type.name, "absent_marked_upto")),
+			add_days(date, -2),
+		)
+
+		# changing process attendance after resets checkpoints
+		shift_type.reload()
+		shift_type.process_attendance_after = add_days(date, -3)
+		shift_type.save()
+		self.assertIsNone(shift_type.last_processed_shift_start)
+		self.assertIsNone(shift_type.absent_marked_upto)
+
 	def test_mark_attendance_with_different_shift_start_time(self):
 		"""Tests whether attendance is marked correctly if shift configuration is changed midway"""
 		from hrms.hr.doctype.employee_checkin.test_employee_checkin import make_checkin
@@ -307,6 +351,45 @@ class TestShiftType(FrappeTestCase):
 		)
 		self.assertEqual(attendance, "Absent")
 
+	def test_mark_absent_for_employees_in_bulk(self):
+		from hrms.hr.doctype.attendance.attendance import mark_attendance
+
+		shift_type = setup_shift_type(shift_type="Test Absent with no Attendance")
+		date = add_days(getdate(), -1)
+
+		employees = [
+			make_employee(f"test_bulk_absent{idx}@example.com", company="_Test Company")
+			for idx in range(3)
+		]
+		for employee in employees:
+			make_shift_assignment(shift_type.name, employee, date)
+
+		# attendance already marked for the last employee
+		mark_attendance(employees[2], date, "Present")
+
+		shift_type.process_auto_attendance()
+
+		for employee in employees[:2]:
+			attendance = frappe.db.get_value(
+				"Attendance",
+				{"attendance_date": date, "employee": employee, "docstatus": 1},
+				["name", "status", "shift", "company"],
+				as_dict=True,
+			)
+			self.assertEqual(attendance.status, "Absent")
+			self.assertEqual(attendance.shift, shift_type.name)
+			self.assertEqual(attendance.company, "_Test Company")
+			self.assertTrue(
+				frappe.db.exists(
+					"Comment", {"reference_doctype": "Attendance", "reference_name": attendance.name}
+				)
+			)
+
+		attendance = frappe.get_all(
+			"Attendance", {"attendance_date": date, "employee": employees[2]}, pluck="status"
+		)
+		self.assertEqual(attendance, ["Present"])
+
 	def test_do_not_mark_absent_before_shift_actual_end_time(self):
 		"""
 		Tests employee is not marked absent for a shift spanning 2 days
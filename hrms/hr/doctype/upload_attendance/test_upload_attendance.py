@@ -1,6 +1,9 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
+import csv
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 from frappe.utils import getdate
@@ -8,7 +11,12 @@ from frappe.utils import getdate
 import erpnext
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
-from hrms.hr.doctype.upload_attendance.upload_attendance import get_data
+from hrms.hr.doctype.upload_attendance.upload_attendance import (
+	get_data,
+	get_import_rows,
+	import_attendance_chunk,
+	import_attendances,
+)
 
 test_dependencies = ["Holiday List"]
 
@@ -41,3 +49,111 @@ class TestUploadAttendance(FrappeTestCase):
 			self.assertTrue(
 				getdate(row[3]) >= getdate(date_of_joining) and getdate(row[3]) <= getdate(relieving_date)
 			)
+
+	def test_resumable_import_with_error_report(self):
+		employee = make_employee("test_import_attendance@company.com", date_of_joining="2018-01-01")
+		company = frappe.db.get_value("Employee", employee, "company")
+
+		file_url = make_import_file(
+			[
+				["", employee, "", "2018-01-02", "Present", "", company, ""],
+				["", employee, "", "2018-01-03", "Present", "", company, ""],
+				# duplicate
+				["", employee, "", "2018-01-03", "Absent", "", company, ""],
+				["", "_T-Employee-Invalid", "", "2018-01-04", "Present", "", company, ""],
+				["", employee, "", "2018-01-05", "Holiday", "", company, ""],
+			]
+		)
+		rows = list(get_import_rows(file_url))
+		self.assertEqual(len(rows), 5)
+
+		# resume after the first row
+		frappe.db.set_single_value(
+			"Upload Attendance",
+			{
+				"import_file": file_url,
+				"import_status": "Failed",
+				"last_processed_row": rows[0].row_idx,
+				"processed_rows": 1,
+				"total_rows": len(rows),
+				"error_rows": 0,
+				"error_file": None,
+			},
+		)
+		# the import commits every chunk, keep the test transaction uncommitted
+		with patch.object(frappe.db, "commit"):
+			import_attendances()
+
+		state = frappe.db.get_singles_dict("Upload Attendance")
+		self.assertEqual(state.import_status, "Completed")
+		self.assertEqual(state.last_processed_row, rows[-1].row_idx)
+		self.assertEqual(state.processed_rows, 5)
+		self.assertEqual(state.error_rows, 2)
+
+		attendance = frappe.get_all(
+			"Attendance", filters={"employee": employee, "docstatus": 1}, pluck="attendance_date"
+		)
+		self.assertEqual(attendance, [getdate("2018-01-03")])
+
+		with open(frappe.get_site_path(state.error_file.lstrip("/"))) as f:
+			errors = list(csv.reader(f))
+		self.assertEqual([error[0] for error in errors[1:]], [str(rows[2].row_idx), str(rows[3].row_idx)])
+
+		# the error report can be downloaded by users with access to Upload Attendance
+		self.assertTrue(
+			frappe.db.exists(
+				"File",
+				{
+					"file_url": state.error_file,
+					"is_private": 1,
+					"attached_to_doctype": "Upload Attendance",
+				},
+			)
+		)
+
+	def test_import_dates_in_user_date_format(self):
+		employee = make_employee("test_import_attendance@company.com", date_of_joining="2018-01-01")
+		company = frappe.db.get_value("Employee", employee, "company")
+		rows = [
+			frappe._dict(
+				row_idx=idx,
+				name="",
+				employee=employee,
+				attendance_date=attendance_date,
+				status="Present",
+				company=company,
+			)
+			for idx, attendance_date in enumerate(["13-01-2018", "2018-13-45"], start=6)
+		]
+
+		failed = import_attendance_chunk(rows)
+		self.assertEqual([row.row_idx for row in failed], [7])
+		self.assertTrue(
+			frappe.db.exists(
+				"Attendance", {"employee": employee, "attendance_date": "2018-01-13", "docstatus": 1}
+			)
+		)
+
+	def test_import_rows_from_non_utf8_file(self):
+		employee = make_employee("test_import_attendance@company.com", date_of_joining="2018-01-01")
+		file_url = make_import_file(
+			[["", employee, "Café", "2018-01-02", "Present", "", "_Test Company", ""]],
+			encoding="cp1252",
+		)
+
+		rows = list(get_import_rows(file_url))
+		self.assertEqual(len(rows), 1)
+		self.assertEqual(rows[0].employee_name, "Café")
+
+
+def make_import_file(rows, encoding="utf-8"):
+	file_url = "/private/files/test_attendance_import_{0}.csv".format(frappe.generate_hash(length=8))
+	with open(frappe.get_site_path(file_url.lstrip("/")), "w", newline="", encoding=encoding) as f:
+		writer = csv.writer(f)
+		writer.writerows([["Notes:"], ["Note 1"], ["Note 2"], ["Note 3"]])
+		writer.writerow(
+			["ID", "Employee", "Employee Name", "Date", "Status", "Leave Type", "Company", "Naming Series"]
+		)
+		writer.writerows(rows)
+
+	return file_url
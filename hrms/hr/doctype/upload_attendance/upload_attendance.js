@@ -15,6 +15,20 @@ hrms.hr.AttendanceControlPanel = class AttendanceControlPanel extends frappe.ui.
 		this.frm.disable_save();
 		this.show_upload();
 		this.setup_import_progress();
+		this.show_resume_import();
+	}
+
+	show_resume_import() {
+		if (["In Progress", "Failed"].includes(this.frm.doc.import_status)) {
+			this.frm.add_custom_button(__("Resume Import"), () => {
+				frappe.call({
+					method: "hrms.hr.doctype.upload_attendance.upload_attendance.resume_import",
+					freeze: true,
+				}).then(() => {
+					frappe.show_alert({ message: __("Attendance import resumed"), indicator: "blue" });
+				});
+			});
+		}
 	}
 
 	get_template() {
@@ -48,19 +62,23 @@ hrms.hr.AttendanceControlPanel = class AttendanceControlPanel extends frappe.ui.
 				if (data.progress === data.total) {
 					this.frm.dashboard.hide_progress('Import Attendance');
 				}
-			} else if (data.error) {
+			} else if (data.failed) {
 				this.frm.dashboard.hide();
-				let messages = [`<th>${__('Error in some rows')}</th>`].concat(data.messages
-					.filter(message => message.includes('Error'))
-					.map(message => `<tr><td>${message}</td></tr>`))
-					.join('');
-				$log_wrapper.append('<table class="table table-bordered">' + messages);
-			} else if (data.messages) {
+				frappe.msgprint({
+					message: __("Attendance import failed. Please check the Error Log and resume the import."),
+					indicator: "red",
+				});
+				this.frm.reload_doc();
+			} else if (data.completed) {
 				this.frm.dashboard.hide();
-				let messages = [`<th>${__('Import Successful')}</th>`].concat(data.messages
-					.map(message => `<tr><td>${message}</td></tr>`))
-					.join('');
-				$log_wrapper.append('<table class="table table-bordered">' + messages);
+				let messages = [`<th>${__('Import Completed')}</th>`,
+					`<tr><td>${__('{0} rows imported', [data.imported])}</td></tr>`];
+				if (data.errors) {
+					messages.push(`<tr><td>${__('{0} rows failed. {1}', [data.errors,
+						`<a href="${data.error_file}" target="_blank">${__('Download Error Report')}</a>`])}</td></tr>`);
+				}
+				$log_wrapper.empty().append('<table class="table table-bordered">' + messages.join('') + '</table>');
+				this.frm.reload_doc();
 			}
 		});
 	}
@@ -4,17 +4,28 @@
 # For license information, please see license.txt
 
 
+import codecs
+import csv
+import os
+from itertools import islice
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import add_days, cstr, date_diff, getdate
+from frappe.utils import add_days, cint, cstr, date_diff, getdate, strip_html
 from frappe.utils.csvutils import UnicodeWriter
+from frappe.utils.dateutils import parse_date
 
 from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employee
 
 from hrms.hr.utils import get_holiday_dates_for_employee
 
 
+ATTENDANCE_IMPORT_CHUNK_SIZE = 500
+# encodings tried in order when reading an uploaded file, same as `read_csv_content`
+IMPORT_FILE_ENCODINGS = ("utf-8-sig", "windows-1250", "windows-1252")
+
+
 class UploadAttendance(Document):
 	pass
 
@@ -162,62 +173,288 @@ def get_naming_series():
 	return series[0]
 
 
+def check_import_permission():
+	for ptype in ("create", "submit"):
+		if not frappe.has_permission("Attendance", ptype):
+			raise frappe.PermissionError
+
+
 @frappe.whitelist()
 def upload():
-	if not frappe.has_permission("Attendance", "create"):
-		raise frappe.PermissionError
+	check_import_permission()
 
-	from frappe.utils.csvutils import read_csv_content
+	if not frappe.local.uploaded_file:
+		frappe.throw(_("Please select a csv file"))
+
+	if frappe.db.get_single_value("Upload Attendance", "import_status") in ("Queued", "In Progress"):
+		frappe.throw(_("Another attendance import is in progress. Please wait for it to complete."))
 
-	rows = read_csv_content(frappe.local.uploaded_file)
-	if not rows:
+	file_url = make_import_file_doc(
+		"attendance_import_{0}.csv".format(frappe.generate_hash(length=8)),
+		content=frappe.safe_encode(frappe.local.uploaded_file),
+	).file_url
+	total_rows = sum(1 for row in get_import_rows(file_url))
+	if not total_rows:
 		frappe.throw(_("Please select a csv file"))
-	frappe.enqueue(import_attendances, rows=rows, now=True if len(rows) < 200 else False)
 
+	frappe.db.set_single_value(
+		"Upload Attendance",
+		{
+			"import_file": file_url,
+			"import_status": "Queued",
+			"last_processed_row": 0,
+			"processed_rows": 0,
+			"total_rows": total_rows,
+			"error_rows": 0,
+			"error_file": None,
+		},
+	)
+	enqueue_attendance_import(now=total_rows < 200)
+
+
+@frappe.whitelist()
+def resume_import():
+	"""Continues a failed or interrupted import from the last committed chunk"""
+	check_import_permission()
+
+	if frappe.db.get_single_value("Upload Attendance", "import_status") == "Completed":
+		frappe.throw(_("There is no attendance import to resume"))
+
+	enqueue_attendance_import()
+
+
+def enqueue_attendance_import(now: bool = False):
+	frappe.enqueue(
+		import_attendances,
+		queue="long",
+		timeout=7200,
+		job_id="import_attendances",
+		deduplicate=True,
+		now=now,
+		user=frappe.session.user,
+	)
+
+
+def import_attendances(user: str | None = None):
+	"""Imports the uploaded file chunk by chunk, committing each chunk along with the position of its last row.
+	Rows failing validation are written to an error report instead of rolling back the import"""
+	state = frappe.db.get_singles_dict("Upload Attendance")
+	if not state.import_file:
+		return
+
+	frappe.db.set_single_value("Upload Attendance", "import_status", "In Progress")
+	frappe.db.commit()
+
+	processed_rows, error_rows = cint(state.processed_rows), cint(state.error_rows)
+	error_file = state.error_file
+
+	try:
+		rows = get_import_rows(state.import_file, after=cint(state.last_processed_row))
+		while chunk := list(islice(rows, ATTENDANCE_IMPORT_CHUNK_SIZE)):
+			failed = import_attendance_chunk(chunk)
+			if failed:
+				error_file = write_import_errors(failed, error_file)
+
+			processed_rows += len(chunk)
+			error_rows += len(failed)
+			frappe.db.set_single_value(
+				"Upload Attendance",
+				{
+					"last_processed_row": chunk[-1].row_idx,
+					"processed_rows": processed_rows,
+					"error_rows": error_rows,
+					"error_file": error_file,
+				},
+			)
+			frappe.db.commit()
+
+			frappe.publish_realtime(
+				"import_attendance",
+				dict(progress=processed_rows, total=cint(state.total_rows)),
+				user=user,
+			)
+	except Exception:
+		frappe.db.rollback()
+		frappe.db.set_single_value("Upload Attendance", "import_status", "Failed")
+		frappe.db.commit()
+		frappe.log_error(title=_("Attendance Import Failed"))
+		frappe.publish_realtime("import_attendance", dict(failed=True), user=user)
+		return
+
+	frappe.db.set_single_value("Upload Attendance", "import_status", "Completed")
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		"import_attendance",
+		dict(
+			completed=True,
+			imported=processed_rows - error_rows,
+			errors=error_rows,
+			error_file=error_file,
+		),
+		user=user,
+	)
 
-def import_attendances(rows):
-	def remove_holidays(rows):
-		rows = [row for row in rows if row[4] != "Holiday"]
-		return rows
 
+def make_import_file_doc(file_name: str, content: bytes | None = None) -> Document:
+	"""Creates a private File for a file of the import, readable by users with access to Upload Attendance"""
+	return frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": None if content else f"/private/files/{file_name}",
+			"content": content,
+			"is_private": 1,
+			"attached_to_doctype": "Upload Attendance",
+			"attached_to_name": "Upload Attendance",
+		}
+	).insert(ignore_permissions=True)
+
+
+def get_import_rows(file_url: str, after: int = 0):
+	"""Yields rows of the uploaded template after its header without reading the whole file.
+	Each row is a dict of the template columns with the line number of the row in `row_idx`"""
 	from frappe.modules import scrub
 
-	rows = list(filter(lambda x: x and any(x), rows))
-	columns = [scrub(f) for f in rows[4]]
-	columns[0] = "name"
-	columns[3] = "attendance_date"
-	rows = rows[5:]
-	ret = []
-	error = False
+	file_path = frappe.get_site_path(file_url.lstrip("/"))
+	columns = None
+	header_rows = 0
+	with open(file_path, newline="", encoding=get_file_encoding(file_path)) as f:
+		for row_idx, row in enumerate(csv.reader(f), 1):
+			if not any(row):
+				continue
+
+			if columns is None:
+				# 4 rows of notes followed by the column headings
+				header_rows += 1
+				if header_rows == 5:
+					columns = [scrub(column) for column in row]
+					columns[0] = "name"
+					columns[3] = "attendance_date"
+				continue
 
-	rows = remove_holidays(rows)
+			if row_idx > after:
+				yield frappe._dict(zip(columns, row), row_idx=row_idx)
 
-	from frappe.utils.csvutils import check_record, import_doc
 
-	for i, row in enumerate(rows):
-		if not row:
+def get_file_encoding(file_path: str) -> str:
+	"""Returns the first encoding the whole file can be decoded with, trying the same encodings
+	as `read_csv_content` while reading the file in blocks"""
+	for encoding in IMPORT_FILE_ENCODINGS:
+		decoder = codecs.getincrementaldecoder(encoding)()
+		try:
+			with open(file_path, "rb") as f:
+				while block := f.read(1024 * 1024):
+					decoder.decode(block)
+			decoder.decode(b"", final=True)
+			return encoding
+		except UnicodeDecodeError:
 			continue
-		row_idx = i + 5
-		d = frappe._dict(zip(columns, row))
 
-		d["doctype"] = "Attendance"
-		if d.name:
-			d["docstatus"] = frappe.db.get_value("Attendance", d.name, "docstatus")
+	frappe.throw(
+		_("Unknown file encoding. Tried {0}.").format(", ".join(IMPORT_FILE_ENCODINGS)),
+		title=_("Invalid File"),
+	)
+
+
+def import_attendance_chunk(rows: list[dict]) -> list[dict]:
+	"""Imports new attendance in bulk and overwrites existing drafts. Returns the failed rows with their `error`"""
+	from hrms.hr.doctype.attendance.attendance import (
+		get_permitted_attendance_records,
+		mark_attendance_in_bulk,
+	)
+
+	rows = [row for row in rows if row.status != "Holiday"]
+	existing_attendance = get_existing_attendance_by_name([row.name for row in rows if row.name])
 
+	new_records, failed = [], []
+	for row in rows:
 		try:
-			check_record(d)
-			ret.append(import_doc(d, "Attendance", 1, row_idx, submit=True))
-			frappe.publish_realtime("import_attendance", dict(progress=i, total=len(rows)))
-		except AttributeError:
-			pass
+			# dates in the file are in the user's date format
+			row.attendance_date = parse_date(cstr(row.attendance_date))
 		except Exception as e:
-			error = True
-			ret.append("Error for row (#%d) %s : %s" % (row_idx, len(row) > 1 and row[1] or "", cstr(e)))
-			frappe.errprint(frappe.get_traceback())
+			row.error = cstr(e)
+			failed.append(row)
+			continue
 
-	if error:
-		frappe.db.rollback()
-	else:
-		frappe.db.commit()
+		if not row.name:
+			new_records.append(row)
+			continue
+
+		attendance = existing_attendance.get(row.name)
+		if not attendance:
+			row.error = _("Attendance {0} not found").format(row.name)
+		elif attendance.docstatus == 1:
+			if attendance.status != row.status or cstr(attendance.leave_type) != cstr(row.leave_type):
+				row.error = _("Attendance {0} is already submitted and cannot be overwritten").format(
+					row.name
+				)
+		else:
+			row.error = submit_draft_attendance(row)
+
+		if row.error:
+			failed.append(row)
+
+	new_records, not_permitted = get_permitted_attendance_records(new_records)
+	failed.extend(not_permitted)
+	failed.extend(mark_attendance_in_bulk(new_records).failed)
+	return sorted(failed, key=lambda row: row.row_idx)
+
+
+def get_existing_attendance_by_name(names: list[str]) -> dict:
+	if not names:
+		return {}
+
+	return {
+		attendance.name: attendance
+		for attendance in frappe.get_all(
+			"Attendance",
+			filters={"name": ("in", names), "docstatus": ("<", 2)},
+			fields=["name", "docstatus", "status", "leave_type"],
+		)
+	}
+
+
+def submit_draft_attendance(row: dict) -> str | None:
+	savepoint = "attendance_import"
+	try:
+		frappe.db.savepoint(savepoint)
+		attendance = frappe.get_doc("Attendance", row.name)
+		attendance.update(
+			{
+				"employee": row.employee,
+				"attendance_date": getdate(row.attendance_date),
+				"status": row.status,
+				"leave_type": row.leave_type,
+			}
+		)
+		attendance.submit()
+	except Exception as e:
+		frappe.db.rollback(save_point=savepoint)
+		frappe.clear_messages()
+		return cstr(e)
+
+
+def write_import_errors(failed: list[dict], error_file: str | None = None) -> str:
+	"""Appends failed rows to the error report of the import and returns its URL"""
+	new_file_name = None
+	if not error_file:
+		new_file_name = "attendance_import_errors_{0}.csv".format(frappe.generate_hash(length=8))
+		error_file = f"/private/files/{new_file_name}"
+
+	file_path = frappe.get_site_path(error_file.lstrip("/"))
+	write_header = not os.path.exists(file_path)
+	with open(file_path, "a", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		if write_header:
+			writer.writerow(["Row", "Employee", "Date", "Status", "Error"])
+
+		writer.writerows(
+			[row.row_idx, row.employee, row.attendance_date, row.status, strip_html(cstr(row.error))]
+			for row in failed
+		)
+
+	if new_file_name:
+		make_import_file_doc(new_file_name)
 
-	frappe.publish_realtime("import_attendance", dict(messages=ret, error=error))
+	return error_file
@@ -1,21 +1,67 @@
 import frappe
-from frappe.query_builder.functions import Count
+
+ORG_CHART_CACHE_KEY = "organizational_chart"
+# changes to these fields change the nodes or the structure of the chart
+ORG_CHART_FIELDS = ("reports_to", "status", "company", "employee_name", "image", "designation")
 
 
 @frappe.whitelist()
 def get_children(parent=None, company=None, exclude_node=None):
-	filters = [["status", "!=", "Left"]]
-	if company and company != "All Companies":
-		filters.append(["company", "=", company])
+	tree = get_org_chart_tree(company)
 
 	if parent and company and parent != company:
-		filters.append(["reports_to", "=", parent])
+		employees = tree.get(parent, [])
 	else:
-		filters.append(["reports_to", "=", ""])
+		employees = tree.get("", [])
+
+	return [frappe._dict(employee) for employee in employees if employee.id != exclude_node]
+
+
+@frappe.whitelist()
+def get_all_nodes(company=None, parent=None):
+	"""Returns children of the root nodes (or of the parent) and of every expandable node below them,
+	in the same format as `hrms.utils.hierarchy_chart.get_all_nodes`"""
+	tree = get_org_chart_tree(company)
+	result = []
+
+	if parent:
+		nodes_to_expand = [frappe._dict(id=parent, name=get_employee_name(tree, parent))]
+	else:
+		nodes_to_expand = list(tree.get("", []))
+
+	while nodes_to_expand:
+		node = nodes_to_expand.pop(0)
+		data = [frappe._dict(employee) for employee in tree.get(node.id, [])]
+		result.append(dict(parent=node.id, parent_name=node.name, data=data))
+		nodes_to_expand.extend(employee for employee in data if employee.expandable)
+
+	return result
+
 
-	if exclude_node:
-		filters.append(["name", "!=", exclude_node])
+def get_employee_name(tree: dict, employee: str) -> str:
+	for employees in tree.values():
+		for d in employees:
+			if d.id == employee:
+				return d.name
 
+	return frappe.db.get_value("Employee", employee, "employee_name")
+
+
+def get_org_chart_tree(company: str | None = None) -> dict:
+	"""Returns employees of the company grouped by their manager (`reports_to`), roots under ""."""
+	return frappe.cache.hget(
+		ORG_CHART_CACHE_KEY,
+		company or "All Companies",
+		generator=lambda: build_org_chart_tree(company),
+	)
+
+
+def build_org_chart_tree(company: str | None = None) -> dict:
+	filters = [["status", "!=", "Left"]]
+	if company and company != "All Companies":
+		filters.append(["company", "=", company])
+
+	# a single nested set ordered scan, connections are the number of descendants of the node
 	employees = frappe.get_all(
 		"Employee",
 		fields=[
@@ -28,22 +74,29 @@ def get_children(parent=None, company=None, exclude_node=None):
 			"designation as title",
 		],
 		filters=filters,
-		order_by="name",
+		order_by="lft",
 	)
 
+	tree = {}
 	for employee in employees:
-		employee.connections = get_connections(employee.id, employee.lft, employee.rgt)
+		employee.connections = get_connections(employee.lft, employee.rgt)
 		employee.expandable = bool(employee.connections)
+		tree.setdefault(employee.reports_to or "", []).append(employee)
+
+	for children in tree.values():
+		children.sort(key=lambda d: d.id)
+
+	return tree
+
 
-	return employees
+def get_connections(lft: int, rgt: int) -> int:
+	return max((int(rgt or 0) - int(lft or 0) - 1) // 2, 0)
 
 
-def get_connections(employee: str, lft: int, rgt: int) -> int:
-	Employee = frappe.qb.DocType("Employee")
-	query = (
-		frappe.qb.from_(Employee)
-		.select(Count(Employee.name))
-		.where((Employee.lft > lft) & (Employee.rgt < rgt))
-	).run()
+def invalidate_org_chart_cache(doc=None, method=None):
+	"""Clears cached charts of all companies since a change in the nested set moves other employees"""
+	if doc and method == "on_update":
+		if not any(doc.has_value_changed(field) for field in ORG_CHART_FIELDS):
+			return
 
-	return query[0][0]
+	frappe.cache.delete_value(ORG_CHART_CACHE_KEY)
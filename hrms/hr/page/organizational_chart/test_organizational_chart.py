@@ -6,7 +6,11 @@ from frappe.tests.utils import FrappeTestCase
 
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
-from hrms.hr.page.organizational_chart.organizational_chart import get_children
+from hrms.hr.page.organizational_chart.organizational_chart import (
+	get_all_nodes,
+	get_children,
+	invalidate_org_chart_cache,
+)
 from hrms.tests.test_utils import create_company
 
 
@@ -14,6 +18,7 @@ class TestOrganizationalChart(FrappeTestCase):
 	def setUp(self):
 		self.company = create_company("Test Org Chart").name
 		frappe.db.delete("Employee", {"company": self.company})
+		invalidate_org_chart_cache()
 
 	def test_get_children(self):
 		company = create_company("Test Org Chart").name
@@ -35,3 +40,26 @@ class TestOrganizationalChart(FrappeTestCase):
 		self.assertEqual(children[0].connections, 1)
 		self.assertEqual(children[1].id, emp3)
 		self.assertEqual(children[1].connections, 0)
+
+	def test_get_all_nodes(self):
+		emp1 = make_employee("testemp1@mail.com", company=self.company)
+		emp2 = make_employee("testemp2@mail.com", company=self.company, reports_to=emp1)
+		emp3 = make_employee("testemp3@mail.com", company=self.company, reports_to=emp1)
+		emp4 = make_employee("testemp4@mail.com", company=self.company, reports_to=emp2)
+
+		nodes = get_all_nodes(company=self.company)
+		self.assertEqual([d["parent"] for d in nodes], [emp1, emp2])
+		self.assertEqual([d.id for d in nodes[0]["data"]], [emp2, emp3])
+		self.assertEqual([d.id for d in nodes[1]["data"]], [emp4])
+
+		# subtree
+		nodes = get_all_nodes(company=self.company, parent=emp2)
+		self.assertEqual([d["parent"] for d in nodes], [emp2])
+
+		# chart is rebuilt when the manager changes
+		employee = frappe.get_doc("Employee", emp4)
+		employee.reports_to = emp3
+		employee.save()
+
+		children = get_children(parent=emp1, company=self.company)
+		self.assertEqual([d.connections for d in children], [0, 1])
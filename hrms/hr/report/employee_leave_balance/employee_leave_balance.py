@@ -9,11 +9,7 @@ import frappe
 from frappe import _
 from frappe.utils import add_days, cint, flt, getdate
 
-from hrms.hr.doctype.leave_allocation.leave_allocation import get_previous_allocation
-from hrms.hr.doctype.leave_application.leave_application import (
-	get_leave_balance_on,
-	get_leaves_for_period,
-)
+from hrms.hr.doctype.leave_ledger_entry.leave_balance import LeaveBalances
 
 Filters = frappe._dict
 
@@ -102,6 +98,22 @@ def get_data(filters: Filters) -> List:
 	row = None
 
 	data = []
+	if not active_employees:
+		return data
+
+	# ledger entries, allocations and holidays of all employees in the period are loaded at once
+	opening_balance_date = add_days(filters.from_date, -1)
+	leave_balances = LeaveBalances(
+		[
+			(employee.name, None, date)
+			for employee in active_employees
+			for date in (opening_balance_date, filters.to_date)
+		],
+		to_date=max(getdate(filters.to_date), getdate()),
+	)
+	allocations_expiring_before_period = get_allocations_expiring_on(
+		[employee.name for employee in active_employees], opening_balance_date
+	)
 
 	for leave_type in leave_types:
 		if consolidate_leave_types:
@@ -123,13 +135,24 @@ def get_data(filters: Filters) -> List:
 			row.employee_name = employee.employee_name
 
 			leaves_taken = (
-				get_leaves_for_period(employee.name, leave_type, filters.from_date, filters.to_date) * -1
+				leave_balances.get_leaves_for_period(
+					employee.name, leave_type, filters.from_date, filters.to_date
+				)
+				* -1
 			)
 
 			new_allocation, expired_leaves, carry_forwarded_leaves = get_allocated_and_expired_leaves(
-				filters.from_date, filters.to_date, employee.name, leave_type
+				filters.from_date, filters.to_date, employee.name, leave_type, leave_balances
 			)
-			opening = get_opening_balance(employee.name, leave_type, filters, carry_forwarded_leaves)
+			if (employee.name, leave_type) in allocations_expiring_before_period:
+				# if opening balance date is same as the previous allocation's expiry
+				# then opening balance should only consider carry forwarded leaves
+				opening = carry_forwarded_leaves
+			else:
+				# else directly get leave balance on the previous day
+				opening = leave_balances.get_leave_balance_on(
+					employee.name, leave_type, opening_balance_date
+				)
 
 			row.leaves_allocated = flt(new_allocation, precision)
 			row.leaves_expired = flt(expired_leaves, precision)
@@ -144,28 +167,19 @@ def get_data(filters: Filters) -> List:
 	return data
 
 
-def get_opening_balance(
-	employee: str, leave_type: str, filters: Filters, carry_forwarded_leaves: float
-) -> float:
-	# allocation boundary condition
-	# opening balance is the closing leave balance 1 day before the filter start date
-	opening_balance_date = add_days(filters.from_date, -1)
-	allocation = get_previous_allocation(filters.from_date, leave_type, employee)
-
-	if (
-		allocation
-		and allocation.get("to_date")
-		and opening_balance_date
-		and getdate(allocation.get("to_date")) == getdate(opening_balance_date)
-	):
-		# if opening balance date is same as the previous allocation's expiry
-		# then opening balance should only consider carry forwarded leaves
-		opening_balance = carry_forwarded_leaves
-	else:
-		# else directly get leave balance on the previous day
-		opening_balance = get_leave_balance_on(employee, leave_type, opening_balance_date)
+def get_allocations_expiring_on(employees: List[str], date: str) -> set:
+	"""Returns (employee, leave type) pairs with an allocation expiring on the date.
 
-	return opening_balance
+	Opening balance is the closing leave balance 1 day before the filter start date, unless the
+	previous allocation expires on that day."""
+	return set(
+		frappe.get_all(
+			"Leave Allocation",
+			filters={"employee": ("in", employees), "to_date": date, "docstatus": 1},
+			fields=["employee", "leave_type"],
+			as_list=True,
+		)
+	)
 
 
 def get_conditions(filters: Filters) -> Dict:
@@ -211,13 +225,14 @@ def get_department_leave_approver_map(department: Optional[str] = None):
 
 
 def get_allocated_and_expired_leaves(
-	from_date: str, to_date: str, employee: str, leave_type: str
+	from_date: str, to_date: str, employee: str, leave_type: str, leave_balances: LeaveBalances
 ) -> Tuple[float, float, float]:
 	new_allocation = 0
 	expired_leaves = 0
 	carry_forwarded_leaves = 0
 
-	records = get_leave_ledger_entries(from_date, to_date, employee, leave_type)
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	records = get_leave_ledger_entries(from_date, to_date, employee, leave_type, leave_balances)
 
 	for record in records:
 		# new allocation records with `is_expired=1` are created when leave expires
@@ -225,13 +240,15 @@ def get_allocated_and_expired_leaves(
 		if record.is_expired:
 			continue
 
-		if record.to_date < getdate(to_date):
+		if record.to_date < to_date:
 			# leave allocations ending before to_date, reduce leaves taken within that period
 			# since they are already used, they won't expire
 			expired_leaves += record.leaves
-			expired_leaves += get_leaves_for_period(employee, leave_type, record.from_date, record.to_date)
+			expired_leaves += leave_balances.get_leaves_for_period(
+				employee, leave_type, record.from_date, record.to_date
+			)
 
-		if record.from_date >= getdate(from_date):
+		if record.from_date >= from_date:
 			if record.is_carry_forward:
 				carry_forwarded_leaves += record.leaves
 			else:
@@ -241,36 +258,19 @@ def get_allocated_and_expired_leaves(
 
 
 def get_leave_ledger_entries(
-	from_date: str, to_date: str, employee: str, leave_type: str
+	from_date, to_date, employee: str, leave_type: str, leave_balances: LeaveBalances
 ) -> List[Dict]:
-	ledger = frappe.qb.DocType("Leave Ledger Entry")
-	records = (
-		frappe.qb.from_(ledger)
-		.select(
-			ledger.employee,
-			ledger.leave_type,
-			ledger.from_date,
-			ledger.to_date,
-			ledger.leaves,
-			ledger.transaction_name,
-			ledger.transaction_type,
-			ledger.is_carry_forward,
-			ledger.is_expired,
-		)
-		.where(
-			(ledger.docstatus == 1)
-			& (ledger.transaction_type == "Leave Allocation")
-			& (ledger.employee == employee)
-			& (ledger.leave_type == leave_type)
-			& (
-				(ledger.from_date[from_date:to_date])
-				| (ledger.to_date[from_date:to_date])
-				| ((ledger.from_date < from_date) & (ledger.to_date > to_date))
-			)
+	"""Returns allocation entries of the employee and leave type overlapping the period"""
+	return [
+		entry
+		for entry in leave_balances.ledger_entries.get((employee, leave_type), [])
+		if entry.transaction_type == "Leave Allocation"
+		and (
+			from_date <= entry.from_date <= to_date
+			or from_date <= entry.to_date <= to_date
+			or (entry.from_date < from_date and entry.to_date > to_date)
 		)
-	).run(as_dict=True)
-
-	return records
+	]
 
 
 def get_chart_data(data: List, filters: Filters) -> Dict:
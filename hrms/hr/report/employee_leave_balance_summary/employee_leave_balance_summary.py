@@ -5,7 +5,7 @@
 import frappe
 from frappe import _
 
-from hrms.hr.doctype.leave_application.leave_application import get_leave_details
+from hrms.hr.doctype.leave_ledger_entry.leave_balance import LeaveBalances
 from hrms.hr.report.employee_leave_balance.employee_leave_balance import (
 	get_department_leave_approver_map,
 )
@@ -60,18 +60,25 @@ def get_data(filters, leave_types):
 	department_approver_map = get_department_leave_approver_map(filters.get("department"))
 
 	data = []
+	if not active_employees:
+		return data
+
+	# balances of all employees are computed from the same set of ledger entries and holidays
+	leave_balances = LeaveBalances(
+		[(employee.name, None, filters.date) for employee in active_employees]
+	)
 	for employee in active_employees:
 		leave_approvers = department_approver_map.get(employee.department_name, [])
 		if employee.leave_approver:
 			leave_approvers.append(employee.leave_approver)
 
 		row = [employee.name, employee.employee_name, employee.department]
-		available_leave = get_leave_details(employee.name, filters.date)
+		available_leave = leave_balances.get_leave_details(employee.name, filters.date)
 		for leave_type in leave_types:
 			remaining = 0
-			if leave_type in available_leave["leave_allocation"]:
+			if leave_type in available_leave:
 				# opening balance
-				remaining = available_leave["leave_allocation"][leave_type]["remaining_leaves"]
+				remaining = available_leave[leave_type]["remaining_leaves"]
 
 			row += [remaining]
 
@@ -9,7 +9,9 @@ from typing import Dict, List, Optional, Tuple
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Count, Extract, Sum
-from frappe.utils import cint, cstr, getdate
+from frappe.utils import cint, cstr, get_last_day, getdate
+
+from hrms.utils.holiday_list import get_holiday_calendars
 
 Filters = frappe._dict
 
@@ -175,9 +177,16 @@ def get_total_days_in_month(filters: Filters) -> int:
 	return monthrange(cint(filters.year), cint(filters.month))[1]
 
 
+def get_period(filters: Filters) -> Tuple:
+	"""Returns the first and last day of the filter month and year"""
+	first_day = getdate("{}-{:02d}-01".format(cint(filters.year), cint(filters.month)))
+	return first_day, get_last_day(first_day)
+
+
 def get_data(filters: Filters, attendance_map: Dict) -> List[Dict]:
 	employee_details, group_by_param_values = get_employee_related_details(filters)
 	holiday_map = get_holiday_map(filters)
+	summary_map = get_summary_map(filters) if filters.summarized_view else {}
 	data = []
 
 	if filters.group_by:
@@ -187,13 +196,15 @@ def get_data(filters: Filters, attendance_map: Dict) -> List[Dict]:
 			if not value:
 				continue
 
-			records = get_rows(employee_details[value], filters, holiday_map, attendance_map)
+			records = get_rows(
+				employee_details[value], filters, holiday_map, attendance_map, summary_map
+			)
 
 			if records:
 				data.append({group_by_column: frappe.bold(value)})
 				data.extend(records)
 	else:
-		data = get_rows(employee_details, filters, holiday_map, attendance_map)
+		data = get_rows(employee_details, filters, holiday_map, attendance_map, summary_map)
 
 	return data
 
@@ -241,6 +252,7 @@ def get_attendance_map(filters: Filters) -> Dict:
 
 def get_attendance_records(filters: Filters) -> List[Dict]:
 	Attendance = frappe.qb.DocType("Attendance")
+	first_day, last_day = get_period(filters)
 	query = (
 		frappe.qb.from_(Attendance)
 		.select(
@@ -252,8 +264,7 @@ def get_attendance_records(filters: Filters) -> List[Dict]:
 		.where(
 			(Attendance.docstatus == 1)
 			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
+			& (Attendance.attendance_date.between(first_day, last_day))
 		)
 	)
 
@@ -332,30 +343,28 @@ def get_holiday_map(filters: Filters) -> Dict[str, List[Dict]]:
 	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
 	holiday_lists.append(default_holiday_list)
 
-	holiday_map = frappe._dict()
-	Holiday = frappe.qb.DocType("Holiday")
-
-	for d in holiday_lists:
-		if not d:
-			continue
-
-		holidays = (
-			frappe.qb.from_(Holiday)
-			.select(Extract("day", Holiday.holiday_date).as_("day_of_month"), Holiday.weekly_off)
-			.where(
-				(Holiday.parent == d)
-				& (Extract("month", Holiday.holiday_date) == filters.month)
-				& (Extract("year", Holiday.holiday_date) == filters.year)
-			)
-		).run(as_dict=True)
-
-		holiday_map.setdefault(d, holidays)
+	holiday_lists = [d for d in holiday_lists if d]
+	if not holiday_lists:
+		return frappe._dict()
 
-	return holiday_map
+	first_day, last_day = get_period(filters)
+	return frappe._dict(
+		{
+			holiday_list: [
+				{"day_of_month": holiday.holiday_date.day, "weekly_off": holiday.weekly_off}
+				for holiday in calendar.get_holidays(first_day, last_day)
+			]
+			for holiday_list, calendar in get_holiday_calendars(holiday_lists).items()
+		}
+	)
 
 
 def get_rows(
-	employee_details: Dict, filters: Filters, holiday_map: Dict, attendance_map: Dict
+	employee_details: Dict,
+	filters: Filters,
+	holiday_map: Dict,
+	attendance_map: Dict,
+	summary_map: Optional[Dict] = None,
 ) -> List[Dict]:
 	records = []
 	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
@@ -365,12 +374,14 @@ def get_rows(
 		holidays = holiday_map.get(emp_holiday_list)
 
 		if filters.summarized_view:
-			attendance = get_attendance_status_for_summarized_view(employee, filters, holidays)
+			attendance = get_attendance_status_for_summarized_view(
+				employee, filters, holidays, summary_map
+			)
 			if not attendance:
 				continue
 
-			leave_summary = get_leave_summary(employee, filters)
-			entry_exits_summary = get_entry_exits_summary(employee, filters)
+			leave_summary = summary_map.leaves.get(employee, {})
+			entry_exits_summary = summary_map.entry_exits.get(employee, {})
 
 			row = {"employee": employee, "employee_name": details.employee_name}
 			set_defaults_for_summarized_view(filters, row)
@@ -404,15 +415,17 @@ def set_defaults_for_summarized_view(filters, row):
 
 
 def get_attendance_status_for_summarized_view(
-	employee: str, filters: Filters, holidays: List
+	employee: str, filters: Filters, holidays: List, summary_map: Dict
 ) -> Dict:
 	"""Returns dict of attendance status for employee like
 	{'total_present': 1.5, 'total_leaves': 0.5, 'total_absent': 13.5, 'total_holidays': 8, 'unmarked_days': 5}
 	"""
-	summary, attendance_days = get_attendance_summary_and_days(employee, filters)
-	if not any(summary.values()):
+	summary = summary_map.summary.get(employee)
+	if not (summary and any(summary.values())):
 		return {}
 
+	attendance_days = summary_map.days.get(employee, set())
+
 	total_days = get_total_days_in_month(filters)
 	total_holidays = total_unmarked_days = 0
 
@@ -435,7 +448,36 @@ def get_attendance_status_for_summarized_view(
 	}
 
 
-def get_attendance_summary_and_days(employee: str, filters: Filters) -> Tuple[Dict, List]:
+def get_summary_map(filters: Filters) -> Dict:
+	"""Returns attendance summary, attendance days, leave summary and late entries/early exits
+	of all employees for the summarized view"""
+	summary, days = get_attendance_summary_and_days(filters)
+
+	return frappe._dict(
+		summary=summary,
+		days=days,
+		leaves=get_leave_summary(filters),
+		entry_exits=get_entry_exits_summary(filters),
+	)
+
+
+def get_attendance_query(filters: Filters):
+	"""Returns the base query for submitted attendance of the filter company, month and employee"""
+	Attendance = frappe.qb.DocType("Attendance")
+	first_day, last_day = get_period(filters)
+
+	query = frappe.qb.from_(Attendance).where(
+		(Attendance.docstatus == 1)
+		& (Attendance.company == filters.company)
+		& (Attendance.attendance_date.between(first_day, last_day))
+	)
+	if filters.employee:
+		query = query.where(Attendance.employee == filters.employee)
+
+	return query
+
+
+def get_attendance_summary_and_days(filters: Filters) -> Tuple[Dict, Dict]:
 	Attendance = frappe.qb.DocType("Attendance")
 
 	present_case = (
@@ -455,36 +497,28 @@ def get_attendance_summary_and_days(employee: str, filters: Filters) -> Tuple[Di
 	sum_half_day = Sum(half_day_case).as_("total_half_days")
 
 	summary = (
-		frappe.qb.from_(Attendance)
+		get_attendance_query(filters)
 		.select(
+			Attendance.employee,
 			sum_present,
 			sum_absent,
 			sum_leave,
 			sum_half_day,
 		)
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
+		.groupby(Attendance.employee)
 	).run(as_dict=True)
 
 	days = (
-		frappe.qb.from_(Attendance)
-		.select(Extract("day", Attendance.attendance_date).as_("day_of_month"))
+		get_attendance_query(filters)
+		.select(Attendance.employee, Extract("day", Attendance.attendance_date).as_("day_of_month"))
 		.distinct()
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
-	).run(pluck=True)
+	).run(as_dict=True)
+
+	days_map = {}
+	for d in days:
+		days_map.setdefault(d.employee, set()).add(d.day_of_month)
 
-	return summary[0], days
+	return {d.pop("employee"): d for d in summary}, days_map
 
 
 def get_attendance_status_for_detailed_view(
@@ -528,39 +562,32 @@ def get_holiday_status(day: int, holidays: List) -> str:
 	return status
 
 
-def get_leave_summary(employee: str, filters: Filters) -> Dict[str, float]:
-	"""Returns a dict of leave type and corresponding leaves taken by employee like:
-	{'leave_without_pay': 1.0, 'sick_leave': 2.0}
+def get_leave_summary(filters: Filters) -> Dict[str, Dict[str, float]]:
+	"""Returns a dict of leave type and corresponding leaves taken by each employee like:
+	{'employee1': {'leave_without_pay': 1.0, 'sick_leave': 2.0}}
 	"""
 	Attendance = frappe.qb.DocType("Attendance")
 	day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(1)
 	sum_leave_days = Sum(day_case).as_("leave_days")
 
 	leave_details = (
-		frappe.qb.from_(Attendance)
-		.select(Attendance.leave_type, sum_leave_days)
-		.where(
-			(Attendance.employee == employee)
-			& (Attendance.docstatus == 1)
-			& (Attendance.company == filters.company)
-			& ((Attendance.leave_type.isnotnull()) | (Attendance.leave_type != ""))
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
-		.groupby(Attendance.leave_type)
+		get_attendance_query(filters)
+		.select(Attendance.employee, Attendance.leave_type, sum_leave_days)
+		.where((Attendance.leave_type.isnotnull()) | (Attendance.leave_type != ""))
+		.groupby(Attendance.employee, Attendance.leave_type)
 	).run(as_dict=True)
 
 	leaves = {}
 	for d in leave_details:
 		leave_type = frappe.scrub(d.leave_type)
-		leaves[leave_type] = d.leave_days
+		leaves.setdefault(d.employee, {})[leave_type] = d.leave_days
 
 	return leaves
 
 
-def get_entry_exits_summary(employee: str, filters: Filters) -> Dict[str, float]:
-	"""Returns total late entries and total early exits for employee like:
-	{'total_late_entries': 5, 'total_early_exits': 2}
+def get_entry_exits_summary(filters: Filters) -> Dict[str, Dict[str, float]]:
+	"""Returns total late entries and total early exits for each employee like:
+	{'employee1': {'total_late_entries': 5, 'total_early_exits': 2}}
 	"""
 	Attendance = frappe.qb.DocType("Attendance")
 
@@ -571,18 +598,12 @@ def get_entry_exits_summary(employee: str, filters: Filters) -> Dict[str, float]
 	count_early_exits = Count(early_exit_case).as_("total_early_exits")
 
 	entry_exits = (
-		frappe.qb.from_(Attendance)
-		.select(count_late_entries, count_early_exits)
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
+		get_attendance_query(filters)
+		.select(Attendance.employee, count_late_entries, count_early_exits)
+		.groupby(Attendance.employee)
 	).run(as_dict=True)
 
-	return entry_exits[0]
+	return {d.pop("employee"): d for d in entry_exits}
 
 
 @frappe.whitelist()
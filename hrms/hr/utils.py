@@ -4,6 +4,8 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Coalesce, IfNull, NullIf, Sum
 from frappe.utils import (
 	add_days,
 	cstr,
@@ -12,10 +14,12 @@ from frappe.utils import (
 	formatdate,
 	get_datetime,
 	get_first_day,
+	get_fullname,
 	get_last_day,
 	get_link_to_form,
 	get_number_format_info,
 	getdate,
+	now,
 	nowdate,
 )
 
@@ -29,6 +33,10 @@ from erpnext.setup.doctype.employee.employee import (
 from hrms.hr.doctype.leave_policy_assignment.leave_policy_assignment import (
 	calculate_pro_rated_leaves,
 )
+from hrms.utils.holiday_list import get_holiday_calendar
+
+
+EARNED_LEAVE_BATCH_SIZE = 500
 
 
 class DuplicateDeclarationError(frappe.ValidationError):
@@ -333,50 +341,126 @@ def generate_leave_encashment():
 		create_leave_encashment(leave_allocation=leave_allocation)
 
 
-def allocate_earned_leaves():
-	"""Allocate earned leaves to Employees"""
+def allocate_earned_leaves(dry_run=False):
+	"""Allocate earned leaves to Employees
+
+	:param dry_run: if set, only returns the leaves that would be allocated
+	:return: list of accruals with the allocation, employee, leave type, leaves and new total
+	"""
 	e_leave_types = get_earned_leaves()
 	today = frappe.flags.current_date or getdate()
+	precision = frappe.get_precision("Leave Allocation", "total_leaves_allocated")
+	accruals = []
 
 	for e_leave_type in e_leave_types:
-		leave_allocations = get_leave_allocations(today, e_leave_type.name)
+		leave_allocations = get_earned_leave_allocations(today, e_leave_type.name)
 
 		for allocation in leave_allocations:
-			if not allocation.leave_policy_assignment and not allocation.leave_policy:
-				continue
-
-			leave_policy = (
-				allocation.leave_policy
-				if allocation.leave_policy
-				else frappe.db.get_value(
-					"Leave Policy Assignment", allocation.leave_policy_assignment, ["leave_policy"]
-				)
-			)
-
-			annual_allocation = frappe.db.get_value(
-				"Leave Policy Detail",
-				filters={"parent": leave_policy, "leave_type": e_leave_type.name},
-				fieldname=["annual_allocation"],
-			)
-			date_of_joining = frappe.db.get_value("Employee", allocation.employee, "date_of_joining")
-
 			from_date = allocation.from_date
 
 			if e_leave_type.allocate_on_day == "Date of Joining":
-				from_date = date_of_joining
+				from_date = allocation.date_of_joining
 
 			if check_effective_date(
 				from_date, today, e_leave_type.earned_leave_frequency, e_leave_type.allocate_on_day
 			):
-				update_previous_leave_allocation(allocation, annual_allocation, e_leave_type, date_of_joining)
+				accrual = get_earned_leave_accrual(allocation, e_leave_type, precision)
+				if accrual:
+					accruals.append(accrual)
+
+	if not dry_run:
+		for idx in range(0, len(accruals), EARNED_LEAVE_BATCH_SIZE):
+			allocate_earned_leave_accruals(accruals[idx : idx + EARNED_LEAVE_BATCH_SIZE], today)
 
+	return accruals
 
-def update_previous_leave_allocation(allocation, annual_allocation, e_leave_type, date_of_joining):
-	allocation = frappe.get_doc("Leave Allocation", allocation.name)
-	annual_allocation = flt(annual_allocation, allocation.precision("total_leaves_allocated"))
+
+@frappe.whitelist()
+def get_earned_leave_accruals():
+	"""Returns the earned leaves that would be allocated today, without allocating them"""
+	frappe.only_for(["HR Manager", "System Manager"])
+	return allocate_earned_leaves(dry_run=True)
+
+
+def get_earned_leave_allocations(date, leave_type: str) -> list[dict]:
+	"""Returns active allocations of the leave type based on a leave policy along with the annual
+	allocation as per the policy, employee's date of joining and the non carry forwarded leaves allocated"""
+	LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+	Assignment = frappe.qb.DocType("Leave Policy Assignment")
+	PolicyDetail = frappe.qb.DocType("Leave Policy Detail")
+	Employee = frappe.qb.DocType("Employee")
+
+	leave_policy = Coalesce(NullIf(LeaveAllocation.leave_policy, ""), Assignment.leave_policy)
+	allocations = (
+		frappe.qb.from_(LeaveAllocation)
+		.left_join(Assignment)
+		.on(Assignment.name == LeaveAllocation.leave_policy_assignment)
+		.left_join(PolicyDetail)
+		.on(
+			(PolicyDetail.parent == leave_policy)
+			& (PolicyDetail.parenttype == "Leave Policy")
+			& (PolicyDetail.leave_type == leave_type)
+		)
+		.inner_join(Employee)
+		.on(Employee.name == LeaveAllocation.employee)
+		.select(
+			LeaveAllocation.name,
+			LeaveAllocation.employee,
+			LeaveAllocation.employee_name,
+			LeaveAllocation.leave_type,
+			LeaveAllocation.from_date,
+			LeaveAllocation.to_date,
+			LeaveAllocation.total_leaves_allocated,
+			PolicyDetail.annual_allocation,
+			Employee.date_of_joining,
+			Employee.company,
+		)
+		.where(
+			(LeaveAllocation.docstatus == 1)
+			& (LeaveAllocation.leave_type == leave_type)
+			& (LeaveAllocation.from_date <= date)
+			& (LeaveAllocation.to_date >= date)
+			& (
+				(IfNull(LeaveAllocation.leave_policy_assignment, "") != "")
+				| (IfNull(LeaveAllocation.leave_policy, "") != "")
+			)
+		)
+	).run(as_dict=True)
+
+	existing_leaves = get_existing_leave_counts([d.name for d in allocations])
+	for allocation in allocations:
+		allocation.existing_leaves = flt(existing_leaves.get(allocation.name))
+
+	return allocations
+
+
+def get_existing_leave_counts(allocations: list[str]) -> dict:
+	"""Returns non carry forwarded leaves in the ledger by allocation, see `LeaveAllocation.get_existing_leave_count`"""
+	if not allocations:
+		return {}
+
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	return dict(
+		frappe.qb.from_(Ledger)
+		.select(Ledger.transaction_name, Sum(Ledger.leaves))
+		.where(
+			(Ledger.transaction_type == "Leave Allocation")
+			& (Ledger.transaction_name.isin(allocations))
+			& (Ledger.is_carry_forward == 0)
+			& (Ledger.docstatus == 1)
+		)
+		.groupby(Ledger.transaction_name)
+		.run()
+	)
+
+
+def get_earned_leave_accrual(allocation: dict, e_leave_type: dict, precision: int) -> dict | None:
+	"""Returns leaves to be allocated in the allocation as per the leave policy,
+	none if the annual allocation or the max leaves allowed for the leave type are already reached"""
+	annual_allocation = flt(allocation.annual_allocation, precision)
 
 	earned_leaves = get_monthly_earned_leave(
-		date_of_joining,
+		allocation.date_of_joining,
 		annual_allocation,
 		e_leave_type.earned_leave_frequency,
 		e_leave_type.rounding,
@@ -384,8 +468,8 @@ def update_previous_leave_allocation(allocation, annual_allocation, e_leave_type
 
 	new_allocation = flt(allocation.total_leaves_allocated) + flt(earned_leaves)
 	new_allocation_without_cf = flt(
-		flt(allocation.get_existing_leave_count()) + flt(earned_leaves),
-		allocation.precision("total_leaves_allocated"),
+		flt(allocation.existing_leaves) + flt(earned_leaves),
+		precision,
 	)
 
 	if new_allocation > e_leave_type.max_leaves_allowed and e_leave_type.max_leaves_allowed > 0:
@@ -396,19 +480,97 @@ def update_previous_leave_allocation(allocation, annual_allocation, e_leave_type
 		# annual allocation as per policy should not be exceeded
 		and new_allocation_without_cf <= annual_allocation
 	):
-		today_date = frappe.flags.current_date or getdate()
+		return frappe._dict(
+			leave_allocation=allocation.name,
+			employee=allocation.employee,
+			employee_name=allocation.employee_name,
+			company=allocation.company,
+			leave_type=allocation.leave_type,
+			to_date=allocation.to_date,
+			leaves=earned_leaves,
+			total_leaves_allocated=new_allocation,
+			allocate_on_day=e_leave_type.allocate_on_day,
+		)
 
-		allocation.db_set("total_leaves_allocated", new_allocation, update_modified=False)
-		create_additional_leave_ledger_entry(allocation, earned_leaves, today_date)
 
-		if e_leave_type.allocate_on_day:
-			text = _(
-				"Allocated {0} leave(s) via scheduler on {1} based on the 'Allocate on Day' option set to {2}"
-			).format(
-				frappe.bold(earned_leaves), frappe.bold(formatdate(today_date)), e_leave_type.allocate_on_day
+def allocate_earned_leave_accruals(accruals: list[dict], date) -> None:
+	"""Updates allocation totals and adds ledger entries and comments for the accruals in bulk"""
+	from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+		update_leave_allocation_balances_for_allocations,
+	)
+	from hrms.hr.doctype.leave_ledger_entry.leave_ledger_entry import insert_leave_ledger_entries
+
+	LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+	total_leaves_allocated = Case()
+	for accrual in accruals:
+		total_leaves_allocated = total_leaves_allocated.when(
+			LeaveAllocation.name == accrual.leave_allocation, accrual.total_leaves_allocated
+		)
+
+	(
+		frappe.qb.update(LeaveAllocation)
+		.set(LeaveAllocation.total_leaves_allocated, total_leaves_allocated)
+		.where(LeaveAllocation.name.isin([accrual.leave_allocation for accrual in accruals]))
+	).run()
+
+	insert_leave_ledger_entries(
+		[
+			frappe._dict(
+				employee=accrual.employee,
+				employee_name=accrual.employee_name,
+				leave_type=accrual.leave_type,
+				transaction_type="Leave Allocation",
+				transaction_name=accrual.leave_allocation,
+				leaves=accrual.leaves,
+				from_date=date,
+				to_date=accrual.to_date,
+				company=accrual.company,
 			)
+			for accrual in accruals
+		]
+	)
+
+	timestamp, user = now(), frappe.session.user
+	comments = [
+		(
+			frappe.generate_hash(length=10),
+			"Info",
+			"Leave Allocation",
+			accrual.leave_allocation,
+			_(
+				"Allocated {0} leave(s) via scheduler on {1} based on the 'Allocate on Day' option set to {2}"
+			).format(frappe.bold(accrual.leaves), frappe.bold(formatdate(date)), accrual.allocate_on_day),
+			user,
+			get_fullname(user),
+			timestamp,
+			timestamp,
+			user,
+			user,
+		)
+		for accrual in accruals
+		if accrual.allocate_on_day
+	]
+	frappe.db.bulk_insert(
+		"Comment",
+		fields=[
+			"name",
+			"comment_type",
+			"reference_doctype",
+			"reference_name",
+			"content",
+			"comment_email",
+			"comment_by",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=comments,
+	)
 
-		allocation.add_comment(comment_type="Info", text=text)
+	update_leave_allocation_balances_for_allocations(
+		[accrual.leave_allocation for accrual in accruals]
+	)
 
 
 def get_monthly_earned_leave(
@@ -454,18 +616,6 @@ def round_earned_leaves(earned_leaves, rounding):
 	return earned_leaves
 
 
-def get_leave_allocations(date, leave_type):
-	return frappe.db.sql(
-		"""select name, employee, from_date, to_date, leave_policy_assignment, leave_policy
-		from `tabLeave Allocation`
-		where
-			%s between from_date and to_date and docstatus=1
-			and leave_type=%s""",
-		(date, leave_type),
-		as_dict=1,
-	)
-
-
 def get_earned_leaves():
 	return frappe.get_all(
 		"Leave Type",
@@ -587,16 +737,7 @@ def get_holidays_for_employee(
 	if not holiday_list:
 		return []
 
-	filters = {"parent": holiday_list, "holiday_date": ("between", [start_date, end_date])}
-
-	if only_non_weekly:
-		filters["weekly_off"] = False
-
-	holidays = frappe.get_all(
-		"Holiday", fields=["description", "holiday_date"], filters=filters, order_by="holiday_date"
-	)
-
-	return holidays
+	return get_holiday_calendar(holiday_list).get_holidays(start_date, end_date, only_non_weekly)
 
 
 @erpnext.allow_regional
@@ -0,0 +1,18 @@
+import frappe
+
+from hrms.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+	REBUILD_BATCH_SIZE,
+	build_leave_allocation_balances,
+	get_ledger_allocations,
+	insert_leave_allocation_balances,
+)
+
+
+def execute():
+	frappe.db.delete("Leave Allocation Balance")
+
+	allocations = get_ledger_allocations()
+	for idx in range(0, len(allocations), REBUILD_BATCH_SIZE):
+		insert_leave_allocation_balances(
+			build_leave_allocation_balances(allocations[idx : idx + REBUILD_BATCH_SIZE])
+		)
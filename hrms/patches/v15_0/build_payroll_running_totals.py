@@ -0,0 +1,15 @@
+import frappe
+
+from hrms.payroll.doctype.payroll_running_total.payroll_running_total import (
+	REBUILD_BATCH_SIZE,
+	update_payroll_running_totals,
+)
+
+
+def execute():
+	salary_slips = frappe.get_all(
+		"Salary Slip", filters={"docstatus": 1}, pluck="name", order_by="employee, start_date"
+	)
+
+	for idx in range(0, len(salary_slips), REBUILD_BATCH_SIZE):
+		update_payroll_running_totals(salary_slips[idx : idx + REBUILD_BATCH_SIZE])
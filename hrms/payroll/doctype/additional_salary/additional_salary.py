@@ -147,18 +147,27 @@ class AdditionalSalary(Document):
 
 
 def get_additional_salaries(employee, start_date, end_date, component_type):
-	from frappe.query_builder import Criterion
-
 	comp_type = "Earning" if component_type == "earnings" else "Deduction"
+	additional_salary_list = get_additional_salary_records([employee], start_date, end_date, [comp_type])
+
+	return validate_additional_salaries_to_overwrite(additional_salary_list, start_date, end_date)
+
+
+def get_additional_salary_records(
+	employees: list[str], start_date, end_date, component_types: list[str]
+) -> list[dict]:
+	"""Returns submitted Additional Salaries of the given types applicable in the period for all employees"""
+	from frappe.query_builder import Criterion
 
 	additional_sal = frappe.qb.DocType("Additional Salary")
 	component_field = additional_sal.salary_component.as_("component")
 	overwrite_field = additional_sal.overwrite_salary_structure_amount.as_("overwrite")
 
-	additional_salary_list = (
+	return (
 		frappe.qb.from_(additional_sal)
 		.select(
 			additional_sal.name,
+			additional_sal.employee,
 			component_field,
 			additional_sal.type,
 			additional_sal.amount,
@@ -167,9 +176,9 @@ def get_additional_salaries(employee, start_date, end_date, component_type):
 			additional_sal.deduct_full_tax_on_selected_payroll_date,
 		)
 		.where(
-			(additional_sal.employee == employee)
+			(additional_sal.employee.isin(employees))
 			& (additional_sal.docstatus == 1)
-			& (additional_sal.type == comp_type)
+			& (additional_sal.type.isin(component_types))
 			& (additional_sal.disabled == 0)
 		)
 		.where(
@@ -194,6 +203,8 @@ def get_additional_salaries(employee, start_date, end_date, component_type):
 		.run(as_dict=True)
 	)
 
+
+def validate_additional_salaries_to_overwrite(additional_salary_list, start_date, end_date):
 	additional_salaries = []
 	components_to_overwrite = []
 
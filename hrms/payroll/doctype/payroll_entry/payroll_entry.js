@@ -59,6 +59,11 @@ frappe.ui.form.on('Payroll Entry', {
 			).toggleClass("btn-primary", !(frm.doc.employees || []).length);
 		}
 
+		if (frm.doc.docstatus == 1) {
+			if (frm.custom_buttons) frm.clear_custom_buttons();
+			frm.events.add_context_buttons(frm);
+		}
+
 		if (
 			(frm.doc.employees || []).length
 			&& !frappe.model.has_workflow(frm.doctype)
@@ -73,18 +78,16 @@ frappe.ui.form.on('Payroll Entry', {
 						frm.refresh();
 					});
 				});
-			} else if (frm.doc.docstatus == 1 && frm.doc.status == "Failed") {
+			} else if (
+				frm.doc.docstatus == 1
+				&& (frm.doc.status == "Failed" || (frm.doc.status == "Queued" && frm.doc.__onload?.has_stale_shards))
+			) {
 				frm.add_custom_button(__("Create Salary Slips"), function () {
 					frm.call("create_salary_slips");
 				}).addClass("btn-primary");
 			}
 		}
 
-		if (frm.doc.docstatus == 1) {
-			if (frm.custom_buttons) frm.clear_custom_buttons();
-			frm.events.add_context_buttons(frm);
-		}
-
 		if (frm.doc.status == "Failed" && frm.doc.error_message) {
 			const issue = `<a id="jump_to_error" style="text-decoration: underline;">issue</a>`;
 			let process = (cint(frm.doc.salary_slips_created)) ? "submission" : "creation";
@@ -98,6 +101,13 @@ frappe.ui.form.on('Payroll Entry', {
 				frm.scroll_to_field("error_message");
 			});
 		}
+
+		if (frm.doc.status == "Queued" && (frm.doc.shards || []).length) {
+			const completed = frm.doc.shards.filter((shard) => shard.status == "Completed").length;
+			frm.dashboard.set_headline(
+				__("Creating Salary Slips: {0} of {1} shards completed.", [completed, frm.doc.shards.length])
+			);
+		}
 	},
 
 	get_employee_details: function (frm) {
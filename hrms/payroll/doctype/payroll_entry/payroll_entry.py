@@ -9,7 +9,7 @@ import frappe
 from frappe import _
 from frappe.desk.reportview import get_match_cond
 from frappe.model.document import Document
-from frappe.query_builder.functions import Coalesce, Count
+from frappe.query_builder.functions import Coalesce, Count, Sum
 from frappe.utils import (
 	DATE_FORMAT,
 	add_days,
@@ -20,6 +20,8 @@ from frappe.utils import (
 	flt,
 	get_link_to_form,
 	getdate,
+	now_datetime,
+	time_diff_in_seconds,
 )
 
 import erpnext
@@ -28,12 +30,26 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 )
 from erpnext.accounts.utils import get_fiscal_year
 
+from hrms.payroll.doctype.payroll_running_total.payroll_running_total import (
+	update_payroll_running_totals,
+)
+from hrms.utils.holiday_list import get_holiday_calendar
+
+
+SALARY_SLIP_SHARD_SIZE = 500
+SALARY_SLIP_SHARD_TIMEOUT = 3000
+SALARY_SLIP_SUBMISSION_BATCH_SIZE = 1000
+
 
 class PayrollEntry(Document):
 	def onload(self):
 		if not self.docstatus == 1 or self.salary_slips_submitted:
 			return
 
+		# shards whose jobs were lost or killed can be retried
+		if self.status == "Queued" and any(is_stale_shard(shard) for shard in self.shards):
+			self.set_onload("has_stale_shards", True)
+
 		# check if salary slips were manually submitted
 		entries = frappe.db.count("Salary Slip", {"payroll_entry": self.name, "docstatus": 1}, ["name"])
 		if cint(entries) == len(self.employees):
@@ -165,30 +181,10 @@ class PayrollEntry(Document):
 		employees = [emp.employee for emp in self.employees]
 
 		if employees:
-			args = frappe._dict(
-				{
-					"salary_slip_based_on_timesheet": self.salary_slip_based_on_timesheet,
-					"payroll_frequency": self.payroll_frequency,
-					"start_date": self.start_date,
-					"end_date": self.end_date,
-					"company": self.company,
-					"posting_date": self.posting_date,
-					"deduct_tax_for_unclaimed_employee_benefits": self.deduct_tax_for_unclaimed_employee_benefits,
-					"deduct_tax_for_unsubmitted_tax_exemption_proof": self.deduct_tax_for_unsubmitted_tax_exemption_proof,
-					"payroll_entry": self.name,
-					"exchange_rate": self.exchange_rate,
-					"currency": self.currency,
-				}
-			)
+			args = self.get_salary_slip_args()
 			if len(employees) > 30 or frappe.flags.enqueue_payroll_entry:
-				self.db_set("status", "Queued")
-				frappe.enqueue(
-					create_salary_slips_for_employees,
-					timeout=3000,
-					employees=employees,
-					args=args,
-					publish_progress=False,
-				)
+				self.db_set({"status": "Queued", "error_message": ""})
+				self.enqueue_salary_slip_shards(employees, args)
 				frappe.msgprint(
 					_("Salary Slip creation is queued. It may take a few minutes"),
 					alert=True,
@@ -199,6 +195,62 @@ class PayrollEntry(Document):
 				# since this method is called via frm.call this doc needs to be updated manually
 				self.reload()
 
+	def get_salary_slip_args(self) -> dict:
+		return frappe._dict(
+			{
+				"salary_slip_based_on_timesheet": self.salary_slip_based_on_timesheet,
+				"payroll_frequency": self.payroll_frequency,
+				"start_date": self.start_date,
+				"end_date": self.end_date,
+				"company": self.company,
+				"posting_date": self.posting_date,
+				"deduct_tax_for_unclaimed_employee_benefits": self.deduct_tax_for_unclaimed_employee_benefits,
+				"deduct_tax_for_unsubmitted_tax_exemption_proof": self.deduct_tax_for_unsubmitted_tax_exemption_proof,
+				"payroll_entry": self.name,
+				"exchange_rate": self.exchange_rate,
+				"currency": self.currency,
+			}
+		)
+
+	def enqueue_salary_slip_shards(self, employees: list[str], args: dict) -> None:
+		"""Splits employees into shards, each created and committed by a separate background job.
+		On retry, only failed shards and shards queued or processing beyond the job timeout are enqueued again"""
+		is_retry = bool(self.shards)
+		if not is_retry:
+			self.make_salary_slip_shards(employees)
+
+		for shard in self.shards:
+			if shard.status == "Completed" or (
+				is_retry and shard.status in ("Queued", "Processing") and not is_stale_shard(shard)
+			):
+				continue
+
+			shard.db_set({"status": "Queued", "error_message": ""})
+			frappe.enqueue(
+				create_salary_slips_for_shard,
+				queue="long",
+				timeout=SALARY_SLIP_SHARD_TIMEOUT,
+				job_id=shard.name,
+				deduplicate=True,
+				payroll_entry=self.name,
+				shard=shard.name,
+				args=args,
+				enqueue_after_commit=True,
+			)
+
+	def make_salary_slip_shards(self, employees: list[str]) -> None:
+		for idx in range(0, len(employees), SALARY_SLIP_SHARD_SIZE):
+			shard_employees = employees[idx : idx + SALARY_SLIP_SHARD_SIZE]
+			shard = self.append(
+				"shards",
+				{
+					"status": "Queued",
+					"employees": "\n".join(shard_employees),
+					"number_of_employees": len(shard_employees),
+				},
+			)
+			shard.db_insert()
+
 	def get_sal_slip_list(self, ss_status, as_dict=False):
 		"""
 		Returns list of salary slips based on selected criteria
@@ -265,27 +317,35 @@ class PayrollEntry(Document):
 		return account
 
 	def get_salary_components(self, component_type):
-		salary_slips = self.get_sal_slip_list(ss_status=1, as_dict=True)
-
-		if salary_slips:
-			ss = frappe.qb.DocType("Salary Slip")
-			ssd = frappe.qb.DocType("Salary Detail")
-			salary_components = (
-				frappe.qb.from_(ss)
-				.join(ssd)
-				.on(ss.name == ssd.parent)
-				.select(
-					ssd.salary_component,
-					ssd.amount,
-					ssd.parentfield,
-					ssd.additional_salary,
-					ss.salary_structure,
-					ss.employee,
-				)
-				.where((ssd.parentfield == component_type) & (ss.name.isin([d.name for d in salary_slips])))
-			).run(as_dict=True)
+		"""Returns component amounts of submitted salary slips aggregated per employee"""
+		ss = frappe.qb.DocType("Salary Slip")
+		ssd = frappe.qb.DocType("Salary Detail")
+		group_by = [
+			ssd.salary_component,
+			ssd.parentfield,
+			ssd.additional_salary,
+			ss.salary_structure,
+			ss.employee,
+		]
+
+		salary_components = (
+			frappe.qb.from_(ss)
+			.join(ssd)
+			.on(ss.name == ssd.parent)
+			.select(*group_by, Sum(ssd.amount).as_("amount"))
+			.where(
+				(ssd.parentfield == component_type)
+				& (ss.docstatus == 1)
+				& (ss.start_date >= self.start_date)
+				& (ss.end_date <= self.end_date)
+				& (ss.payroll_entry == self.name)
+				& ((ss.journal_entry.isnull()) | (ss.journal_entry == ""))
+				& (Coalesce(ss.salary_slip_based_on_timesheet, 0) == self.salary_slip_based_on_timesheet)
+			)
+			.groupby(*group_by)
+		).run(as_dict=True)
 
-			return salary_components
+		return salary_components
 
 	def get_salary_component_total(
 		self,
@@ -295,6 +355,9 @@ class PayrollEntry(Document):
 		salary_components = self.get_salary_components(component_type)
 		if salary_components:
 			component_dict = {}
+			self.set_payroll_cost_centers(
+				{(item.employee, item.salary_structure) for item in salary_components}
+			)
 
 			for item in salary_components:
 				if not self.should_add_component_to_accrual_jv(component_type, item):
@@ -411,39 +474,72 @@ class PayrollEntry(Document):
 			self.employee_cost_centers = {}
 
 		if not self.employee_cost_centers.get(employee):
-			SalaryStructureAssignment = frappe.qb.DocType("Salary Structure Assignment")
-			EmployeeCostCenter = frappe.qb.DocType("Employee Cost Center")
+			self.set_payroll_cost_centers({(employee, salary_structure)})
 
-			cost_centers = dict(
-				(
-					frappe.qb.from_(SalaryStructureAssignment)
-					.join(EmployeeCostCenter)
-					.on(SalaryStructureAssignment.name == EmployeeCostCenter.parent)
-					.select(EmployeeCostCenter.cost_center, EmployeeCostCenter.percentage)
-					.where(
-						(SalaryStructureAssignment.employee == employee)
-						& (SalaryStructureAssignment.docstatus == 1)
-						& (SalaryStructureAssignment.salary_structure == salary_structure)
-					)
-				).run(as_list=True)
+		return self.employee_cost_centers.get(employee, {})
+
+	def set_payroll_cost_centers(self, employee_structures: set[tuple[str, str]]) -> None:
+		"""Fetches payroll cost centers for all (employee, salary structure) pairs in set-based queries"""
+		if not hasattr(self, "employee_cost_centers"):
+			self.employee_cost_centers = {}
+
+		employee_structures = {
+			(employee, salary_structure)
+			for employee, salary_structure in employee_structures
+			if not self.employee_cost_centers.get(employee)
+		}
+		if not employee_structures:
+			return
+
+		employees = list({employee for employee, _salary_structure in employee_structures})
+		SalaryStructureAssignment = frappe.qb.DocType("Salary Structure Assignment")
+		EmployeeCostCenter = frappe.qb.DocType("Employee Cost Center")
+
+		assigned_cost_centers = (
+			frappe.qb.from_(SalaryStructureAssignment)
+			.join(EmployeeCostCenter)
+			.on(SalaryStructureAssignment.name == EmployeeCostCenter.parent)
+			.select(
+				SalaryStructureAssignment.employee,
+				SalaryStructureAssignment.salary_structure,
+				EmployeeCostCenter.cost_center,
+				EmployeeCostCenter.percentage,
+			)
+			.where(
+				(SalaryStructureAssignment.employee.isin(employees))
+				& (SalaryStructureAssignment.docstatus == 1)
 			)
+		).run(as_dict=True)
 
-			if not cost_centers:
-				default_cost_center, department = frappe.get_cached_value(
-					"Employee", employee, ["payroll_cost_center", "department"]
-				)
+		cost_centers = {}
+		for row in assigned_cost_centers:
+			if (row.employee, row.salary_structure) in employee_structures:
+				cost_centers.setdefault(row.employee, {})[row.cost_center] = row.percentage
+
+		employees_without_cost_centers = [
+			employee for employee in employees if employee not in cost_centers
+		]
+		if employees_without_cost_centers:
+			employee_details = frappe.get_all(
+				"Employee",
+				filters={"name": ("in", employees_without_cost_centers)},
+				fields=["name", "payroll_cost_center", "department"],
+			)
 
-				if not default_cost_center and department:
-					default_cost_center = frappe.get_cached_value("Department", department, "payroll_cost_center")
+			for employee in employee_details:
+				default_cost_center = employee.payroll_cost_center
+				if not default_cost_center and employee.department:
+					default_cost_center = frappe.get_cached_value(
+						"Department", employee.department, "payroll_cost_center"
+					)
 
 				if not default_cost_center:
 					default_cost_center = self.cost_center
 
-				cost_centers = {default_cost_center: 100}
+				cost_centers[employee.name] = {default_cost_center: 100}
 
-			self.employee_cost_centers.setdefault(employee, cost_centers)
-
-		return self.employee_cost_centers.get(employee, {})
+		for employee, employee_cost_centers in cost_centers.items():
+			self.employee_cost_centers.setdefault(employee, employee_cost_centers)
 
 	def get_account(self, component_dict=None):
 		account_dict = {}
@@ -1036,23 +1132,10 @@ class PayrollEntry(Document):
 
 	def get_holidays_count(self, holiday_list: str, start_date: str, end_date: str) -> float:
 		"""Returns number of holidays between start and end dates in the holiday list"""
-		if not hasattr(self, "_holidays_between_dates"):
-			self._holidays_between_dates = {}
-
-		key = f"{start_date}-{end_date}-{holiday_list}"
-		if key in self._holidays_between_dates:
-			return self._holidays_between_dates[key]
+		if not holiday_list:
+			return 0
 
-		holidays = frappe.db.get_all(
-			"Holiday",
-			filters={"parent": holiday_list, "holiday_date": ("between", [start_date, end_date])},
-			fields=["COUNT(*) as holidays_count"],
-		)[0]
-
-		if holidays:
-			self._holidays_between_dates[key] = holidays.holidays_count
-
-		return self._holidays_between_dates.get(key) or 0
+		return get_holiday_calendar(holiday_list).count(start_date, end_date)
 
 
 def get_salary_structure(
@@ -1302,8 +1385,13 @@ def payroll_entry_has_bank_entries(name: str):
 
 
 def log_payroll_failure(process, payroll_entry, error):
+	error_message = get_payroll_failure_message(process, payroll_entry.name, error)
+	payroll_entry.db_set({"error_message": error_message, "status": "Failed"})
+
+
+def get_payroll_failure_message(process: str, payroll_entry: str, error: Exception) -> str:
 	error_log = frappe.log_error(
-		title=_("Salary Slip {0} failed for Payroll Entry {1}").format(process, payroll_entry.name)
+		title=_("Salary Slip {0} failed for Payroll Entry {1}").format(process, payroll_entry)
 	)
 	message_log = frappe.message_log.pop() if frappe.message_log else str(error)
 
@@ -1316,7 +1404,7 @@ def log_payroll_failure(process, payroll_entry, error):
 		get_link_to_form("Error Log", error_log.name)
 	)
 
-	payroll_entry.db_set({"error_message": error_message, "status": "Failed"})
+	return error_message
 
 
 def create_salary_slips_for_employees(employees, args, publish_progress=True):
@@ -1326,9 +1414,9 @@ def create_salary_slips_for_employees(employees, args, publish_progress=True):
 		count = 0
 
 		employees = list(set(employees) - set(salary_slips_exist_for))
+		context = get_payroll_run_context(employees, args)
 		for emp in employees:
-			args.update({"doctype": "Salary Slip", "employee": emp})
-			frappe.get_doc(args).insert()
+			make_salary_slip_for_employee(emp, args, context)
 
 			count += 1
 			if publish_progress:
@@ -1357,7 +1445,147 @@ def create_salary_slips_for_employees(employees, args, publish_progress=True):
 		frappe.publish_realtime("completed_salary_slip_creation")
 
 
-def show_payroll_submission_status(submitted, unsubmitted, payroll_entry):
+def get_payroll_run_context(employees: list[str], args: dict):
+	"""Prefetches salary slip inputs for all employees in the batch with a few set-based queries"""
+	from hrms.payroll.doctype.salary_slip.payroll_run_context import PayrollRunContext
+
+	if not employees:
+		return
+
+	return PayrollRunContext(employees, args)
+
+
+def make_salary_slip_for_employee(employee: str, args: dict, context=None) -> None:
+	args.update({"doctype": "Salary Slip", "employee": employee})
+	salary_slip = frappe.get_doc(args)
+	if context:
+		salary_slip._payroll_run_context = context.for_employee(employee)
+
+	salary_slip.insert()
+
+
+def create_salary_slips_for_shard(payroll_entry: str, shard: str, args: dict) -> None:
+	"""Creates salary slips for one shard of a payroll entry and commits them independently
+	of the other shards, so a failure only needs this shard to be retried"""
+	frappe.db.set_value("Payroll Entry Shard", shard, "status", "Processing")
+	frappe.db.commit()  # nosemgrep
+
+	try:
+		employees = (frappe.db.get_value("Payroll Entry Shard", shard, "employees") or "").split("\n")
+		employees = [employee for employee in employees if employee]
+		salary_slips_exist_for = get_existing_salary_slips(employees, args)
+
+		employees_to_process = list(set(employees) - set(salary_slips_exist_for))
+		context = get_payroll_run_context(employees_to_process, args)
+		for emp in employees_to_process:
+			make_salary_slip_for_employee(emp, args, context)
+
+		frappe.db.set_value(
+			"Payroll Entry Shard",
+			shard,
+			{
+				"status": "Completed",
+				"salary_slips_created": len(get_existing_salary_slips(employees, args)),
+				"error_message": "",
+			},
+		)
+
+	except Exception as e:
+		frappe.db.rollback()
+		frappe.db.set_value(
+			"Payroll Entry Shard",
+			shard,
+			{"status": "Failed", "error_message": get_payroll_failure_message("creation", payroll_entry, e)},
+		)
+
+	finally:
+		frappe.db.commit()  # nosemgrep
+
+	update_salary_slip_creation_status(payroll_entry)
+
+
+def is_stale_shard(shard: dict) -> bool:
+	"""Returns True if the job of a queued or processing shard was lost, killed or timed out"""
+	return (
+		shard.status in ("Queued", "Processing")
+		and time_diff_in_seconds(now_datetime(), shard.modified) > SALARY_SLIP_SHARD_TIMEOUT
+	)
+
+
+def mark_stale_salary_slip_creations() -> None:
+	"""Fails queued payroll entries whose pending shards were not picked up or never finished,
+	so that salary slip creation can be retried"""
+	stale_before = add_to_date(now_datetime(), seconds=-SALARY_SLIP_SHARD_TIMEOUT)
+	PayrollEntry = frappe.qb.DocType("Payroll Entry")
+	PayrollEntryShard = frappe.qb.DocType("Payroll Entry Shard")
+	payroll_entries = (
+		frappe.qb.from_(PayrollEntry)
+		.join(PayrollEntryShard)
+		.on(
+			(PayrollEntryShard.parent == PayrollEntry.name)
+			& (PayrollEntryShard.parenttype == "Payroll Entry")
+		)
+		.select(PayrollEntry.name)
+		.distinct()
+		.where(
+			(PayrollEntry.docstatus == 1)
+			& (PayrollEntry.status == "Queued")
+			& (PayrollEntryShard.status.isin(["Queued", "Processing"]))
+			& (PayrollEntryShard.modified < stale_before)
+		)
+	).run(pluck=True)
+
+	for payroll_entry in payroll_entries:
+		update_salary_slip_creation_status(payroll_entry)
+
+
+def update_salary_slip_creation_status(payroll_entry: str) -> None:
+	"""Marks salary slips as created once every shard has finished,
+	or marks the payroll entry as failed if all shards are done and some have failed"""
+	# lock the payroll entry so that concurrently finishing shards are evaluated one at a time
+	frappe.db.get_value("Payroll Entry", payroll_entry, "name", for_update=True)
+
+	shards = frappe.get_all(
+		"Payroll Entry Shard",
+		filters={"parent": payroll_entry, "parenttype": "Payroll Entry"},
+		fields=["name", "idx", "status", "error_message", "modified"],
+		order_by="idx asc",
+	)
+
+	for shard in shards:
+		# the job of the shard was lost, killed or timed out without updating its status
+		if is_stale_shard(shard):
+			shard.status = "Failed"
+			shard.error_message = _("Salary slip creation timed out")
+			frappe.db.set_value(
+				"Payroll Entry Shard",
+				shard.name,
+				{"status": shard.status, "error_message": shard.error_message},
+			)
+
+	if any(shard.status in ("Queued", "Processing") for shard in shards):
+		return
+
+	failed_shards = [shard for shard in shards if shard.status == "Failed"]
+	if failed_shards:
+		error_message = "\n\n".join(
+			_("Shard {0}: {1}").format(shard.idx, shard.error_message) for shard in failed_shards
+		)
+		frappe.db.set_value(
+			"Payroll Entry", payroll_entry, {"status": "Failed", "error_message": error_message}
+		)
+	else:
+		frappe.db.set_value(
+			"Payroll Entry",
+			payroll_entry,
+			{"status": "Submitted", "salary_slips_created": 1, "error_message": ""},
+		)
+
+	frappe.db.commit()  # nosemgrep
+	frappe.publish_realtime("completed_salary_slip_creation")
+
+
+def show_payroll_submission_status(submitted, unsubmitted, payroll_entry, failures=None):
 	if not submitted and not unsubmitted:
 		frappe.msgprint(
 			_(
@@ -1370,6 +1598,15 @@ def show_payroll_submission_status(submitted, unsubmitted, payroll_entry):
 				payroll_entry.start_date, payroll_entry.end_date
 			)
 		)
+	elif failures:
+		frappe.msgprint(
+			_("Could not submit some Salary Slips:")
+			+ "<br><br>"
+			+ "<br>".join(
+				f"{get_link_to_form('Salary Slip', entry)}: {reason}" for entry, reason in failures.items()
+			),
+			title=_("Salary Slip Submission Failed"),
+		)
 	elif unsubmitted:
 		frappe.msgprint(
 			_("Could not submit some Salary Slips: {}").format(
@@ -1400,30 +1637,37 @@ def submit_salary_slips_for_employees(payroll_entry, salary_slips, publish_progr
 	try:
 		submitted = []
 		unsubmitted = []
+		failures = {}
 		frappe.flags.via_payroll_entry = True
 		count = 0
 
-		for entry in salary_slips:
-			salary_slip = frappe.get_doc("Salary Slip", entry[0])
-			if salary_slip.net_pay < 0:
-				unsubmitted.append(entry[0])
-			else:
-				try:
-					salary_slip.submit()
-					submitted.append(salary_slip)
-				except frappe.ValidationError:
+		if frappe.db.get_single_value("Payroll Settings", "submit_salary_slips_in_bulk"):
+			submitted, failures = bulk_submit_salary_slips(
+				payroll_entry, [entry[0] for entry in salary_slips], publish_progress=publish_progress
+			)
+			unsubmitted = list(failures)
+		else:
+			for entry in salary_slips:
+				salary_slip = frappe.get_doc("Salary Slip", entry[0])
+				if salary_slip.net_pay < 0:
 					unsubmitted.append(entry[0])
+				else:
+					try:
+						salary_slip.submit()
+						submitted.append(salary_slip)
+					except frappe.ValidationError:
+						unsubmitted.append(entry[0])
 
-			count += 1
-			if publish_progress:
-				frappe.publish_progress(count * 100 / len(salary_slips), title=_("Submitting Salary Slips..."))
+				count += 1
+				if publish_progress:
+					frappe.publish_progress(count * 100 / len(salary_slips), title=_("Submitting Salary Slips..."))
 
 		if submitted:
 			payroll_entry.make_accrual_jv_entry(submitted)
 			payroll_entry.email_salary_slip(submitted)
 			payroll_entry.db_set({"salary_slips_submitted": 1, "status": "Submitted", "error_message": ""})
 
-		show_payroll_submission_status(submitted, unsubmitted, payroll_entry)
+		show_payroll_submission_status(submitted, unsubmitted, payroll_entry, failures)
 
 	except Exception as e:
 		frappe.db.rollback()
@@ -1436,6 +1680,128 @@ def submit_salary_slips_for_employees(payroll_entry, salary_slips, publish_progr
 	frappe.flags.via_payroll_entry = False
 
 
+def bulk_submit_salary_slips(
+	payroll_entry, salary_slips: list[str], publish_progress: bool = True
+) -> tuple[list, dict[str, str]]:
+	"""Submits draft salary slips in batches.
+
+	Every salary slip is still submitted through its controller. Checks that can be answered
+	with set-based queries are run upfront for the whole batch, salary slip inputs of the batch
+	are prefetched once and payroll running totals are rebuilt once per batch.
+
+	Returns the submitted salary slips and a map of salary slips that failed to their reasons"""
+	submitted = []
+	failures = {}
+	total = len(salary_slips)
+	args = payroll_entry.get_salary_slip_args()
+
+	for idx in range(0, total, SALARY_SLIP_SUBMISSION_BATCH_SIZE):
+		batch = salary_slips[idx : idx + SALARY_SLIP_SUBMISSION_BATCH_SIZE]
+		failures.update(validate_salary_slips_for_submission(batch))
+
+		to_submit = [name for name in batch if name not in failures]
+		employees = dict(
+			frappe.get_all(
+				"Salary Slip",
+				filters={"name": ("in", to_submit)},
+				fields=["name", "employee"],
+				as_list=True,
+			)
+		)
+		context = get_payroll_run_context(list(set(employees.values())), args)
+
+		submitted_in_batch = []
+		frappe.flags.defer_payroll_running_totals = True
+		try:
+			for name in to_submit:
+				salary_slip = frappe.get_doc("Salary Slip", name)
+				if context:
+					salary_slip._payroll_run_context = context.for_employee(salary_slip.employee)
+
+				frappe.db.savepoint("submit_salary_slip")
+				try:
+					salary_slip.submit()
+					submitted_in_batch.append(salary_slip)
+				except frappe.ValidationError as e:
+					frappe.db.rollback(save_point="submit_salary_slip")
+					failures[name] = str(e)
+		finally:
+			frappe.flags.defer_payroll_running_totals = False
+
+		update_payroll_running_totals([salary_slip.name for salary_slip in submitted_in_batch])
+		submitted.extend(submitted_in_batch)
+
+		if publish_progress:
+			frappe.publish_progress(
+				min(idx + SALARY_SLIP_SUBMISSION_BATCH_SIZE, total) * 100 / total,
+				title=_("Submitting Salary Slips..."),
+			)
+
+	return submitted, failures
+
+
+def validate_salary_slips_for_submission(salary_slips: list[str]) -> dict[str, str]:
+	"""Returns salary slips that cannot be submitted along with the reason"""
+	SalarySlip = frappe.qb.DocType("Salary Slip")
+	Employee = frappe.qb.DocType("Employee")
+	failures = {}
+
+	records = (
+		frappe.qb.from_(SalarySlip)
+		.join(Employee)
+		.on(Employee.name == SalarySlip.employee)
+		.select(
+			SalarySlip.name,
+			SalarySlip.employee,
+			SalarySlip.docstatus,
+			SalarySlip.net_pay,
+			Employee.status.as_("employee_status"),
+		)
+		.where(SalarySlip.name.isin(salary_slips))
+	).run(as_dict=True)
+
+	for record in records:
+		if record.docstatus != 0:
+			failures[record.name] = _("Salary Slip is not in draft state")
+		elif flt(record.net_pay) < 0:
+			failures[record.name] = _("Net Pay cannot be less than 0")
+		elif record.employee_status != "Active":
+			failures[record.name] = _("Employee {0} is {1}").format(
+				frappe.bold(record.employee), _(record.employee_status)
+			)
+
+	# another salary slip for the same employee and period is already submitted
+	OtherSalarySlip = frappe.qb.DocType("Salary Slip").as_("other")
+	duplicates = (
+		frappe.qb.from_(SalarySlip)
+		.join(OtherSalarySlip)
+		.on(
+			(OtherSalarySlip.employee == SalarySlip.employee)
+			& (OtherSalarySlip.start_date == SalarySlip.start_date)
+			& (OtherSalarySlip.end_date == SalarySlip.end_date)
+			& (OtherSalarySlip.name != SalarySlip.name)
+			& (OtherSalarySlip.docstatus == 1)
+		)
+		.select(SalarySlip.name, SalarySlip.employee)
+		.where(
+			(SalarySlip.name.isin(salary_slips))
+			& (Coalesce(SalarySlip.salary_slip_based_on_timesheet, 0) == 0)
+		)
+	).run(as_dict=True)
+
+	for record in duplicates:
+		failures.setdefault(
+			record.name,
+			_("Salary Slip of employee {0} already created for this period").format(record.employee),
+		)
+
+	missing = set(salary_slips) - {record.name for record in records}
+	for name in missing:
+		failures[name] = _("Salary Slip {0} does not exist").format(name)
+
+	return failures
+
+
 @frappe.whitelist()
 @frappe.validate_and_sanitize_search_inputs
 def get_payroll_entries_for_jv(doctype, txt, searchfield, start, page_len, filters):
@@ -1,11 +1,13 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+from unittest.mock import patch
+
 from dateutil.relativedelta import relativedelta
 
 import frappe
 from frappe.tests.utils import FrappeTestCase, change_settings
-from frappe.utils import add_days, add_months
+from frappe.utils import add_days, add_months, add_to_date, now_datetime
 
 import erpnext
 from erpnext.accounts.utils import get_fiscal_year, getdate, nowdate
@@ -19,9 +21,12 @@ from hrms.hr.doctype.employee_advance.test_employee_advance import (
 	make_journal_entry_for_advance,
 )
 from hrms.payroll.doctype.payroll_entry.payroll_entry import (
+	SALARY_SLIP_SHARD_TIMEOUT,
 	PayrollEntry,
+	create_salary_slips_for_shard,
 	get_end_date,
 	get_start_end_dates,
+	mark_stale_salary_slip_creations,
 )
 from hrms.payroll.doctype.salary_component.test_salary_component import create_salary_component
 from hrms.payroll.doctype.salary_slip.salary_slip_loan_utils import if_lending_app_installed
@@ -306,6 +311,60 @@ class TestPayrollEntry(FrappeTestCase):
 		self.assertEqual(payroll_entry.status, "Queued")
 		frappe.flags.enqueue_payroll_entry = False
 
+	def test_salary_slip_creation_in_shards(self):
+		company = "_Test Company"
+		company_doc = frappe.get_doc("Company", company)
+		employee1 = make_employee("test_shard1@payroll.com", company=company)
+		employee2 = make_employee("test_shard2@payroll.com", company=company)
+		setup_salary_structure(employee1, company_doc)
+		setup_salary_structure(employee2, company_doc)
+
+		dates = get_start_end_dates("Monthly", nowdate())
+		payroll_entry = get_payroll_entry(
+			start_date=dates.start_date,
+			end_date=dates.end_date,
+			payable_account=company_doc.default_payroll_payable_account,
+			currency=company_doc.default_currency,
+			company=company_doc.name,
+			cost_center="Main - _TC",
+		)
+		frappe.flags.enqueue_payroll_entry = True
+		payroll_entry.submit()
+		frappe.flags.enqueue_payroll_entry = False
+		payroll_entry.reload()
+
+		self.assertEqual(payroll_entry.status, "Queued")
+		self.assertEqual(len(payroll_entry.shards), 1)
+		shard = payroll_entry.shards[0]
+		self.assertEqual(shard.status, "Queued")
+		self.assertEqual(shard.number_of_employees, 2)
+
+		# a shard whose job was lost fails the payroll entry so that it can be retried
+		frappe.db.set_value(
+			"Payroll Entry Shard",
+			shard.name,
+			"modified",
+			add_to_date(now_datetime(), seconds=-SALARY_SLIP_SHARD_TIMEOUT - 60),
+			update_modified=False,
+		)
+		with patch.object(frappe.db, "commit"):
+			mark_stale_salary_slip_creations()
+		payroll_entry.reload()
+		self.assertEqual(payroll_entry.status, "Failed")
+		self.assertEqual(payroll_entry.shards[0].status, "Failed")
+
+		# run the shard job synchronously without committing the test transaction
+		with patch.object(frappe.db, "commit"):
+			create_salary_slips_for_shard(
+				payroll_entry.name, shard.name, payroll_entry.get_salary_slip_args()
+			)
+		payroll_entry.reload()
+
+		self.assertEqual(payroll_entry.status, "Submitted")
+		self.assertEqual(payroll_entry.salary_slips_created, 1)
+		self.assertEqual(payroll_entry.shards[0].status, "Completed")
+		self.assertEqual(payroll_entry.shards[0].salary_slips_created, 2)
+
 	def test_salary_slip_operation_failure(self):
 		company = "_Test Company"
 		company_doc = frappe.get_doc("Company", company)
@@ -502,6 +561,58 @@ class TestPayrollEntry(FrappeTestCase):
 					self.assertEqual(account.party_type, None)
 					self.assertEqual(account.party, None)
 
+	@change_settings("Payroll Settings", {"submit_salary_slips_in_bulk": 1})
+	def test_bulk_salary_slip_submission(self):
+		company_doc = frappe.get_doc("Company", "_Test Company")
+		employees = [
+			make_employee(f"test_bulk_submission_{i}@payroll.com", company=company_doc.name)
+			for i in range(3)
+		]
+		for employee in employees:
+			setup_salary_structure(employee, company_doc)
+
+		dates = get_start_end_dates("Monthly", nowdate())
+		payroll_entry = get_payroll_entry(
+			start_date=dates.start_date,
+			end_date=dates.end_date,
+			payable_account=company_doc.default_payroll_payable_account,
+			currency=company_doc.default_currency,
+			company=company_doc.name,
+			cost_center="Main - _TC",
+		)
+		payroll_entry.submit()
+
+		# salary slip with negative net pay is reported and not submitted
+		failed_slip = frappe.db.get_value(
+			"Salary Slip", {"payroll_entry": payroll_entry.name, "employee": employees[0]}
+		)
+		frappe.db.set_value("Salary Slip", failed_slip, "net_pay", -1)
+
+		payroll_entry.submit_salary_slips()
+		payroll_entry.reload()
+
+		salary_slips = frappe.get_all(
+			"Salary Slip",
+			filters={"payroll_entry": payroll_entry.name},
+			fields=["name", "docstatus", "status", "journal_entry"],
+		)
+		for salary_slip in salary_slips:
+			if salary_slip.name == failed_slip:
+				self.assertEqual(salary_slip.docstatus, 0)
+				continue
+
+			self.assertEqual(salary_slip.docstatus, 1)
+			self.assertEqual(salary_slip.status, "Submitted")
+			self.assertTrue(salary_slip.journal_entry)
+			self.assertEqual(
+				frappe.db.count("Salary Detail", {"parent": salary_slip.name, "docstatus": 0}), 0
+			)
+
+		# a single accrual journal entry is booked for all submitted salary slips
+		journal_entries = {d.journal_entry for d in salary_slips if d.name != failed_slip}
+		self.assertEqual(len(journal_entries), 1)
+		self.assertEqual(frappe.db.get_value("Journal Entry", journal_entries.pop(), "docstatus"), 1)
+
 	def test_advance_deduction_in_accrual_journal_entry(self):
 		company_doc = frappe.get_doc("Company", "_Test Company")
 		employee = make_employee("test_employee@payroll.com", company=company_doc.name)
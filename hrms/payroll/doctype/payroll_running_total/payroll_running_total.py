@@ -0,0 +1,344 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import operator
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, getdate, now
+
+from erpnext.accounts.utils import get_fiscal_year
+
+from hrms.payroll.doctype.payroll_period.payroll_period import get_payroll_period
+
+SALARY_DETAIL_FLAGS = (
+	"is_tax_applicable",
+	"is_flexible_benefit",
+	"exempted_from_income_tax",
+	"variable_based_on_taxable_salary",
+)
+REBUILD_BATCH_SIZE = 500
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+class PayrollRunningTotal(Document):
+	"""
+	Snapshot of the cumulative totals of an employee's submitted salary slips within a payroll period
+	(or fiscal year if there is no payroll period), taken after every salary slip in the period.
+
+	Snapshots are rebuilt for the employee and period whenever a salary slip is submitted or cancelled,
+	so that year to date and previous period lookups read a single snapshot instead of all salary slips.
+	"""
+
+	pass
+
+
+def get_year_to_date_period(start_date, end_date, company, payroll_period=None) -> tuple:
+	if not payroll_period:
+		payroll_period = get_payroll_period(start_date, end_date, company)
+
+	if payroll_period:
+		return getdate(payroll_period.start_date), getdate(payroll_period.end_date)
+
+	# get dates based on fiscal year if no payroll period exists
+	fiscal_year = get_fiscal_year(date=start_date, company=company, as_dict=1)
+	return getdate(fiscal_year.year_start_date), getdate(fiscal_year.year_end_date)
+
+
+def get_running_total(employee: str, period_start_date, period_end_date, filters: dict) -> dict | None:
+	"""Returns the latest snapshot for the employee and period matching `filters` along with its components.
+
+	`filters` maps `from_date` or `to_date` to an (operator, value) tuple"""
+	PayrollRunningTotal = frappe.qb.DocType("Payroll Running Total")
+	SalarySlip = frappe.qb.DocType("Salary Slip")
+
+	query = (
+		frappe.qb.from_(PayrollRunningTotal)
+		# ignore snapshots of salary slips that were removed without cancellation
+		.join(SalarySlip)
+		.on((SalarySlip.name == PayrollRunningTotal.salary_slip) & (SalarySlip.docstatus == 1))
+		.select(
+			PayrollRunningTotal.name,
+			PayrollRunningTotal.salary_slip,
+			PayrollRunningTotal.from_date,
+			PayrollRunningTotal.to_date,
+			PayrollRunningTotal.gross_pay,
+			PayrollRunningTotal.net_pay,
+		)
+		.where(
+			(PayrollRunningTotal.employee == employee)
+			& (PayrollRunningTotal.period_start_date == period_start_date)
+			& (PayrollRunningTotal.period_end_date == period_end_date)
+		)
+		# snapshots are cumulative in the order they are built, so the last one built wins ties
+		.orderby(PayrollRunningTotal.to_date, order=frappe.qb.desc)
+		.orderby(PayrollRunningTotal.from_date, order=frappe.qb.desc)
+		.orderby(PayrollRunningTotal.salary_slip, order=frappe.qb.desc)
+		.limit(1)
+	)
+	for fieldname, (condition, value) in filters.items():
+		query = query.where(OPERATORS[condition](PayrollRunningTotal[fieldname], getdate(value)))
+
+	running_total = query.run(as_dict=True)
+	if not running_total:
+		return
+
+	running_total = running_total[0]
+	running_total.components = frappe.get_all(
+		"Payroll Running Total Component",
+		filters={"parent": running_total.name, "parenttype": "Payroll Running Total"},
+		fields=[
+			"salary_component",
+			"component_type as parentfield",
+			"amount",
+			"additional_amount",
+			*SALARY_DETAIL_FLAGS,
+		],
+	)
+
+	return running_total
+
+
+def get_salary_detail_total(
+	records: list[dict],
+	parentfield,
+	salary_component=None,
+	is_tax_applicable=None,
+	is_flexible_benefit=0,
+	exempted_from_income_tax=0,
+	variable_based_on_taxable_salary=0,
+	field_to_select="amount",
+) -> float:
+	"""Sums aggregated salary detail records using the same filters as `SalarySlip.get_salary_slip_details`"""
+	filters = {"parentfield": parentfield, "is_flexible_benefit": is_flexible_benefit}
+	if is_tax_applicable is not None:
+		filters["is_tax_applicable"] = is_tax_applicable
+	if exempted_from_income_tax:
+		filters["exempted_from_income_tax"] = exempted_from_income_tax
+	if variable_based_on_taxable_salary:
+		filters["variable_based_on_taxable_salary"] = variable_based_on_taxable_salary
+	if salary_component:
+		filters["salary_component"] = salary_component
+
+	total = 0.0
+	for record in records:
+		if all(record.get(field) == value for field, value in filters.items()):
+			total += flt(record.get(field_to_select))
+
+	return total
+
+
+def update_payroll_running_totals(salary_slips: list[str]) -> None:
+	"""Rebuilds running totals of every employee and period the salary slips belong to"""
+	if not salary_slips:
+		return
+
+	slips = frappe.get_all(
+		"Salary Slip",
+		filters={"name": ("in", salary_slips)},
+		fields=["employee", "company", "start_date", "end_date"],
+	)
+
+	periods = {}
+	employees_by_period = {}
+	for slip in slips:
+		key = (slip.start_date, slip.end_date, slip.company)
+		if key not in periods:
+			periods[key] = get_year_to_date_period(*key)
+
+		employees_by_period.setdefault(periods[key], set()).add(slip.employee)
+
+	for (period_start_date, period_end_date), employees in employees_by_period.items():
+		rebuild_running_totals(list(employees), period_start_date, period_end_date)
+
+
+def rebuild_running_totals(employees: list[str], period_start_date, period_end_date) -> None:
+	"""Replaces the snapshots of the employees for the period using set-based queries"""
+	SalarySlip = frappe.qb.DocType("Salary Slip")
+	SalaryDetail = frappe.qb.DocType("Salary Detail")
+	slip_filters = (
+		(SalarySlip.docstatus == 1)
+		& (SalarySlip.employee.isin(employees))
+		& (SalarySlip.start_date.between(period_start_date, period_end_date))
+	)
+
+	slips = (
+		frappe.qb.from_(SalarySlip)
+		.select(
+			SalarySlip.name,
+			SalarySlip.employee,
+			SalarySlip.company,
+			SalarySlip.start_date,
+			SalarySlip.end_date,
+			SalarySlip.gross_pay,
+			SalarySlip.net_pay,
+		)
+		.where(slip_filters)
+		.orderby(SalarySlip.employee)
+		.orderby(SalarySlip.end_date)
+		.orderby(SalarySlip.start_date)
+		.orderby(SalarySlip.name)
+	).run(as_dict=True)
+
+	group_by = [
+		SalaryDetail.parent,
+		SalaryDetail.parentfield,
+		SalaryDetail.salary_component,
+		*(SalaryDetail[flag] for flag in SALARY_DETAIL_FLAGS),
+	]
+	details = (
+		frappe.qb.from_(SalarySlip)
+		.join(SalaryDetail)
+		.on(SalaryDetail.parent == SalarySlip.name)
+		.select(
+			*group_by,
+			Sum(SalaryDetail.amount).as_("amount"),
+			Sum(SalaryDetail.additional_amount).as_("additional_amount"),
+		)
+		.where(slip_filters)
+		.groupby(*group_by)
+	).run(as_dict=True)
+
+	details_by_slip = {}
+	for detail in details:
+		details_by_slip.setdefault(detail.parent, []).append(detail)
+
+	delete_running_totals(employees, period_start_date, period_end_date)
+
+	parents, children = [], []
+	cumulative = {}
+	for slip in slips:
+		employee_totals = cumulative.setdefault(
+			slip.employee, frappe._dict(gross_pay=0.0, net_pay=0.0, components={})
+		)
+		employee_totals.gross_pay += flt(slip.gross_pay)
+		employee_totals.net_pay += flt(slip.net_pay)
+
+		for detail in details_by_slip.get(slip.name, []):
+			key = (
+				detail.parentfield,
+				detail.salary_component,
+				*(detail[flag] for flag in SALARY_DETAIL_FLAGS),
+			)
+			component = employee_totals.components.setdefault(key, [0.0, 0.0])
+			component[0] += flt(detail.amount)
+			component[1] += flt(detail.additional_amount)
+
+		name = frappe.generate_hash(length=10)
+		parents.append(
+			(
+				name,
+				slip.employee,
+				slip.company,
+				period_start_date,
+				period_end_date,
+				slip.name,
+				slip.start_date,
+				slip.end_date,
+				employee_totals.gross_pay,
+				employee_totals.net_pay,
+			)
+		)
+
+		for idx, (key, (amount, additional_amount)) in enumerate(
+			employee_totals.components.items(), start=1
+		):
+			parentfield, salary_component, *flags = key
+			children.append(
+				(
+					frappe.generate_hash(length=10),
+					name,
+					"Payroll Running Total",
+					"components",
+					idx,
+					salary_component,
+					parentfield,
+					amount,
+					additional_amount,
+					*flags,
+				)
+			)
+
+	timestamp, user = now(), frappe.session.user
+	frappe.db.bulk_insert(
+		"Payroll Running Total",
+		fields=[
+			"name",
+			"employee",
+			"company",
+			"period_start_date",
+			"period_end_date",
+			"salary_slip",
+			"from_date",
+			"to_date",
+			"gross_pay",
+			"net_pay",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[(*row, timestamp, timestamp, user, user) for row in parents],
+	)
+	frappe.db.bulk_insert(
+		"Payroll Running Total Component",
+		fields=[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"salary_component",
+			"component_type",
+			"amount",
+			"additional_amount",
+			*SALARY_DETAIL_FLAGS,
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[(*row, timestamp, timestamp, user, user) for row in children],
+	)
+
+
+def delete_running_totals(employees: list[str], period_start_date, period_end_date) -> None:
+	running_totals = frappe.get_all(
+		"Payroll Running Total",
+		filters={
+			"employee": ("in", employees),
+			"period_start_date": period_start_date,
+			"period_end_date": period_end_date,
+		},
+		pluck="name",
+	)
+	if not running_totals:
+		return
+
+	frappe.db.delete(
+		"Payroll Running Total Component",
+		{"parent": ("in", running_totals), "parenttype": "Payroll Running Total"},
+	)
+	frappe.db.delete("Payroll Running Total", {"name": ("in", running_totals)})
+
+
+@frappe.whitelist()
+def rebuild_payroll_running_totals(company: str | None = None, employee: str | None = None) -> None:
+	"""Rebuilds running totals from submitted salary slips, e.g. after data was patched directly.
+
+	Can be run via `bench --site <site> execute
+	hrms.payroll.doctype.payroll_running_total.payroll_running_total.rebuild_payroll_running_totals`"""
+	frappe.only_for("System Manager")
+
+	filters = {"docstatus": 1}
+	if company:
+		filters["company"] = company
+	if employee:
+		filters["employee"] = employee
+
+	salary_slips = frappe.get_all(
+		"Salary Slip", filters=filters, pluck="name", order_by="employee, start_date"
+	)
+	for idx in range(0, len(salary_slips), REBUILD_BATCH_SIZE):
+		update_payroll_running_totals(salary_slips[idx : idx + REBUILD_BATCH_SIZE])
@@ -0,0 +1,93 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, getdate
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.payroll.doctype.employee_tax_exemption_declaration.test_employee_tax_exemption_declaration import (
+	create_payroll_period,
+)
+from hrms.payroll.doctype.payroll_running_total.payroll_running_total import (
+	get_running_total,
+	rebuild_payroll_running_totals,
+)
+from hrms.payroll.doctype.salary_slip.test_salary_slip import (
+	create_salary_slips_for_payroll_period,
+	create_tax_slab,
+)
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+
+
+class TestPayrollRunningTotal(FrappeTestCase):
+	def setUp(self):
+		for dt in ["Salary Slip", "Payroll Running Total", "Payroll Running Total Component"]:
+			frappe.db.delete(dt)
+
+		self.employee = make_employee("test_running_total@salary.com", company="_Test Company")
+		self.payroll_period = create_payroll_period(
+			name="_Test Payroll Period", company="_Test Company"
+		)
+		create_tax_slab(
+			self.payroll_period,
+			allow_tax_exemption=True,
+			currency="INR",
+			effective_date=getdate("2019-04-01"),
+			company="_Test Company",
+		)
+		self.salary_structure = make_salary_structure(
+			"Monthly Salary Structure Test for Running Totals",
+			"Monthly",
+			employee=self.employee,
+			company="_Test Company",
+			currency="INR",
+			payroll_period=self.payroll_period,
+		)
+
+	def get_latest_running_total(self):
+		return get_running_total(
+			self.employee,
+			self.payroll_period.start_date,
+			self.payroll_period.end_date,
+			{"to_date": ("<=", self.payroll_period.end_date)},
+		)
+
+	def test_running_totals_on_submit_and_cancel(self):
+		create_salary_slips_for_payroll_period(
+			self.employee, self.salary_structure.name, self.payroll_period, deduct_random=False, num=3
+		)
+		salary_slips = frappe.get_all(
+			"Salary Slip",
+			filters={"employee": self.employee, "docstatus": 1},
+			fields=["name", "net_pay", "gross_pay", "year_to_date"],
+			order_by="start_date",
+		)
+
+		self.assertEqual(frappe.db.count("Payroll Running Total", {"employee": self.employee}), 3)
+		running_total = self.get_latest_running_total()
+		self.assertEqual(running_total.salary_slip, salary_slips[-1].name)
+		self.assertEqual(flt(running_total.net_pay), sum(flt(d.net_pay) for d in salary_slips))
+		self.assertEqual(flt(running_total.gross_pay), sum(flt(d.gross_pay) for d in salary_slips))
+		self.assertEqual(flt(salary_slips[-1].year_to_date), flt(running_total.net_pay))
+
+		# cancelling the latest slip drops its snapshot
+		frappe.get_doc("Salary Slip", salary_slips[-1].name).cancel()
+		running_total = self.get_latest_running_total()
+		self.assertEqual(running_total.salary_slip, salary_slips[-2].name)
+
+	def test_rebuild_running_totals(self):
+		create_salary_slips_for_payroll_period(
+			self.employee, self.salary_structure.name, self.payroll_period, deduct_random=False, num=2
+		)
+		expected = self.get_latest_running_total()
+
+		frappe.db.delete("Payroll Running Total")
+		frappe.db.delete("Payroll Running Total Component")
+		rebuild_payroll_running_totals(employee=self.employee)
+
+		running_total = self.get_latest_running_total()
+		self.assertEqual(running_total.salary_slip, expected.salary_slip)
+		self.assertEqual(running_total.net_pay, expected.net_pay)
+		self.assertEqual(len(running_total.components), len(expected.components))
@@ -0,0 +1,293 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.query_builder.functions import Sum
+from frappe.utils import getdate
+
+from hrms.payroll.doctype.additional_salary.additional_salary import (
+	get_additional_salary_records,
+	validate_additional_salaries_to_overwrite,
+)
+from hrms.payroll.doctype.payroll_period.payroll_period import get_payroll_period
+from hrms.payroll.doctype.payroll_running_total.payroll_running_total import (
+	SALARY_DETAIL_FLAGS,
+	get_salary_detail_total,
+)
+from hrms.payroll.doctype.salary_slip.salary_slip import get_lwp_or_ppl_for_employees
+from hrms.utils.holiday_list import get_holiday_calendars
+
+
+class PayrollRunContext:
+	"""
+	Prefetches everything required to compute salary slips for a batch of employees
+	in a payroll run using a fixed number of set-based queries.
+
+	Each Salary Slip gets its own slice via `for_employee` and falls back to querying
+	the database for anything outside the prefetched window.
+	"""
+
+	def __init__(self, employees: list[str], args: dict):
+		self.employees = list(employees)
+		self.company = args.get("company")
+		self.start_date = getdate(args.get("start_date"))
+		self.end_date = getdate(args.get("end_date"))
+		self.payroll_period = get_payroll_period(self.start_date, self.end_date, self.company)
+
+		self.employee_details = self.get_employee_details()
+		self.salary_structures = self.get_active_salary_structures()
+		self.salary_structure_assignments = self.get_salary_structure_assignments()
+		self.income_tax_slabs = self.get_income_tax_slabs()
+		self.attendance = self.get_attendance()
+		self.lwp_or_ppl = get_lwp_or_ppl_for_employees(self.employees, self.start_date, self.end_date)
+		self.holidays = self.get_holidays()
+		self.additional_salaries = self.get_additional_salaries()
+		self.salary_slip_details = self.get_salary_slip_details()
+
+	def for_employee(self, employee: str) -> "EmployeePayrollContext":
+		return EmployeePayrollContext(self, employee)
+
+	def get_employee_details(self) -> dict:
+		employees = frappe.get_all(
+			"Employee", filters={"name": ("in", self.employees)}, fields=["*"], order_by="name"
+		)
+		return {employee.name: employee for employee in employees}
+
+	def get_active_salary_structures(self) -> dict:
+		"""Returns payroll frequency by submitted and active salary structure"""
+		structures = frappe.get_all(
+			"Salary Structure",
+			filters={"docstatus": 1, "is_active": "Yes"},
+			fields=["name", "payroll_frequency"],
+		)
+		return {structure.name: structure.payroll_frequency for structure in structures}
+
+	def get_salary_structure_assignments(self) -> dict:
+		"""Returns submitted salary structure assignments by employee, latest first"""
+		assignments = frappe.get_all(
+			"Salary Structure Assignment",
+			filters={"employee": ("in", self.employees), "docstatus": 1},
+			fields=["*"],
+			order_by="from_date desc",
+		)
+
+		assignments_by_employee = {}
+		for assignment in assignments:
+			assignments_by_employee.setdefault(assignment.employee, []).append(assignment)
+
+		return assignments_by_employee
+
+	def get_income_tax_slabs(self) -> dict:
+		income_tax_slabs = {
+			assignment.income_tax_slab
+			for assignments in self.salary_structure_assignments.values()
+			for assignment in assignments
+			if assignment.income_tax_slab
+		}
+		return {slab: frappe.get_cached_doc("Income Tax Slab", slab) for slab in income_tax_slabs}
+
+	def get_attendance(self) -> dict:
+		Attendance = frappe.qb.DocType("Attendance")
+		records = (
+			frappe.qb.from_(Attendance)
+			.select(
+				Attendance.employee, Attendance.attendance_date, Attendance.status, Attendance.leave_type
+			)
+			.where(
+				(Attendance.status.isin(["Absent", "Half Day", "On Leave"]))
+				& (Attendance.employee.isin(self.employees))
+				& (Attendance.docstatus == 1)
+				& (Attendance.attendance_date.between(self.start_date, self.end_date))
+			)
+		).run(as_dict=True)
+
+		attendance_by_employee = {}
+		for record in records:
+			employee = record.pop("employee")
+			attendance_by_employee.setdefault(employee, []).append(record)
+
+		return attendance_by_employee
+
+	def get_holiday_list(self, employee: str) -> str | None:
+		holiday_list = self.employee_details.get(employee, {}).get("holiday_list")
+		return holiday_list or frappe.get_cached_value("Company", self.company, "default_holiday_list")
+
+	def get_holidays(self) -> dict:
+		holiday_lists = {self.get_holiday_list(employee) for employee in self.employees}
+		return get_holiday_calendars(list(holiday_lists))
+
+	def get_additional_salaries(self) -> dict:
+		records = get_additional_salary_records(
+			self.employees, self.start_date, self.end_date, ["Earning", "Deduction"]
+		)
+
+		additional_salaries = {}
+		for record in records:
+			component_type = "earnings" if record.type == "Earning" else "deductions"
+			additional_salaries.setdefault((record.employee, component_type), []).append(record)
+
+		return additional_salaries
+
+	def get_salary_slip_details(self) -> dict:
+		"""Returns component-wise totals of submitted salary slips from the start of the payroll period
+		till the start of this run, grouped by employee and by the flags salary slips filter on"""
+		if not self.payroll_period:
+			return {}
+
+		SalarySlip = frappe.qb.DocType("Salary Slip")
+		SalaryDetail = frappe.qb.DocType("Salary Detail")
+		period_start = self.payroll_period.start_date
+
+		group_by = [
+			SalarySlip.employee,
+			SalaryDetail.parentfield,
+			SalaryDetail.salary_component,
+			*(SalaryDetail[flag] for flag in SALARY_DETAIL_FLAGS),
+		]
+		records = (
+			frappe.qb.from_(SalarySlip)
+			.join(SalaryDetail)
+			.on(SalaryDetail.parent == SalarySlip.name)
+			.select(
+				*group_by,
+				Sum(SalaryDetail.amount).as_("amount"),
+				Sum(SalaryDetail.additional_amount).as_("additional_amount"),
+			)
+			.where(
+				(SalarySlip.docstatus == 1)
+				& (SalarySlip.employee.isin(self.employees))
+				& (SalarySlip.start_date.between(period_start, self.start_date))
+				& (SalarySlip.end_date.between(period_start, self.start_date))
+			)
+			.groupby(*group_by)
+		).run(as_dict=True)
+
+		details_by_employee = {employee: [] for employee in self.employees}
+		for record in records:
+			details_by_employee[record.employee].append(record)
+
+		return details_by_employee
+
+
+class EmployeePayrollContext:
+	"""Slice of a `PayrollRunContext` for a single employee.
+
+	Every getter returns None when the requested data is not covered by the prefetched window,
+	in which case the caller is expected to query it as usual."""
+
+	def __init__(self, run_context: PayrollRunContext, employee: str):
+		self.run_context = run_context
+		self.employee = employee
+
+	def covers(self, start_date, end_date) -> bool:
+		return (
+			self.run_context.start_date <= getdate(start_date)
+			and getdate(end_date) <= self.run_context.end_date
+		)
+
+	@property
+	def employee_details(self) -> dict | None:
+		return self.run_context.employee_details.get(self.employee)
+
+	@property
+	def payroll_period(self) -> dict | None:
+		return self.run_context.payroll_period
+
+	def get_salary_structure(self, start_date, end_date, joining_date, payroll_frequency=None):
+		"""Returns the latest active salary structure assigned on or before the period or joining date"""
+		for assignment in self.run_context.salary_structure_assignments.get(self.employee, []):
+			if assignment.salary_structure not in self.run_context.salary_structures:
+				continue
+
+			if (
+				payroll_frequency
+				and self.run_context.salary_structures[assignment.salary_structure] != payroll_frequency
+			):
+				continue
+
+			from_date = getdate(assignment.from_date)
+			if (
+				from_date <= getdate(start_date)
+				or from_date <= getdate(end_date)
+				or (joining_date and from_date <= getdate(joining_date))
+			):
+				return assignment.salary_structure
+
+	def get_salary_structure_assignment(self, salary_structure, date_to_validate) -> dict | None:
+		for assignment in self.run_context.salary_structure_assignments.get(self.employee, []):
+			if assignment.salary_structure == salary_structure and getdate(
+				assignment.from_date
+			) <= getdate(date_to_validate):
+				return assignment
+
+	def get_income_tax_slab(self, income_tax_slab):
+		return self.run_context.income_tax_slabs.get(income_tax_slab)
+
+	def get_attendance(self, start_date, end_date) -> list | None:
+		if not self.covers(start_date, end_date):
+			return
+
+		start_date, end_date = getdate(start_date), getdate(end_date)
+		return [
+			record
+			for record in self.run_context.attendance.get(self.employee, [])
+			if start_date <= getdate(record.attendance_date) <= end_date
+		]
+
+	def get_lwp_or_ppl(self, start_date, end_date) -> dict | None:
+		if getdate(start_date) != self.run_context.start_date or (
+			getdate(end_date) != self.run_context.end_date
+		):
+			return
+
+		return self.run_context.lwp_or_ppl.get(self.employee, frappe._dict())
+
+	def get_holidays(self, start_date, end_date) -> list | None:
+		holiday_list = self.run_context.get_holiday_list(self.employee)
+		if not holiday_list or not self.covers(start_date, end_date):
+			return
+
+		return self.run_context.holidays[holiday_list].get_holiday_dates(start_date, end_date)
+
+	def get_additional_salaries(self, start_date, end_date, component_type) -> list | None:
+		if getdate(start_date) != self.run_context.start_date or (
+			getdate(end_date) != self.run_context.end_date
+		):
+			return
+
+		return validate_additional_salaries_to_overwrite(
+			self.run_context.additional_salaries.get((self.employee, component_type), []),
+			start_date,
+			end_date,
+		)
+
+	def get_salary_slip_details(
+		self,
+		start_date,
+		end_date,
+		parentfield,
+		salary_component=None,
+		is_tax_applicable=None,
+		is_flexible_benefit=0,
+		exempted_from_income_tax=0,
+		variable_based_on_taxable_salary=0,
+		field_to_select="amount",
+	) -> float | None:
+		payroll_period = self.run_context.payroll_period
+		if (
+			not payroll_period
+			or getdate(start_date) != getdate(payroll_period.start_date)
+			or getdate(end_date) != self.run_context.start_date
+		):
+			return
+
+		return get_salary_detail_total(
+			self.run_context.salary_slip_details.get(self.employee, []),
+			parentfield,
+			salary_component=salary_component,
+			is_tax_applicable=is_tax_applicable,
+			is_flexible_benefit=is_flexible_benefit,
+			exempted_from_income_tax=exempted_from_income_tax,
+			variable_based_on_taxable_salary=variable_based_on_taxable_salary,
+			field_to_select=field_to_select,
+		)
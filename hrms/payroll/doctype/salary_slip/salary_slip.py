@@ -15,7 +15,6 @@ from frappe.utils import (
 	cint,
 	cstr,
 	date_diff,
-	floor,
 	flt,
 	formatdate,
 	get_first_day,
@@ -45,16 +44,25 @@ from hrms.payroll.doctype.payroll_period.payroll_period import (
 	get_payroll_period,
 	get_period_factor,
 )
+from hrms.payroll.doctype.payroll_running_total.payroll_running_total import (
+	get_running_total,
+	get_salary_detail_total,
+	update_payroll_running_totals,
+)
 from hrms.payroll.doctype.salary_slip.salary_slip_loan_utils import (
 	cancel_loan_repayment_entry,
 	make_loan_repayment_entry,
 	set_loan_repayment,
 )
-from hrms.payroll.utils import sanitize_expression
-from hrms.utils.holiday_list import get_holiday_dates_between
+from hrms.payroll.utils import (
+	FORMULA_GLOBALS,
+	get_compiled_expression,
+	safe_eval_compiled,
+	sanitize_expression,
+)
+from hrms.utils.holiday_list import get_holiday_calendar, get_holiday_dates_between
 
 # cache keys
-HOLIDAYS_BETWEEN_DATES = "holidays_between_dates"
 LEAVE_TYPE_MAP = "leave_type_map"
 SALARY_COMPONENT_VALUES = "salary_component_values"
 TAX_COMPONENTS_BY_COMPANY = "tax_components_by_company"
@@ -64,46 +72,53 @@ class SalarySlip(TransactionBase):
 	def __init__(self, *args, **kwargs):
 		super(SalarySlip, self).__init__(*args, **kwargs)
 		self.series = "Sal Slip/{0}/.#####".format(self.employee)
-		self.whitelisted_globals = {
-			"int": int,
-			"float": float,
-			"long": int,
-			"round": round,
-			"date": date,
-			"getdate": getdate,
-			"ceil": ceil,
-			"floor": floor,
-		}
+		self.whitelisted_globals = dict(FORMULA_GLOBALS)
 
 	def autoname(self):
 		self.name = make_autoname(self.series)
 
+	@property
+	def payroll_run_context(self):
+		"""Data prefetched for this employee when the slip is created as part of a payroll run"""
+		context = getattr(self, "_payroll_run_context", None)
+		if context and context.employee == self.employee:
+			return context
+
 	@property
 	def joining_date(self):
 		if not hasattr(self, "__joining_date"):
-			self.__joining_date = frappe.get_cached_value(
-				"Employee",
-				self.employee,
-				"date_of_joining",
-			)
+			if self.payroll_run_context and self.payroll_run_context.employee_details:
+				self.__joining_date = self.payroll_run_context.employee_details.date_of_joining
+			else:
+				self.__joining_date = frappe.get_cached_value(
+					"Employee",
+					self.employee,
+					"date_of_joining",
+				)
 
 		return self.__joining_date
 
 	@property
 	def relieving_date(self):
 		if not hasattr(self, "__relieving_date"):
-			self.__relieving_date = frappe.get_cached_value(
-				"Employee",
-				self.employee,
-				"relieving_date",
-			)
+			if self.payroll_run_context and self.payroll_run_context.employee_details:
+				self.__relieving_date = self.payroll_run_context.employee_details.relieving_date
+			else:
+				self.__relieving_date = frappe.get_cached_value(
+					"Employee",
+					self.employee,
+					"relieving_date",
+				)
 
 		return self.__relieving_date
 
 	@property
 	def payroll_period(self):
 		if not hasattr(self, "__payroll_period"):
-			self.__payroll_period = get_payroll_period(self.start_date, self.end_date, self.company)
+			if self.payroll_run_context and self.payroll_run_context.covers(self.start_date, self.end_date):
+				self.__payroll_period = self.payroll_run_context.payroll_period
+			else:
+				self.__payroll_period = get_payroll_period(self.start_date, self.end_date, self.company)
 
 		return self.__payroll_period
 
@@ -158,6 +173,9 @@ class SalarySlip(TransactionBase):
 			self.update_status(self.name)
 
 			make_loan_repayment_entry(self)
+			if not frappe.flags.defer_payroll_running_totals:
+				# salary slips submitted in bulk rebuild running totals once per batch
+				update_payroll_running_totals([self.name])
 
 			if not frappe.flags.via_payroll_entry and not frappe.flags.in_patch:
 				email_salary_slip = cint(
@@ -190,6 +208,7 @@ class SalarySlip(TransactionBase):
 		self.set_status()
 		self.update_status()
 		self.update_payment_status_for_gratuity()
+		update_payroll_running_totals([self.name])
 
 		cancel_loan_repayment_entry(self)
 
@@ -312,6 +331,16 @@ class SalarySlip(TransactionBase):
 				self.append("timesheets", {"time_sheet": data.name, "working_hours": data.total_hours})
 
 	def check_sal_struct(self):
+		if self.payroll_run_context:
+			self.salary_structure = self.payroll_run_context.get_salary_structure(
+				self.start_date,
+				self.end_date,
+				self.joining_date,
+				None if self.salary_slip_based_on_timesheet else self.payroll_frequency,
+			)
+			if self.salary_structure:
+				return self.salary_structure
+
 		ss = frappe.qb.DocType("Salary Structure")
 		ssa = frappe.qb.DocType("Salary Structure Assignment")
 
@@ -496,16 +525,11 @@ class SalarySlip(TransactionBase):
 		Exclude days before DOJ or after
 		Relieving Date from unmarked days
 		"""
-		from erpnext.setup.doctype.employee.employee import is_holiday
-
-		if include_holidays_in_total_working_days:
-			unmarked_days -= date_diff(end_date, start_date) + 1
-		else:
+		unmarked_days -= date_diff(end_date, start_date) + 1
+		if not include_holidays_in_total_working_days:
 			# exclude only if not holidays
-			for days in range(date_diff(end_date, start_date) + 1):
-				date = add_days(end_date, -days)
-				if not is_holiday(self.employee, date):
-					unmarked_days -= 1
+			holiday_list = get_holiday_list_for_employee(self.employee)
+			unmarked_days += get_holiday_calendar(holiday_list).count(start_date, end_date)
 
 		return unmarked_days
 
@@ -534,25 +558,28 @@ class SalarySlip(TransactionBase):
 		return payment_days
 
 	def get_holidays_for_employee(self, start_date, end_date):
-		holiday_list = get_holiday_list_for_employee(self.employee)
-		key = f"{holiday_list}:{start_date}:{end_date}"
-		holiday_dates = frappe.cache.hget(HOLIDAYS_BETWEEN_DATES, key)
-
-		if not holiday_dates:
-			holiday_dates = get_holiday_dates_between(holiday_list, start_date, end_date)
-			frappe.cache.hset(HOLIDAYS_BETWEEN_DATES, key, holiday_dates)
+		if self.payroll_run_context:
+			holiday_dates = self.payroll_run_context.get_holidays(start_date, end_date)
+			if holiday_dates is not None:
+				return holiday_dates
 
-		return holiday_dates
+		holiday_list = get_holiday_list_for_employee(self.employee)
+		return get_holiday_dates_between(holiday_list, start_date, end_date)
 
 	def calculate_lwp_or_ppl_based_on_leave_application(
 		self, holidays, working_days_list, daily_wages_fraction_for_half_day
 	):
 		lwp = 0
-		leaves = get_lwp_or_ppl_for_date_range(
-			self.employee,
-			self.start_date,
-			self.end_date,
-		)
+		leaves = None
+		if self.payroll_run_context:
+			leaves = self.payroll_run_context.get_lwp_or_ppl(self.start_date, self.end_date)
+
+		if leaves is None:
+			leaves = get_lwp_or_ppl_for_date_range(
+				self.employee,
+				self.start_date,
+				self.end_date,
+			)
 
 		for d in working_days_list:
 			if self.relieving_date and d > self.relieving_date:
@@ -598,6 +625,11 @@ class SalarySlip(TransactionBase):
 		return frappe.cache.get_value(LEAVE_TYPE_MAP, _get_leave_type_map)
 
 	def get_employee_attendance(self, start_date, end_date):
+		if self.payroll_run_context:
+			attendance_details = self.payroll_run_context.get_attendance(start_date, end_date)
+			if attendance_details is not None:
+				return attendance_details
+
 		attendance = frappe.qb.DocType("Attendance")
 
 		attendance_details = (
@@ -692,18 +724,28 @@ class SalarySlip(TransactionBase):
 	def set_salary_structure_assignement(self):
 		start_date = getdate(self.start_date)
 		date_to_validate = self.joining_date if self.joining_date > start_date else start_date
-		self._salary_structure_assignment = frappe.db.get_value(
-			"Salary Structure Assignment",
-			{
-				"employee": self.employee,
-				"salary_structure": self.salary_structure,
-				"from_date": ("<=", date_to_validate),
-				"docstatus": 1,
-			},
-			"*",
-			order_by="from_date desc",
-			as_dict=True,
-		)
+
+		self._salary_structure_assignment = None
+		if self.payroll_run_context:
+			self._salary_structure_assignment = (
+				self.payroll_run_context.get_salary_structure_assignment(
+					self.salary_structure, date_to_validate
+				)
+			)
+
+		if not self._salary_structure_assignment:
+			self._salary_structure_assignment = frappe.db.get_value(
+				"Salary Structure Assignment",
+				{
+					"employee": self.employee,
+					"salary_structure": self.salary_structure,
+					"from_date": ("<=", date_to_validate),
+					"docstatus": 1,
+				},
+				"*",
+				order_by="from_date desc",
+				as_dict=True,
+			)
 
 		if not self._salary_structure_assignment:
 			frappe.throw(
@@ -1088,7 +1130,10 @@ class SalarySlip(TransactionBase):
 	def get_data_for_eval(self):
 		"""Returns data for evaluating formula"""
 		data = frappe._dict()
-		employee = frappe.get_cached_doc("Employee", self.employee).as_dict()
+		if self.payroll_run_context and self.payroll_run_context.employee_details:
+			employee = self.payroll_run_context.employee_details
+		else:
+			employee = frappe.get_cached_doc("Employee", self.employee).as_dict()
 
 		if not hasattr(self, "_salary_structure_assignment"):
 			self.set_salary_structure_assignement()
@@ -1120,16 +1165,16 @@ class SalarySlip(TransactionBase):
 
 	def eval_condition_and_formula(self, struct_row, data):
 		try:
-			condition = sanitize_expression(struct_row.condition)
+			condition = self.get_compiled_expression(struct_row, "condition")
 			if condition:
-				if not frappe.safe_eval(condition, self.whitelisted_globals, data):
+				if not safe_eval_compiled(condition, self.whitelisted_globals, data):
 					return None
 			amount = struct_row.amount
 			if struct_row.amount_based_on_formula:
-				formula = sanitize_expression(struct_row.formula)
+				formula = self.get_compiled_expression(struct_row, "formula")
 				if formula:
 					amount = flt(
-						frappe.safe_eval(formula, self.whitelisted_globals, data), struct_row.precision("amount")
+						safe_eval_compiled(formula, self.whitelisted_globals, data), struct_row.precision("amount")
 					)
 			if amount:
 				data[struct_row.abbr] = amount
@@ -1159,6 +1204,14 @@ class SalarySlip(TransactionBase):
 			)
 			raise
 
+	def get_compiled_expression(self, struct_row, fieldname):
+		"""Returns the compiled condition or formula of a structure row"""
+		expression = sanitize_expression(struct_row.get(fieldname))
+		if not expression:
+			return None
+
+		return get_compiled_expression(expression)
+
 	def add_employee_benefits(self):
 		for struct_row in self._salary_structure_doc.get("earnings"):
 			if struct_row.is_flexible_benefit == 1:
@@ -1201,9 +1254,16 @@ class SalarySlip(TransactionBase):
 						self.update_component_row(frappe._dict(last_benefit.struct_row), amount, "earnings")
 
 	def add_additional_salary_components(self, component_type):
-		additional_salaries = get_additional_salaries(
-			self.employee, self.start_date, self.end_date, component_type
-		)
+		additional_salaries = None
+		if self.payroll_run_context:
+			additional_salaries = self.payroll_run_context.get_additional_salaries(
+				self.start_date, self.end_date, component_type
+			)
+
+		if additional_salaries is None:
+			additional_salaries = get_additional_salaries(
+				self.employee, self.start_date, self.end_date, component_type
+			)
 
 		for additional_salary in additional_salaries:
 			self.update_component_row(
@@ -1453,7 +1513,12 @@ class SalarySlip(TransactionBase):
 				)
 			)
 
-		income_tax_slab_doc = frappe.get_cached_doc("Income Tax Slab", income_tax_slab)
+		income_tax_slab_doc = None
+		if self.payroll_run_context:
+			income_tax_slab_doc = self.payroll_run_context.get_income_tax_slab(income_tax_slab)
+
+		if not income_tax_slab_doc:
+			income_tax_slab_doc = frappe.get_cached_doc("Income Tax Slab", income_tax_slab)
 		if income_tax_slab_doc.disabled:
 			frappe.throw(_("Income Tax Slab: {0} is disabled").format(income_tax_slab))
 
@@ -1498,6 +1563,40 @@ class SalarySlip(TransactionBase):
 		variable_based_on_taxable_salary=0,
 		field_to_select="amount",
 	):
+		if self.payroll_run_context:
+			total = self.payroll_run_context.get_salary_slip_details(
+				start_date,
+				end_date,
+				parentfield,
+				salary_component=salary_component,
+				is_tax_applicable=is_tax_applicable,
+				is_flexible_benefit=is_flexible_benefit,
+				exempted_from_income_tax=exempted_from_income_tax,
+				variable_based_on_taxable_salary=variable_based_on_taxable_salary,
+				field_to_select=field_to_select,
+			)
+			if total is not None:
+				return total
+
+		if self.payroll_period and getdate(start_date) == getdate(self.payroll_period.start_date):
+			# slips starting and ending between the payroll period start and end_date
+			running_total = self.get_running_total(
+				{"to_date": ("<=", end_date)},
+				self.payroll_period.start_date,
+				self.payroll_period.end_date,
+			)
+			if running_total:
+				return get_salary_detail_total(
+					running_total.components,
+					parentfield,
+					salary_component=salary_component,
+					is_tax_applicable=is_tax_applicable,
+					is_flexible_benefit=is_flexible_benefit,
+					exempted_from_income_tax=exempted_from_income_tax,
+					variable_based_on_taxable_salary=variable_based_on_taxable_salary,
+					field_to_select=field_to_select,
+				)
+
 		ss = frappe.qb.DocType("Salary Slip")
 		sd = frappe.qb.DocType("Salary Detail")
 
@@ -1887,21 +1986,26 @@ class SalarySlip(TransactionBase):
 	def compute_year_to_date(self):
 		year_to_date = 0
 		period_start_date, period_end_date = self.get_year_to_date_period()
+		running_total = self.get_year_to_date_running_total()
 
-		salary_slip_sum = frappe.get_list(
-			"Salary Slip",
-			fields=["sum(net_pay) as net_sum", "sum(gross_pay) as gross_sum"],
-			filters={
-				"employee": self.employee,
-				"start_date": [">=", period_start_date],
-				"end_date": ["<", period_end_date],
-				"name": ["!=", self.name],
-				"docstatus": 1,
-			},
-		)
+		if running_total:
+			year_to_date = flt(running_total.net_pay)
+			gross_year_to_date = flt(running_total.gross_pay)
+		else:
+			salary_slip_sum = frappe.get_list(
+				"Salary Slip",
+				fields=["sum(net_pay) as net_sum", "sum(gross_pay) as gross_sum"],
+				filters={
+					"employee": self.employee,
+					"start_date": [">=", period_start_date],
+					"end_date": ["<", period_end_date],
+					"name": ["!=", self.name],
+					"docstatus": 1,
+				},
+			)
 
-		year_to_date = flt(salary_slip_sum[0].net_sum) if salary_slip_sum else 0.0
-		gross_year_to_date = flt(salary_slip_sum[0].gross_sum) if salary_slip_sum else 0.0
+			year_to_date = flt(salary_slip_sum[0].net_sum) if salary_slip_sum else 0.0
+			gross_year_to_date = flt(salary_slip_sum[0].gross_sum) if salary_slip_sum else 0.0
 
 		year_to_date += self.net_pay
 		gross_year_to_date += self.gross_pay
@@ -1911,25 +2015,42 @@ class SalarySlip(TransactionBase):
 	def compute_month_to_date(self):
 		month_to_date = 0
 		first_day_of_the_month = get_first_day(self.start_date)
-		salary_slip_sum = frappe.get_list(
-			"Salary Slip",
-			fields=["sum(net_pay) as sum"],
-			filters={
-				"employee": self.employee,
-				"start_date": [">=", first_day_of_the_month],
-				"end_date": ["<", self.start_date],
-				"name": ["!=", self.name],
-				"docstatus": 1,
-			},
-		)
+		month_to_date = self.get_month_to_date_from_running_totals(first_day_of_the_month)
 
-		month_to_date = flt(salary_slip_sum[0].sum) if salary_slip_sum else 0.0
+		if month_to_date is None:
+			salary_slip_sum = frappe.get_list(
+				"Salary Slip",
+				fields=["sum(net_pay) as sum"],
+				filters={
+					"employee": self.employee,
+					"start_date": [">=", first_day_of_the_month],
+					"end_date": ["<", self.start_date],
+					"name": ["!=", self.name],
+					"docstatus": 1,
+				},
+			)
+
+			month_to_date = flt(salary_slip_sum[0].sum) if salary_slip_sum else 0.0
 
 		month_to_date += self.net_pay
 		self.month_to_date = month_to_date
 
 	def compute_component_wise_year_to_date(self):
 		period_start_date, period_end_date = self.get_year_to_date_period()
+		running_total = self.get_year_to_date_running_total()
+
+		if running_total:
+			component_totals = {}
+			for row in running_total.components:
+				component_totals.setdefault(row.salary_component, 0.0)
+				component_totals[row.salary_component] += flt(row.amount)
+
+			for key in ("earnings", "deductions"):
+				for component in self.get(key):
+					component.year_to_date = (
+						component_totals.get(component.salary_component, 0.0) + component.amount
+					)
+			return
 
 		ss = frappe.qb.DocType("Salary Slip")
 		sd = frappe.qb.DocType("Salary Detail")
@@ -1968,6 +2089,45 @@ class SalarySlip(TransactionBase):
 
 		return period_start_date, period_end_date
 
+	def get_running_total(self, filters: dict, period_start_date=None, period_end_date=None):
+		"""Returns the latest running total snapshot of this employee's submitted salary slips
+		in the year to date period matching `filters`, memoized for the lifetime of the document"""
+		if not (period_start_date and period_end_date):
+			period_start_date, period_end_date = self.get_year_to_date_period()
+
+		if not hasattr(self, "_running_totals"):
+			self._running_totals = {}
+
+		key = (getdate(period_start_date), getdate(period_end_date), frappe.as_json(filters))
+		if key not in self._running_totals:
+			running_total = get_running_total(
+				self.employee, period_start_date, period_end_date, filters
+			)
+			# snapshots include submitted slips only, recompute if this slip is one of them
+			if running_total and running_total.salary_slip == self.name:
+				running_total = None
+			self._running_totals[key] = running_total
+
+		return self._running_totals[key]
+
+	def get_year_to_date_running_total(self):
+		_period_start_date, period_end_date = self.get_year_to_date_period()
+		return self.get_running_total({"to_date": ("<", period_end_date)})
+
+	def get_month_to_date_from_running_totals(self, first_day_of_the_month) -> float | None:
+		"""Returns net pay of salary slips starting in this month and ending before this slip
+		as the difference of two snapshots, since salary slips of an employee do not overlap"""
+		period_start_date, period_end_date = self.get_year_to_date_period()
+		if getdate(first_day_of_the_month) < getdate(period_start_date):
+			return
+
+		till_start = self.get_running_total({"to_date": ("<", self.start_date)})
+		if not till_start:
+			return
+
+		before_month = self.get_running_total({"from_date": ("<", first_day_of_the_month)})
+		return flt(till_start.net_pay) - flt(before_month.net_pay if before_month else 0)
+
 	def add_leave_balances(self):
 		self.set("leave_details", [])
 
@@ -2098,6 +2258,11 @@ def eval_tax_slab_condition(condition, eval_globals=None, eval_locals=None):
 
 
 def get_lwp_or_ppl_for_date_range(employee, start_date, end_date):
+	return get_lwp_or_ppl_for_employees([employee], start_date, end_date).get(employee, frappe._dict())
+
+
+def get_lwp_or_ppl_for_employees(employees, start_date, end_date) -> dict:
+	"""Returns a map of employee to their approved LWP/PPL leaves by date, for all employees at once"""
 	LeaveApplication = frappe.qb.DocType("Leave Application")
 	LeaveType = frappe.qb.DocType("Leave Type")
 
@@ -2107,6 +2272,7 @@ def get_lwp_or_ppl_for_date_range(employee, start_date, end_date):
 		.on((LeaveType.name == LeaveApplication.leave_type))
 		.select(
 			LeaveApplication.name,
+			LeaveApplication.employee,
 			LeaveType.is_ppl,
 			LeaveType.fraction_of_daily_salary_per_leave,
 			LeaveType.include_holiday,
@@ -2119,14 +2285,15 @@ def get_lwp_or_ppl_for_date_range(employee, start_date, end_date):
 			(((LeaveType.is_lwp == 1) | (LeaveType.is_ppl == 1)))
 			& (LeaveApplication.docstatus == 1)
 			& (LeaveApplication.status == "Approved")
-			& (LeaveApplication.employee == employee)
+			& (LeaveApplication.employee.isin(employees))
 			& ((LeaveApplication.salary_slip.isnull()) | (LeaveApplication.salary_slip == ""))
 			& ((LeaveApplication.from_date >= start_date) & (LeaveApplication.to_date <= end_date))
 		)
 	).run(as_dict=True)
 
-	leave_date_mapper = frappe._dict()
+	leaves_by_employee = {}
 	for leave in leaves:
+		leave_date_mapper = leaves_by_employee.setdefault(leave.employee, frappe._dict())
 		if leave.from_date == leave.to_date:
 			leave_date_mapper[leave.from_date] = leave
 		else:
@@ -2135,7 +2302,7 @@ def get_lwp_or_ppl_for_date_range(employee, start_date, end_date):
 				date = add_days(leave.from_date, i)
 				leave_date_mapper[date] = leave
 
-	return leave_date_mapper
+	return leaves_by_employee
 
 
 @frappe.whitelist()
@@ -36,7 +36,6 @@ from hrms.payroll.doctype.employee_tax_exemption_declaration.test_employee_tax_e
 )
 from hrms.payroll.doctype.payroll_entry.payroll_entry import get_month_details
 from hrms.payroll.doctype.salary_slip.salary_slip import (
-	HOLIDAYS_BETWEEN_DATES,
 	LEAVE_TYPE_MAP,
 	SALARY_COMPONENT_VALUES,
 	TAX_COMPONENTS_BY_COMPANY,
@@ -45,6 +44,7 @@ from hrms.payroll.doctype.salary_slip.salary_slip import (
 from hrms.payroll.doctype.salary_slip.salary_slip_loan_utils import if_lending_app_installed
 from hrms.payroll.doctype.salary_structure.salary_structure import make_salary_slip
 from hrms.tests.test_utils import get_first_sunday
+from hrms.utils.holiday_list import HOLIDAY_CALENDAR_CACHE_KEY
 
 
 class TestSalarySlip(FrappeTestCase):
@@ -1343,6 +1343,64 @@ class TestSalarySlip(FrappeTestCase):
 
 				self.assertEqual(earning.default_amount, 19000)
 
+	@change_settings("Payroll Settings", {"payroll_based_on": "Attendance"})
+	def test_salary_slip_with_payroll_run_context(self):
+		from hrms.payroll.doctype.salary_slip.payroll_run_context import PayrollRunContext
+		from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+
+		emp_id = make_employee("test_payroll_run_context@salary.com", company="_Test Company")
+		frappe.db.set_value("Employee", emp_id, {"relieving_date": None, "status": "Active"})
+
+		first_sunday = get_first_sunday()
+		mark_attendance(emp_id, add_days(first_sunday, 1), "Absent", ignore_validate=True)
+		mark_attendance(
+			emp_id,
+			add_days(first_sunday, 3),
+			"On Leave",
+			leave_type="Leave Without Pay",
+			ignore_validate=True,
+		)
+
+		make_salary_structure(
+			"Test Payroll Run Context",
+			"Monthly",
+			employee=emp_id,
+			company="_Test Company",
+		)
+
+		args = frappe._dict(
+			{
+				"doctype": "Salary Slip",
+				"employee": emp_id,
+				"company": "_Test Company",
+				"payroll_frequency": "Monthly",
+				"posting_date": nowdate(),
+				"start_date": get_first_day(nowdate()),
+				"end_date": get_last_day(nowdate()),
+			}
+		)
+
+		salary_slip = frappe.get_doc(args)
+		salary_slip.validate()
+
+		context = PayrollRunContext([emp_id], args)
+		salary_slip_with_context = frappe.get_doc(args)
+		salary_slip_with_context._payroll_run_context = context.for_employee(emp_id)
+		salary_slip_with_context.validate()
+
+		self.assertEqual(
+			len(context.for_employee(emp_id).get_attendance(args.start_date, args.end_date)), 2
+		)
+		for field in (
+			"salary_structure",
+			"leave_without_pay",
+			"absent_days",
+			"payment_days",
+			"gross_pay",
+			"net_pay",
+		):
+			self.assertEqual(salary_slip.get(field), salary_slip_with_context.get(field))
+
 	def test_variable_tax_component(self):
 		from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
 
@@ -2261,7 +2319,7 @@ def mark_attendance(
 
 def clear_cache():
 	for key in [
-		HOLIDAYS_BETWEEN_DATES,
+		HOLIDAY_CALENDAR_CACHE_KEY,
 		LEAVE_TYPE_MAP,
 		SALARY_COMPONENT_VALUES,
 		TAX_COMPONENTS_BY_COMPANY,
@@ -7,10 +7,15 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.mapper import get_mapped_doc
-from frappe.utils import cint, cstr, flt
+from frappe.query_builder.functions import Coalesce, NullIf
+from frappe.utils import cint, cstr, flt, getdate, now
 
 import erpnext
 
+from hrms.utils import get_names_from_series
+
+SALARY_STRUCTURE_ASSIGNMENT_BATCH_SIZE = 500
+
 
 class SalaryStructure(Document):
 	def validate(self):
@@ -211,36 +216,41 @@ def assign_salary_structure_for_employees(
 	variable=None,
 	income_tax_slab=None,
 ):
-	salary_structures_assignments = []
-	existing_assignments_for = get_existing_assignments(employees, salary_structure, from_date)
-	count = 0
-	for employee in employees:
-		if employee in existing_assignments_for:
-			continue
-		count += 1
-
-		salary_structures_assignment = create_salary_structures_assignment(
-			employee, salary_structure, payroll_payable_account, from_date, base, variable, income_tax_slab
+	"""Creates submitted Salary Structure Assignments for the employees in batches.
+	Inputs shared by all assignments are validated once and employees are validated together,
+	no assignment is created if any of the employees is invalid."""
+	existing_assignments_for = set(get_existing_assignments(employees, salary_structure, from_date))
+	employees = [employee for employee in employees if employee not in existing_assignments_for]
+	if not employees:
+		return
+
+	payroll_payable_account = get_payroll_payable_account(salary_structure, payroll_payable_account)
+	validate_income_tax_slab(salary_structure, income_tax_slab)
+
+	employee_details = get_employee_details_for_assignment(employees)
+	validate_employees_for_assignment(employee_details, from_date)
+
+	for idx in range(0, len(employee_details), SALARY_STRUCTURE_ASSIGNMENT_BATCH_SIZE):
+		insert_salary_structure_assignments(
+			employee_details[idx : idx + SALARY_STRUCTURE_ASSIGNMENT_BATCH_SIZE],
+			salary_structure,
+			payroll_payable_account,
+			from_date,
+			base,
+			variable,
+			income_tax_slab,
 		)
-		salary_structures_assignments.append(salary_structures_assignment)
 		frappe.publish_progress(
-			count * 100 / len(set(employees) - set(existing_assignments_for)),
+			min(idx + SALARY_STRUCTURE_ASSIGNMENT_BATCH_SIZE, len(employee_details))
+			* 100
+			/ len(employee_details),
 			title=_("Assigning Structures..."),
 		)
 
-	if salary_structures_assignments:
-		frappe.msgprint(_("Structures have been assigned successfully"))
+	frappe.msgprint(_("Structures have been assigned successfully"))
 
 
-def create_salary_structures_assignment(
-	employee,
-	salary_structure,
-	payroll_payable_account,
-	from_date,
-	base,
-	variable,
-	income_tax_slab=None,
-):
+def get_payroll_payable_account(salary_structure, payroll_payable_account=None):
 	if not payroll_payable_account:
 		payroll_payable_account = frappe.db.get_value(
 			"Company", salary_structure.company, "default_payroll_payable_account"
@@ -261,19 +271,195 @@ def create_salary_structures_assignment(
 			)
 		)
 
-	assignment = frappe.new_doc("Salary Structure Assignment")
-	assignment.employee = employee
-	assignment.salary_structure = salary_structure.name
-	assignment.company = salary_structure.company
-	assignment.currency = salary_structure.currency
-	assignment.payroll_payable_account = payroll_payable_account
-	assignment.from_date = from_date
-	assignment.base = base
-	assignment.variable = variable
-	assignment.income_tax_slab = income_tax_slab
-	assignment.save(ignore_permissions=True)
-	assignment.submit()
-	return assignment.name
+	return payroll_payable_account
+
+
+def validate_income_tax_slab(salary_structure, income_tax_slab=None):
+	"""Same as `SalaryStructureAssignment.validate_income_tax_slab`"""
+	if not income_tax_slab:
+		return
+
+	income_tax_slab_currency = frappe.db.get_value("Income Tax Slab", income_tax_slab, "currency")
+	if salary_structure.currency != income_tax_slab_currency:
+		frappe.throw(
+			_("Currency of selected Income Tax Slab should be {0} instead of {1}").format(
+				salary_structure.currency, income_tax_slab_currency
+			)
+		)
+
+
+def get_employee_details_for_assignment(employees):
+	Employee = frappe.qb.DocType("Employee")
+	Department = frappe.qb.DocType("Department")
+	EmployeeGrade = frappe.qb.DocType("Employee Grade")
+
+	return (
+		frappe.qb.from_(Employee)
+		.left_join(Department)
+		.on(Department.name == Employee.department)
+		.left_join(EmployeeGrade)
+		.on(EmployeeGrade.name == Employee.grade)
+		.select(
+			Employee.name.as_("employee"),
+			Employee.employee_name,
+			Employee.department,
+			Employee.designation,
+			Employee.grade,
+			Employee.date_of_joining,
+			Employee.relieving_date,
+			Coalesce(
+				NullIf(Employee.payroll_cost_center, ""), Department.payroll_cost_center
+			).as_("payroll_cost_center"),
+			EmployeeGrade.default_base_pay,
+		)
+		.where(Employee.name.isin(employees))
+		.orderby(Employee.name)
+	).run(as_dict=True)
+
+
+def validate_employees_for_assignment(employee_details, from_date):
+	"""Validates assignment dates of all employees like `SalaryStructureAssignment.validate_dates`"""
+	if not from_date:
+		return
+
+	from_date = getdate(from_date)
+	existing_assignments = set(
+		frappe.get_all(
+			"Salary Structure Assignment",
+			filters={
+				"employee": ("in", [d.employee for d in employee_details]),
+				"from_date": from_date,
+				"docstatus": 1,
+			},
+			pluck="employee",
+		)
+	)
+
+	errors = []
+	for d in employee_details:
+		if d.employee in existing_assignments:
+			errors.append(
+				_("Salary Structure Assignment for Employee {0} already exists").format(d.employee)
+			)
+		elif d.date_of_joining and from_date < d.date_of_joining:
+			errors.append(
+				_("From Date {0} cannot be before employee {1}'s joining Date {2}").format(
+					from_date, d.employee, d.date_of_joining
+				)
+			)
+		elif d.relieving_date and from_date > d.relieving_date:
+			errors.append(
+				_("From Date {0} cannot be after employee {1}'s relieving Date {2}").format(
+					from_date, d.employee, d.relieving_date
+				)
+			)
+
+	if errors:
+		frappe.throw("<br>".join(errors), title=_("Invalid Salary Structure Assignments"))
+
+
+def insert_salary_structure_assignments(
+	employee_details,
+	salary_structure,
+	payroll_payable_account,
+	from_date,
+	base,
+	variable,
+	income_tax_slab=None,
+):
+	"""Inserts submitted assignments for validated employees without loading documents"""
+	names = get_names_from_series(
+		frappe.get_meta("Salary Structure Assignment").autoname, len(employee_details)
+	)
+	timestamp, user = now(), frappe.session.user
+
+	frappe.db.bulk_insert(
+		"Salary Structure Assignment",
+		fields=[
+			"name",
+			"employee",
+			"employee_name",
+			"department",
+			"designation",
+			"grade",
+			"salary_structure",
+			"from_date",
+			"company",
+			"currency",
+			"base",
+			"variable",
+			"income_tax_slab",
+			"payroll_payable_account",
+			"docstatus",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				name,
+				d.employee,
+				d.employee_name,
+				d.department,
+				d.designation,
+				d.grade,
+				salary_structure.name,
+				from_date,
+				salary_structure.company,
+				salary_structure.currency,
+				# base pay defaults to the employee grade's base pay
+				flt(base) or flt(d.default_base_pay),
+				flt(variable),
+				income_tax_slab,
+				payroll_payable_account,
+				1,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for name, d in zip(names, employee_details)
+		],
+	)
+
+	frappe.db.bulk_insert(
+		"Employee Cost Center",
+		fields=[
+			"name",
+			"parent",
+			"parenttype",
+			"parentfield",
+			"idx",
+			"cost_center",
+			"percentage",
+			"docstatus",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				name,
+				"Salary Structure Assignment",
+				"payroll_cost_centers",
+				1,
+				d.payroll_cost_center,
+				100,
+				1,
+				timestamp,
+				timestamp,
+				user,
+				user,
+			)
+			for name, d in zip(names, employee_details)
+			if d.payroll_cost_center
+		],
+	)
+
+	return names
 
 
 def get_existing_assignments(employees, salary_structure, from_date):
@@ -0,0 +1,390 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import date_diff, flt, getdate, nowdate
+
+from hrms.payroll.doctype.payroll_entry.payroll_entry import get_start_end_dates
+from hrms.payroll.doctype.salary_slip.salary_slip import calculate_tax_by_tax_slab
+from hrms.payroll.utils import (
+	FORMULA_GLOBALS,
+	get_compiled_expression,
+	get_referenced_names,
+	safe_eval_compiled,
+	sanitize_expression,
+)
+
+# Employee fields the preview can be filtered on, company and status are always those of the structure
+EMPLOYEE_FILTER_FIELDS = ("branch", "department", "designation", "grade", "employment_type")
+
+PERIODS_PER_YEAR = {
+	"Monthly": 12,
+	"Bimonthly": 24,
+	"Fortnightly": 26,
+	"Weekly": 52,
+	"Daily": 365,
+}
+
+
+@frappe.whitelist()
+def get_payroll_cost_preview(
+	salary_structure: str,
+	employees: list | str | None = None,
+	filters: dict | str | None = None,
+	posting_date: str | None = None,
+	income_tax_slab: str | None = None,
+) -> dict:
+	"""
+	Evaluates a salary structure for many employees at once without creating Salary Slips.
+
+	Components are evaluated column by column, i.e. one structure row across all employees,
+	so each condition and formula is compiled once for the whole preview.
+
+	Args:
+	    salary_structure: Salary Structure to evaluate
+	    employees: list of employees to evaluate the structure for
+	    filters: Employee filters on `EMPLOYEE_FILTER_FIELDS` used when `employees` is not passed
+	    posting_date: date within the payroll period to preview, defaults to today
+	    income_tax_slab: slab used for tax components instead of the one on the employee's assignment
+
+	Returns:
+	    dict: per employee totals, aggregate totals and per employee errors. Income tax is an
+	    estimate, see `PayrollCostPreview.evaluate_tax_component`
+	"""
+	frappe.has_permission("Salary Structure", "read", salary_structure, throw=True)
+	frappe.has_permission("Salary Structure Assignment", "read", throw=True)
+
+	if isinstance(employees, str):
+		employees = json.loads(employees)
+	if isinstance(filters, str):
+		filters = json.loads(filters)
+
+	return PayrollCostPreview(
+		salary_structure, employees, filters, posting_date, income_tax_slab
+	).run()
+
+
+class PayrollCostPreview:
+	def __init__(
+		self,
+		salary_structure: str,
+		employees: list | None = None,
+		filters: dict | None = None,
+		posting_date: str | None = None,
+		income_tax_slab: str | None = None,
+	):
+		self.structure = frappe.get_cached_doc("Salary Structure", salary_structure)
+		self.posting_date = getdate(posting_date or nowdate())
+		self.income_tax_slab = income_tax_slab
+
+		dates = get_start_end_dates(
+			self.structure.payroll_frequency or "Monthly", self.posting_date, self.structure.company
+		)
+		self.start_date, self.end_date = getdate(dates.start_date), getdate(dates.end_date)
+		self.working_days = date_diff(self.end_date, self.start_date) + 1
+		self.periods_per_year = PERIODS_PER_YEAR.get(self.structure.payroll_frequency, 12)
+
+		self.errors = []
+		employee_names = self.get_employee_names(employees, filters)
+		self.assignments = self.get_latest_assignments(employee_names)
+		self.employees = self.get_employees(employee_names)
+
+	def get_employee_names(self, employees: list | None, filters: dict | None) -> list[str]:
+		"""Returns active employees of the structure's company the user is permitted to read"""
+		employee_filters = {"status": "Active", "company": self.structure.company}
+		if employees:
+			employee_filters["name"] = ("in", employees)
+		elif filters:
+			if invalid_fields := set(filters) - set(EMPLOYEE_FILTER_FIELDS):
+				frappe.throw(
+					_("Employees cannot be filtered on {0}").format(", ".join(sorted(invalid_fields))),
+					title=_("Invalid Filters"),
+				)
+			employee_filters.update(filters)
+
+		return frappe.get_list("Employee", filters=employee_filters, pluck="name", order_by="name")
+
+	def get_employees(self, employee_names: list[str]) -> list[dict]:
+		if not employee_names:
+			return []
+
+		return frappe.get_all(
+			"Employee",
+			filters={"name": ("in", employee_names)},
+			fields=self.get_employee_fields(),
+			order_by="name",
+		)
+
+	def get_employee_fields(self) -> list[str]:
+		"""Returns the Employee fields referenced by the structure's conditions and formulas
+		and by the conditions of the income tax slabs used in the preview"""
+		expressions = [
+			struct_row.get(fieldname)
+			for struct_row in self.structure.earnings + self.structure.deductions
+			for fieldname in ("condition", "formula")
+		]
+
+		tax_slabs = {self.income_tax_slab} if self.income_tax_slab else set()
+		if not self.income_tax_slab:
+			tax_slabs.update(assignment.income_tax_slab for assignment in self.assignments.values())
+
+		for tax_slab in filter(None, tax_slabs):
+			slabs = frappe.get_cached_doc("Income Tax Slab", tax_slab).slabs
+			expressions.extend(slab.condition for slab in slabs)
+
+		names = set()
+		for expression in filter(None, map(sanitize_expression, expressions)):
+			try:
+				names |= get_referenced_names(get_compiled_expression(expression))
+			except SyntaxError:
+				# reported when the expression is evaluated
+				continue
+
+		employee_fields = set(frappe.get_meta("Employee").get_valid_columns())
+		return ["name", "employee_name", *sorted(names & employee_fields - {"name", "employee_name"})]
+
+	def run(self) -> dict:
+		rows = self.get_rows()
+		component_values = {
+			abbr: 0 for abbr in frappe.get_all("Salary Component", pluck="salary_component_abbr")
+		}
+
+		for row in rows:
+			data = frappe._dict(component_values)
+			data.update(row.assignment)
+			data.update(row.employee)
+			data.update(
+				{
+					"salary_structure": self.structure.name,
+					"start_date": self.start_date,
+					"end_date": self.end_date,
+					"posting_date": self.posting_date,
+					"payroll_frequency": self.structure.payroll_frequency,
+					"total_working_days": self.working_days,
+					"payment_days": self.working_days,
+				}
+			)
+			row.data = data
+
+		for component_type in ("earnings", "deductions"):
+			for struct_row in self.structure.get(component_type):
+				if is_tax_component(struct_row):
+					self.evaluate_tax_component(struct_row, rows)
+				else:
+					self.evaluate_component(struct_row, component_type, rows)
+
+			self.set_totals(
+				rows, component_type, "gross_pay" if component_type == "earnings" else "total_deduction"
+			)
+
+		return self.get_result(rows)
+
+	def get_rows(self) -> list:
+		rows = []
+
+		for employee in self.employees:
+			assignment = self.assignments.get(employee.name)
+			if not assignment:
+				self.errors.append(
+					{
+						"employee": employee.name,
+						"error": _("No Salary Structure Assignment found on or before {0}").format(
+							frappe.bold(self.start_date)
+						),
+					}
+				)
+				continue
+
+			rows.append(
+				frappe._dict(
+					employee=employee,
+					assignment=assignment,
+					earnings={},
+					deductions={},
+					gross_pay=0.0,
+					total_deduction=0.0,
+					income_tax=0.0,
+				)
+			)
+
+		return rows
+
+	def get_latest_assignments(self, employee_names: list[str]) -> dict:
+		if not employee_names:
+			return {}
+
+		assignments = frappe.get_all(
+			"Salary Structure Assignment",
+			filters={
+				"employee": ("in", employee_names),
+				"docstatus": 1,
+				"from_date": ("<=", self.end_date),
+			},
+			fields=["*"],
+			order_by="from_date desc",
+		)
+
+		latest_assignments = {}
+		for assignment in assignments:
+			latest_assignments.setdefault(assignment.employee, assignment)
+
+		return latest_assignments
+
+	def evaluate_component(self, struct_row, component_type: str, rows: list) -> None:
+		condition = self.compile(struct_row, "condition")
+		formula = self.compile(struct_row, "formula") if struct_row.amount_based_on_formula else None
+		precision = struct_row.precision("amount")
+
+		for row in rows:
+			if row.get("error"):
+				continue
+
+			try:
+				if condition and not safe_eval_compiled(condition, FORMULA_GLOBALS, row.data):
+					continue
+
+				amount = struct_row.amount
+				if formula:
+					amount = flt(safe_eval_compiled(formula, FORMULA_GLOBALS, row.data), precision)
+			except Exception as e:
+				self.set_error(row, struct_row, e)
+				continue
+
+			if amount:
+				row.data[struct_row.abbr] = amount
+
+			if amount is None or struct_row.statistical_component:
+				continue
+
+			row[component_type][struct_row.salary_component] = frappe._dict(
+				amount=flt(amount),
+				abbr=struct_row.abbr,
+				do_not_include_in_total=struct_row.do_not_include_in_total,
+				is_tax_applicable=struct_row.is_tax_applicable,
+				is_flexible_benefit=struct_row.is_flexible_benefit,
+				exempted_from_income_tax=struct_row.exempted_from_income_tax,
+			)
+
+	def evaluate_tax_component(self, struct_row, rows: list) -> None:
+		"""Estimates income tax as the slab tax on this period's taxable earnings annualized over
+		`PERIODS_PER_YEAR`, spread evenly across the year. Unlike a Salary Slip, earnings and tax
+		to date, remaining periods of the payroll period, exemption declarations and proofs are not
+		considered, so the amount is an approximation of the slip's tax"""
+		for row in rows:
+			if row.get("error"):
+				continue
+
+			tax_slab_name = self.income_tax_slab or row.assignment.income_tax_slab
+			if not tax_slab_name:
+				continue
+
+			tax_slab = frappe.get_cached_doc("Income Tax Slab", tax_slab_name)
+			taxable_earnings = sum(
+				d.amount
+				for d in row.earnings.values()
+				if d.is_tax_applicable and not d.is_flexible_benefit
+			)
+
+			if tax_slab.allow_tax_exemption:
+				taxable_earnings -= sum(
+					d.amount for d in row.deductions.values() if d.exempted_from_income_tax
+				)
+
+			annual_taxable_earnings = taxable_earnings * self.periods_per_year
+			if tax_slab.allow_tax_exemption:
+				annual_taxable_earnings -= flt(tax_slab.standard_tax_exemption_amount)
+
+			try:
+				annual_tax = calculate_tax_by_tax_slab(
+					annual_taxable_earnings, tax_slab, dict(FORMULA_GLOBALS), row.data.copy()
+				)
+			except Exception as e:
+				self.set_error(row, struct_row, e)
+				continue
+
+			tax_amount = flt(max(annual_tax, 0) / self.periods_per_year, struct_row.precision("amount"))
+			row.data[struct_row.abbr] = tax_amount
+			row.income_tax += tax_amount
+			row.deductions[struct_row.salary_component] = frappe._dict(
+				amount=tax_amount, abbr=struct_row.abbr, do_not_include_in_total=0
+			)
+
+	def set_totals(self, rows: list, component_type: str, fieldname: str) -> None:
+		for row in rows:
+			row[fieldname] = sum(
+				d.amount for d in row[component_type].values() if not d.do_not_include_in_total
+			)
+			row.data[fieldname] = row[fieldname]
+
+	def compile(self, struct_row, fieldname: str):
+		expression = sanitize_expression(struct_row.get(fieldname))
+		if not expression:
+			return None
+
+		try:
+			return get_compiled_expression(expression)
+		except SyntaxError as e:
+			frappe.throw(
+				_("Syntax error in {0} of Salary Component {1}: {2}").format(
+					fieldname, frappe.bold(struct_row.salary_component), e
+				),
+				title=_("Syntax error"),
+			)
+
+	def set_error(self, row, struct_row, error: Exception) -> None:
+		row.error = _("Error while evaluating Salary Component {0}: {1}").format(
+			struct_row.salary_component, error
+		)
+		self.errors.append({"employee": row.employee.name, "error": row.error})
+
+	def get_result(self, rows: list) -> dict:
+		employees = []
+		totals = frappe._dict(gross_pay=0.0, total_deduction=0.0, income_tax=0.0, net_pay=0.0)
+
+		for row in rows:
+			if row.get("error"):
+				continue
+
+			net_pay = flt(row.gross_pay - row.total_deduction)
+			employees.append(
+				{
+					"employee": row.employee.name,
+					"employee_name": row.employee.employee_name,
+					"base": flt(row.assignment.base),
+					"variable": flt(row.assignment.variable),
+					"gross_pay": flt(row.gross_pay),
+					"total_deduction": flt(row.total_deduction),
+					"income_tax": flt(row.income_tax),
+					"net_pay": net_pay,
+					"earnings": {component: d.amount for component, d in row.earnings.items()},
+					"deductions": {component: d.amount for component, d in row.deductions.items()},
+				}
+			)
+
+			totals.gross_pay += flt(row.gross_pay)
+			totals.total_deduction += flt(row.total_deduction)
+			totals.income_tax += flt(row.income_tax)
+			totals.net_pay += net_pay
+
+		return {
+			"salary_structure": self.structure.name,
+			"start_date": self.start_date,
+			"end_date": self.end_date,
+			"employees": employees,
+			"totals": totals,
+			"total_cost": totals.gross_pay,
+			# see `evaluate_tax_component`
+			"income_tax_is_approximate": True,
+			"errors": self.errors,
+		}
+
+
+def is_tax_component(struct_row) -> bool:
+	return bool(
+		struct_row.variable_based_on_taxable_salary
+		and not struct_row.formula
+		and not flt(struct_row.amount)
+	)
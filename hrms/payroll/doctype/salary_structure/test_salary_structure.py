@@ -75,6 +75,59 @@ class TestSalaryStructure(FrappeTestCase):
 
 		self.assertEqual(assignment.base * 0.2, ss.deductions[0].amount)
 
+	def test_compiled_formula_cache(self):
+		from hrms.payroll.utils import get_compiled_expression
+
+		emp = make_employee("test_compiled_formula@salary.com")
+		sal_struct = make_salary_structure("Salary Structure Compiled Formula", "Monthly", dont_submit=True)
+		sal_struct.earnings = [sal_struct.earnings[0]]
+		sal_struct.earnings[0].amount_based_on_formula = 1
+		sal_struct.earnings[0].formula = "base * 0.5"
+		sal_struct.deductions = []
+		sal_struct.submit()
+
+		create_salary_structure_assignment(emp, sal_struct.name)
+		ss = make_salary_slip(sal_struct.name, employee=emp)
+		self.assertEqual(ss.earnings[0].amount, 25000)
+
+		hits = get_compiled_expression.cache_info().hits
+		make_salary_slip(sal_struct.name, employee=emp)
+		self.assertGreater(get_compiled_expression.cache_info().hits, hits)
+
+		# unsafe attributes are blocked like in frappe.safe_eval
+		self.assertRaises(SyntaxError, get_compiled_expression, "'{0}'.format(base)")
+
+	def test_payroll_cost_preview(self):
+		from hrms.payroll.doctype.salary_structure.salary_structure_preview import (
+			get_payroll_cost_preview,
+		)
+
+		sal_struct = make_salary_structure("Salary Structure Preview", "Monthly")
+		employees = []
+		for i in range(3):
+			emp = make_employee(f"test_payroll_preview_{i}@salary.com", company=sal_struct.company)
+			create_salary_structure_assignment(emp, sal_struct.name)
+			employees.append(emp)
+
+		preview = get_payroll_cost_preview(sal_struct.name, employees=employees)
+		self.assertEqual(len(preview["employees"]), 3)
+		self.assertFalse(preview["errors"])
+
+		ss = make_salary_slip(sal_struct.name, employee=employees[0])
+		row = next(d for d in preview["employees"] if d["employee"] == employees[0])
+		self.assertEqual(row["gross_pay"], ss.gross_pay)
+		self.assertEqual(preview["total_cost"], ss.gross_pay * 3)
+		# tax is annualized from a single period instead of the slip's payroll period computation
+		self.assertTrue(preview["income_tax_is_approximate"])
+
+		# company and status of the structure cannot be overridden by filters
+		self.assertRaises(
+			frappe.ValidationError,
+			get_payroll_cost_preview,
+			sal_struct.name,
+			filters={"company": "_Test Company"},
+		)
+
 	def test_amount_totals(self):
 		frappe.db.set_single_value("Payroll Settings", "include_holidays_in_total_working_days", 0)
 		sal_slip = frappe.get_value("Salary Slip", {"employee_name": "test_employee_2@salary.com"})
@@ -132,6 +185,47 @@ class TestSalaryStructure(FrappeTestCase):
 		self.assertEqual(salary_structure_assignment.base, 5000)
 		self.assertEqual(salary_structure_assignment.variable, 200)
 
+	def test_bulk_salary_structure_assignment(self):
+		from hrms.payroll.doctype.salary_structure.salary_structure import (
+			assign_salary_structure_for_employees,
+		)
+
+		company_currency = erpnext.get_default_currency()
+		salary_structure = make_salary_structure(
+			"Salary Structure Sample", "Monthly", currency=company_currency
+		)
+		employees = [
+			make_employee("test_bulk_assignment_1@salary.com"),
+			make_employee("test_bulk_assignment_2@salary.com"),
+		]
+
+		assign_salary_structure_for_employees(
+			employees, salary_structure, from_date="2013-01-01", base=5000, variable=200
+		)
+		assignments = frappe.get_all(
+			"Salary Structure Assignment",
+			filters={"employee": ("in", employees), "from_date": "2013-01-01"},
+			fields=["name", "employee", "docstatus", "base", "variable", "currency"],
+		)
+		self.assertEqual(sorted(d.employee for d in assignments), sorted(employees))
+		for assignment in assignments:
+			self.assertEqual(assignment.docstatus, 1)
+			self.assertEqual(assignment.base, 5000)
+			self.assertEqual(assignment.variable, 200)
+			self.assertEqual(assignment.currency, company_currency)
+
+		# another structure cannot be assigned from the same date
+		other_structure = make_salary_structure(
+			"Salary Structure Sample 2", "Monthly", currency=company_currency
+		)
+		self.assertRaises(
+			frappe.ValidationError,
+			assign_salary_structure_for_employees,
+			employees,
+			other_structure,
+			from_date="2013-01-01",
+		)
+
 	def test_employee_grade_defaults(self):
 		salary_structure = make_salary_structure(
 			"Salary Structure - Lead", "Monthly", currency="INR", company="_Test Company"
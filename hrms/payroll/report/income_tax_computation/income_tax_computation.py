@@ -8,6 +8,7 @@ from frappe.utils import add_days, flt, getdate, rounded
 
 from hrms.payroll.doctype.payroll_entry.payroll_entry import get_start_end_dates
 from hrms.payroll.doctype.salary_slip.salary_slip import calculate_tax_by_tax_slab
+from hrms.payroll.utils import get_compiled_expression, get_referenced_names, sanitize_expression
 
 
 def execute(filters=None):
@@ -114,13 +115,24 @@ class IncomeTaxComputationReport(object):
 		return employee_ss_assignments
 
 	def get_future_salary_slips(self):
+		"""Projects salary slips for the remaining payroll period. Employees with identical inputs
+		(salary structure, projected periods, assignment values and employee fields used in formulas)
+		form a cohort whose slips are computed once and shared"""
 		self.future_salary_slips = frappe._dict()
-		for employee in list(self.employees.keys()):
-			last_ss = self.get_last_salary_slip(employee)
+		self.projected_periods = {}
+
+		employees = list(self.employees.keys())
+		last_salary_slips = self.get_last_salary_slips(employees)
+		self.assignments = self.get_assignments_for_projection(employees)
+		self.employees_with_adjustments = self.get_employees_with_salary_adjustments(employees)
+		self.employee_fields = frappe._dict()
+
+		projection_args = {}
+		for employee in employees:
+			last_ss = last_salary_slips.get(employee)
 			if last_ss and last_ss.end_date == self.payroll_period_end_date:
 				continue
 
-			relieving_date = self.employees[employee].get("relieving_date", "")
 			if last_ss:
 				ss_start_date = add_days(last_ss.end_date, 1)
 			else:
@@ -132,40 +144,285 @@ class IncomeTaxComputationReport(object):
 					}
 				)
 
-			while getdate(ss_start_date) < getdate(self.payroll_period_end_date) and (
-				not relieving_date or getdate(ss_start_date) < relieving_date
-			):
-				ss_end_date = get_start_end_dates(last_ss.payroll_frequency, ss_start_date).end_date
-
-				ss = frappe.new_doc("Salary Slip")
-				ss.employee = employee
-				ss.start_date = ss_start_date
-				ss.end_date = ss_end_date
-				ss.salary_structure = last_ss.salary_structure
-				ss.payroll_frequency = last_ss.payroll_frequency
-				ss.company = self.filters.company
-				try:
-					ss.process_salary_structure(for_preview=1)
-					self.future_salary_slips.setdefault(employee, []).append(ss.as_dict())
-				except Exception:
-					break
+			periods = self.get_projection_periods(
+				last_ss.payroll_frequency, ss_start_date, self.employees[employee].get("relieving_date")
+			)
+			if periods:
+				projection_args[employee] = (last_ss, periods)
+
+		self.set_employee_fields_used_in_formulas(projection_args)
+
+		projections = {}
+		for employee, (last_ss, periods) in projection_args.items():
+			key = self.get_projection_key(employee, last_ss, periods)
+			if key not in projections:
+				projections[key] = self.project_salary_slips(employee, last_ss, periods)
 
-				ss_start_date = add_days(ss_end_date, 1)
+			if projections[key]:
+				self.future_salary_slips[employee] = projections[key]
 
-	def get_last_salary_slip(self, employee):
-		last_salary_slip = frappe.db.get_value(
+	def get_last_salary_slips(self, employees):
+		salary_slips = frappe.get_all(
 			"Salary Slip",
-			{
-				"employee": employee,
+			filters={
+				"employee": ["in", employees],
 				"docstatus": 1,
 				"start_date": ["between", [self.payroll_period_start_date, self.payroll_period_end_date]],
 			},
-			["start_date", "end_date", "salary_structure", "payroll_frequency"],
+			fields=["employee", "start_date", "end_date", "salary_structure", "payroll_frequency"],
 			order_by="start_date desc",
-			as_dict=1,
 		)
 
-		return last_salary_slip
+		last_salary_slips = {}
+		for d in salary_slips:
+			last_salary_slips.setdefault(d.employee, d)
+
+		return last_salary_slips
+
+	def get_assignments_for_projection(self, employees):
+		assignments = frappe.get_all(
+			"Salary Structure Assignment",
+			filters={
+				"employee": ["in", employees],
+				"docstatus": 1,
+				"from_date": ["<=", self.payroll_period_end_date],
+			},
+			fields=["*"],
+			order_by="from_date desc",
+		)
+
+		assignments_by_employee = {}
+		for d in assignments:
+			assignments_by_employee.setdefault(d.employee, []).append(d)
+
+		return assignments_by_employee
+
+	def get_employees_with_salary_adjustments(self, employees):
+		"""Employees whose future slips depend on more than their salary structure assignment
+		are projected individually"""
+		start_date, end_date = self.payroll_period_start_date, self.payroll_period_end_date
+
+		employees_with_adjustments = set(
+			frappe.get_all(
+				"Additional Salary",
+				filters={"employee": ["in", employees], "docstatus": 1, "disabled": 0},
+				or_filters={
+					"payroll_date": ["between", [start_date, end_date]],
+					"to_date": [">=", start_date],
+				},
+				pluck="employee",
+			)
+		)
+		employees_with_adjustments.update(
+			frappe.get_all(
+				"Employee Benefit Application",
+				filters={
+					"employee": ["in", employees],
+					"docstatus": 1,
+					"payroll_period": self.filters.payroll_period,
+				},
+				pluck="employee",
+			)
+		)
+
+		# leave without pay and partially paid leaves reduce payment days of future slips
+		lwp_leave_types = frappe.get_all(
+			"Leave Type", or_filters={"is_lwp": 1, "is_ppl": 1}, pluck="name"
+		)
+		if lwp_leave_types:
+			employees_with_adjustments.update(
+				frappe.get_all(
+					"Leave Application",
+					filters={
+						"employee": ["in", employees],
+						"docstatus": 1,
+						"status": "Approved",
+						"leave_type": ["in", lwp_leave_types],
+						"to_date": [">=", start_date],
+						"from_date": ["<=", end_date],
+					},
+					pluck="employee",
+				)
+			)
+
+		if frappe.db.get_single_value("Payroll Settings", "payroll_based_on") == "Attendance":
+			employees_with_adjustments.update(
+				frappe.get_all(
+					"Attendance",
+					filters={
+						"employee": ["in", employees],
+						"docstatus": 1,
+						"status": ["in", ["Absent", "Half Day"]],
+						"attendance_date": ["between", [start_date, end_date]],
+					},
+					pluck="employee",
+				)
+			)
+
+		return employees_with_adjustments
+
+	def get_projection_periods(self, payroll_frequency, ss_start_date, relieving_date):
+		periods = []
+		while getdate(ss_start_date) < getdate(self.payroll_period_end_date) and (
+			not relieving_date or getdate(ss_start_date) < relieving_date
+		):
+			key = (payroll_frequency, getdate(ss_start_date))
+			if key not in self.projected_periods:
+				self.projected_periods[key] = get_start_end_dates(payroll_frequency, ss_start_date).end_date
+
+			ss_end_date = self.projected_periods[key]
+			periods.append((getdate(ss_start_date), getdate(ss_end_date)))
+			ss_start_date = add_days(ss_end_date, 1)
+
+		return tuple(periods)
+
+	def set_employee_fields_used_in_formulas(self, projection_args):
+		"""Fetches values of employee fields referenced by conditions and formulas of projected structures"""
+		self.formula_names = {}
+		for last_ss, periods in projection_args.values():
+			if last_ss.salary_structure not in self.formula_names:
+				self.formula_names[last_ss.salary_structure] = self.get_names_used_in_formulas(
+					last_ss.salary_structure
+				)
+
+		employee_meta = frappe.get_meta("Employee")
+		fields = {
+			name
+			for names in self.formula_names.values()
+			for name in names
+			if employee_meta.has_field(name)
+		}
+		if not fields or not projection_args:
+			return
+
+		for d in frappe.get_all(
+			"Employee",
+			filters={"name": ["in", list(projection_args)]},
+			fields=["name", *fields],
+		):
+			self.employee_fields[d.name] = d
+
+	def get_names_used_in_formulas(self, salary_structure):
+		if not salary_structure:
+			return ()
+
+		structure = frappe.get_cached_doc("Salary Structure", salary_structure)
+		names = set()
+		for row in structure.earnings + structure.deductions:
+			for fieldname in ("condition", "formula"):
+				expression = sanitize_expression(row.get(fieldname))
+				if not expression:
+					continue
+
+				try:
+					code = get_compiled_expression(expression)
+				except SyntaxError:
+					continue
+
+				names |= get_referenced_names(code)
+
+		return tuple(sorted(names))
+
+	def get_projection_key(self, employee, last_ss, periods):
+		"""Returns a key identifying all inputs of the projected salary slips of the employee"""
+		if employee in self.employees_with_adjustments:
+			return (employee,)
+
+		details = self.employees[employee]
+		names = self.formula_names.get(last_ss.salary_structure, ())
+		employee_fields = self.employee_fields.get(employee, {})
+		if "employee" in names or "name" in names or "employee_name" in names:
+			return (employee,)
+
+		period_inputs = []
+		for start_date, end_date in periods:
+			assignment = self.get_applicable_assignment(employee, last_ss.salary_structure, start_date)
+			if not assignment:
+				period_inputs.append((start_date, end_date))
+				continue
+
+			period_inputs.append(
+				(
+					start_date,
+					end_date,
+					flt(assignment.base),
+					flt(assignment.variable),
+					tuple(str(assignment.get(name)) for name in names if name in assignment),
+				)
+			)
+
+		date_of_joining = details.get("date_of_joining")
+		relieving_date = details.get("relieving_date")
+		return (
+			last_ss.salary_structure,
+			last_ss.payroll_frequency,
+			tuple(period_inputs),
+			self.get_employee_holiday_list(employee),
+			# joining and relieving dates only affect payment days within the projected periods
+			date_of_joining if date_of_joining and date_of_joining > periods[0][0] else None,
+			relieving_date if relieving_date and relieving_date <= periods[-1][1] else None,
+			tuple(str(employee_fields.get(name)) for name in names if name in employee_fields),
+		)
+
+	def get_applicable_assignment(self, employee, salary_structure, start_date):
+		date_of_joining = self.employees[employee].get("date_of_joining")
+		date_to_validate = max(start_date, date_of_joining) if date_of_joining else start_date
+
+		return next(
+			(
+				d
+				for d in self.assignments.get(employee, [])
+				if d.salary_structure == salary_structure and d.from_date <= date_to_validate
+			),
+			None,
+		)
+
+	def get_employee_holiday_list(self, employee):
+		if not hasattr(self, "holiday_lists"):
+			self.holiday_lists = dict(
+				frappe.get_all(
+					"Employee",
+					filters={"name": ["in", list(self.employees.keys())]},
+					fields=["name", "holiday_list"],
+					as_list=1,
+				)
+			)
+
+		return self.holiday_lists.get(employee)
+
+	def project_salary_slips(self, employee, last_ss, periods):
+		salary_slips = []
+		for ss_start_date, ss_end_date in periods:
+			ss = frappe.new_doc("Salary Slip")
+			ss.employee = employee
+			ss.start_date = ss_start_date
+			ss.end_date = ss_end_date
+			ss.salary_structure = last_ss.salary_structure
+			ss.payroll_frequency = last_ss.payroll_frequency
+			ss.company = self.filters.company
+			try:
+				ss.process_salary_structure(for_preview=1)
+			except Exception:
+				break
+
+			# only the amounts used by the report are kept, shared by all employees in the cohort
+			salary_slips.append(
+				frappe._dict(
+					base_gross_pay=ss.base_gross_pay,
+					earnings=[self.get_projected_component(d) for d in ss.earnings],
+					deductions=[self.get_projected_component(d) for d in ss.deductions],
+				)
+			)
+
+		return salary_slips
+
+	def get_projected_component(self, row):
+		return frappe._dict(
+			salary_component=row.salary_component,
+			amount=row.amount,
+			is_tax_applicable=row.is_tax_applicable,
+			exempted_from_income_tax=row.exempted_from_income_tax,
+		)
 
 	def get_ctc(self):
 		# Get total earnings from existing salary slip
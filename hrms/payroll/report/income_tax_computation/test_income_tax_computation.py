@@ -12,8 +12,14 @@ from hrms.payroll.doctype.salary_slip.test_salary_slip import (
 	create_salary_slips_for_payroll_period,
 	create_tax_slab,
 )
-from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
-from hrms.payroll.report.income_tax_computation.income_tax_computation import execute
+from hrms.payroll.doctype.salary_structure.test_salary_structure import (
+	create_salary_structure_assignment,
+	make_salary_structure,
+)
+from hrms.payroll.report.income_tax_computation.income_tax_computation import (
+	IncomeTaxComputationReport,
+	execute,
+)
 
 
 class TestIncomeTaxComputation(FrappeTestCase):
@@ -51,7 +57,7 @@ class TestIncomeTaxComputation(FrappeTestCase):
 			effective_date=getdate("2019-04-01"),
 			company="_Test Company",
 		)
-		salary_structure = make_salary_structure(
+		self.salary_structure = make_salary_structure(
 			"Monthly Salary Structure Test Income Tax Computation",
 			"Monthly",
 			employee=self.employee,
@@ -64,7 +70,7 @@ class TestIncomeTaxComputation(FrappeTestCase):
 		create_exemption_declaration(self.employee, self.payroll_period.name)
 
 		create_salary_slips_for_payroll_period(
-			self.employee, salary_structure.name, self.payroll_period, deduct_random=False, num=3
+			self.employee, self.salary_structure.name, self.payroll_period, deduct_random=False, num=3
 		)
 
 	def test_report(self):
@@ -113,3 +119,35 @@ class TestIncomeTaxComputation(FrappeTestCase):
 
 		for key, val in expected_data.items():
 			self.assertEqual(result[1][0].get(key), val)
+
+	def test_future_salary_slips_projected_per_cohort(self):
+		employees = []
+		for idx, base in enumerate([65000, 65000, 80000]):
+			employee = make_employee(
+				f"employee_tax_computation_cohort{idx}@example.com",
+				company="_Test Company",
+				date_of_joining=getdate("01-10-2021"),
+			)
+			create_salary_structure_assignment(
+				employee,
+				self.salary_structure.name,
+				from_date=self.payroll_period.start_date,
+				company="_Test Company",
+				currency="INR",
+				payroll_period=self.payroll_period,
+				base=base,
+			)
+			employees.append(employee)
+
+		report = IncomeTaxComputationReport(
+			{"company": "_Test Company", "payroll_period": self.payroll_period.name}
+		)
+		report.run()
+
+		# employees with identical inputs share the projected salary slips
+		self.assertIs(report.future_salary_slips[employees[0]], report.future_salary_slips[employees[1]])
+		self.assertIsNot(
+			report.future_salary_slips[employees[0]], report.future_salary_slips[employees[2]]
+		)
+		self.assertEqual(report.employees[employees[0]].ctc, report.employees[employees[1]].ctc)
+		self.assertGreater(report.employees[employees[2]].ctc, report.employees[employees[0]].ctc)
@@ -51,5 +51,27 @@ frappe.query_reports["Salary Register"] = {
 			"default": "Submitted",
 			"width": "100px"
 		}
-	]
+	],
+	onload: function(report) {
+		["CSV", "XLSX"].forEach((file_format) => {
+			report.page.add_menu_item(__("Export {0} in Background", [file_format]), () => {
+				frappe.call({
+					method: "hrms.payroll.report.salary_register.salary_register.export_salary_register",
+					args: {
+						filters: report.get_values(),
+						file_format: file_format,
+					},
+				});
+			});
+		});
+
+		frappe.realtime.off("salary_register_export");
+		frappe.realtime.on("salary_register_export", (data) => {
+			frappe.msgprint(
+				__("Salary Register is ready for download: {0}", [
+					`<a href="${data.file_url}" target="_blank">${__("Download")}</a>`
+				])
+			);
+		});
+	}
 }
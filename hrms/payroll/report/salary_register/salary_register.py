@@ -1,10 +1,11 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import csv
 
 import frappe
 from frappe import _
-from frappe.utils import flt
+from frappe.utils import add_days, flt, now_datetime
 
 import erpnext
 
@@ -12,6 +13,9 @@ salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 salary_component = frappe.qb.DocType("Salary Component")
 
+SALARY_REGISTER_CHUNK_SIZE = 1000
+SALARY_REGISTER_EXPORT_EXPIRY_DAYS = 7
+
 
 def execute(filters=None):
 	if not filters:
@@ -22,73 +26,81 @@ def execute(filters=None):
 		currency = filters.get("currency")
 	company_currency = erpnext.get_company_currency(filters.get("company"))
 
-	salary_slips = get_salary_slips(filters, company_currency)
-	if not salary_slips:
+	earning_types, ded_types = get_earning_and_deduction_types(filters, company_currency)
+	columns = get_columns(earning_types, ded_types)
+
+	data = list(
+		get_salary_register_rows(filters, columns, earning_types, ded_types, currency, company_currency)
+	)
+	if not data:
 		return [], []
 
-	earning_types, ded_types = get_earning_and_deduction_types(salary_slips)
-	columns = get_columns(earning_types, ded_types)
+	return columns, data
 
-	ss_earning_map = get_salary_slip_details(salary_slips, currency, company_currency, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, currency, company_currency, "deductions")
-
-	doj_map = get_employee_doj_map()
-
-	data = []
-	for ss in salary_slips:
-		row = {
-			"salary_slip_id": ss.name,
-			"employee": ss.employee,
-			"employee_name": ss.employee_name,
-			"data_of_joining": doj_map.get(ss.employee),
-			"branch": ss.branch,
-			"department": ss.department,
-			"designation": ss.designation,
-			"company": ss.company,
-			"start_date": ss.start_date,
-			"end_date": ss.end_date,
-			"leave_without_pay": ss.leave_without_pay,
-			"payment_days": ss.payment_days,
-			"currency": currency or company_currency,
-			"total_loan_repayment": ss.total_loan_repayment,
-		}
 
-		update_column_width(ss, columns)
+def get_salary_register_rows(
+	filters, columns, earning_types, ded_types, currency, company_currency
+):
+	"""Yields rows of the register, processing salary slips in chunks to keep memory bounded"""
+	for salary_slips in get_salary_slip_chunks(filters, company_currency):
+		ss_earning_map = get_salary_slip_details(salary_slips, currency, company_currency, "earnings")
+		ss_ded_map = get_salary_slip_details(salary_slips, currency, company_currency, "deductions")
+
+		for ss in salary_slips:
+			row = {
+				"salary_slip_id": ss.name,
+				"employee": ss.employee,
+				"employee_name": ss.employee_name,
+				"data_of_joining": ss.date_of_joining,
+				"branch": ss.branch,
+				"department": ss.department,
+				"designation": ss.designation,
+				"company": ss.company,
+				"start_date": ss.start_date,
+				"end_date": ss.end_date,
+				"leave_without_pay": ss.leave_without_pay,
+				"payment_days": ss.payment_days,
+				"currency": currency or company_currency,
+				"total_loan_repayment": ss.total_loan_repayment,
+			}
 
-		for e in earning_types:
-			row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
+			update_column_width(ss, columns)
 
-		for d in ded_types:
-			row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
+			for e in earning_types:
+				row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
 
-		if currency == company_currency:
-			row.update(
-				{
-					"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
-					"total_deduction": flt(ss.total_deduction) * flt(ss.exchange_rate),
-					"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
-				}
-			)
+			for d in ded_types:
+				row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
 
-		else:
-			row.update(
-				{"gross_pay": ss.gross_pay, "total_deduction": ss.total_deduction, "net_pay": ss.net_pay}
-			)
+			if currency == company_currency:
+				row.update(
+					{
+						"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
+						"total_deduction": flt(ss.total_deduction) * flt(ss.exchange_rate),
+						"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
+					}
+				)
 
-		data.append(row)
+			else:
+				row.update(
+					{"gross_pay": ss.gross_pay, "total_deduction": ss.total_deduction, "net_pay": ss.net_pay}
+				)
 
-	return columns, data
+			yield row
 
 
-def get_earning_and_deduction_types(salary_slips):
-	salary_component_and_type = {_("Earning"): [], _("Deduction"): []}
+def get_earning_and_deduction_types(filters, company_currency):
+	salary_component_and_type = {"Earning": [], "Deduction": []}
 
-	for salary_compoent in get_salary_components(salary_slips):
-		component_type = get_salary_component_type(salary_compoent)
-		salary_component_and_type[_(component_type)].append(salary_compoent)
+	components = get_salary_components(filters, company_currency)
+	if components:
+		for component in frappe.get_all(
+			"Salary Component", filters={"name": ("in", components)}, fields=["name", "type"]
+		):
+			salary_component_and_type.setdefault(component.type, []).append(component.name)
 
-	return sorted(salary_component_and_type[_("Earning")]), sorted(
-		salary_component_and_type[_("Deduction")]
+	return sorted(salary_component_and_type["Earning"]), sorted(
+		salary_component_and_type["Deduction"]
 	)
 
 
@@ -252,23 +264,79 @@ def get_columns(earning_types, ded_types):
 	return columns
 
 
-def get_salary_components(salary_slips):
-	return (
-		frappe.qb.from_(salary_detail)
-		.where((salary_detail.amount != 0) & (salary_detail.parent.isin([d.name for d in salary_slips])))
+def get_salary_components(filters, company_currency):
+	query = (
+		frappe.qb.from_(salary_slip)
+		.join(salary_detail)
+		.on(salary_slip.name == salary_detail.parent)
+		.where(salary_detail.amount != 0)
 		.select(salary_detail.salary_component)
 		.distinct()
-	).run(pluck=True)
+	)
+
+	return apply_filters(query, filters, company_currency).run(pluck=True)
 
 
-def get_salary_component_type(salary_component):
-	return frappe.db.get_value("Salary Component", salary_component, "type", cache=True)
+def get_salary_slip_chunks(filters, company_currency):
+	"""Yields salary slips in chunks paginated by name"""
+	last_salary_slip = None
+	while True:
+		salary_slips = get_salary_slips(
+			filters, company_currency, after=last_salary_slip, limit=SALARY_REGISTER_CHUNK_SIZE
+		)
+		if not salary_slips:
+			break
 
+		yield salary_slips
 
-def get_salary_slips(filters, company_currency):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
+		if len(salary_slips) < SALARY_REGISTER_CHUNK_SIZE:
+			break
+		last_salary_slip = salary_slips[-1].name
+
+
+def get_salary_slips(filters, company_currency, after=None, limit=None):
+	employee = frappe.qb.DocType("Employee")
 
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
+	query = (
+		frappe.qb.from_(salary_slip)
+		.left_join(employee)
+		.on(employee.name == salary_slip.employee)
+		.select(
+			salary_slip.name,
+			salary_slip.employee,
+			salary_slip.employee_name,
+			employee.date_of_joining,
+			salary_slip.branch,
+			salary_slip.department,
+			salary_slip.designation,
+			salary_slip.company,
+			salary_slip.start_date,
+			salary_slip.end_date,
+			salary_slip.leave_without_pay,
+			salary_slip.payment_days,
+			salary_slip.total_loan_repayment,
+			salary_slip.gross_pay,
+			salary_slip.total_deduction,
+			salary_slip.net_pay,
+			salary_slip.exchange_rate,
+		)
+		.orderby(salary_slip.name)
+	)
+	query = apply_filters(query, filters, company_currency)
+
+	if after:
+		query = query.where(salary_slip.name > after)
+
+	if limit:
+		query = query.limit(limit)
+
+	salary_slips = query.run(as_dict=1)
+
+	return salary_slips or []
+
+
+def apply_filters(query, filters, company_currency):
+	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
 
 	if filters.get("docstatus"):
 		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
@@ -288,17 +356,7 @@ def get_salary_slips(filters, company_currency):
 	if filters.get("currency") and filters.get("currency") != company_currency:
 		query = query.where(salary_slip.currency == filters.get("currency"))
 
-	salary_slips = query.run(as_dict=1)
-
-	return salary_slips or []
-
-
-def get_employee_doj_map():
-	employee = frappe.qb.DocType("Employee")
-
-	result = (frappe.qb.from_(employee).select(employee.name, employee.date_of_joining)).run()
-
-	return frappe._dict(result)
+	return query
 
 
 def get_salary_slip_details(salary_slips, currency, company_currency, component_type):
@@ -329,3 +387,112 @@ def get_salary_slip_details(salary_slips, currency, company_currency, component_
 			ss_map[d.parent][d.salary_component] += flt(d.amount)
 
 	return ss_map
+
+
+@frappe.whitelist()
+def export_salary_register(filters, file_format="CSV"):
+	"""Exports the register to a CSV or XLSX file in a background job.
+	The file is private to the user and its URL is sent to the user once ready."""
+	if not frappe.get_doc("Report", "Salary Register").is_permitted():
+		frappe.throw(_("Not permitted to export Salary Register"), frappe.PermissionError)
+
+	if file_format not in ("CSV", "XLSX"):
+		frappe.throw(_("File format should be CSV or XLSX"))
+
+	filters = frappe.parse_json(filters)
+	if not filters.get("company"):
+		frappe.throw(_("Company is mandatory"))
+
+	frappe.enqueue(
+		make_salary_register_file,
+		queue="long",
+		timeout=3600,
+		filters=filters,
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+	frappe.msgprint(
+		_("Salary Register export has been queued. You will be notified once the file is ready."),
+		alert=True,
+	)
+
+
+def make_salary_register_file(filters, file_format, user):
+	file_name = "salary_register_{0}.{1}".format(frappe.generate_hash(length=8), file_format.lower())
+	write_salary_register(filters, frappe.get_site_path("private", "files", file_name), file_format)
+
+	# not attached to any document, so only the user who exported it can read it
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+			"owner": user,
+		}
+	).insert(ignore_permissions=True)
+
+	frappe.publish_realtime("salary_register_export", {"file_url": file.file_url}, user=user)
+
+
+def delete_expired_salary_register_exports():
+	"""Deletes exported salary register files older than `SALARY_REGISTER_EXPORT_EXPIRY_DAYS`"""
+	File = frappe.qb.DocType("File")
+	files = (
+		frappe.qb.from_(File)
+		.select(File.name)
+		.where(
+			(File.file_name.like("salary_register_%"))
+			& (File.is_private == 1)
+			& (File.attached_to_doctype.isnull())
+			& (File.creation < add_days(now_datetime(), -SALARY_REGISTER_EXPORT_EXPIRY_DAYS))
+		)
+	).run(pluck=True)
+
+	for file in files:
+		frappe.delete_doc("File", file, ignore_permissions=True)
+
+
+def write_salary_register(filters, file_path, file_format="CSV"):
+	"""Writes the register to a CSV or XLSX file chunk by chunk, without holding all rows in memory"""
+	filters = frappe._dict(filters)
+	currency = filters.get("currency")
+	company_currency = erpnext.get_company_currency(filters.get("company"))
+
+	earning_types, ded_types = get_earning_and_deduction_types(filters, company_currency)
+	columns = get_columns(earning_types, ded_types)
+	export_columns = [column for column in columns if not column.get("hidden")]
+
+	header = [column["label"] for column in export_columns]
+	rows = (
+		[row.get(column["fieldname"]) for column in export_columns]
+		for row in get_salary_register_rows(
+			filters, columns, earning_types, ded_types, currency, company_currency
+		)
+	)
+
+	if file_format == "XLSX":
+		write_xlsx(file_path, header, rows)
+	else:
+		write_csv(file_path, header, rows)
+
+
+def write_csv(file_path, header, rows):
+	with open(file_path, "w", newline="", encoding="utf-8") as f:
+		writer = csv.writer(f)
+		writer.writerow(header)
+		for row in rows:
+			writer.writerow(row)
+
+
+def write_xlsx(file_path, header, rows):
+	from openpyxl import Workbook
+
+	# rows of a write-only workbook are streamed to the file
+	workbook = Workbook(write_only=True)
+	worksheet = workbook.create_sheet(_("Salary Register"))
+	worksheet.append(header)
+	for row in rows:
+		worksheet.append(row)
+
+	workbook.save(file_path)
@@ -0,0 +1,54 @@
+import csv
+import os
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.payroll.doctype.salary_slip.test_salary_slip import make_employee_salary_slip
+from hrms.payroll.report.salary_register import salary_register
+
+
+class TestSalaryRegister(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Salary Slip")
+
+		self.salary_slips = []
+		for i in range(3):
+			user = f"test_salary_register_{i}@example.com"
+			make_employee(user, company="_Test Company")
+			self.salary_slips.append(
+				make_employee_salary_slip(user, "Monthly", "Salary Structure Test Salary Register")
+			)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_write_salary_register_in_chunks(self):
+		file_path = frappe.get_site_path("private", "files", "test_salary_register.csv")
+		self.addCleanup(os.remove, file_path)
+
+		# 3 salary slips are written in 2 chunks
+		with patch.object(salary_register, "SALARY_REGISTER_CHUNK_SIZE", 2):
+			salary_register.write_salary_register({"company": "_Test Company"}, file_path)
+
+		with open(file_path, newline="", encoding="utf-8") as f:
+			header, *rows = list(csv.reader(f))
+
+		self.assertEqual(len(rows), 3)
+		rows = {row[0]: dict(zip(header, row)) for row in rows}
+
+		for salary_slip in self.salary_slips:
+			row = rows[salary_slip.name]
+			self.assertEqual(flt(row["Gross Pay"]), flt(salary_slip.gross_pay))
+
+			# components are pivoted into a column each
+			amounts = {}
+			for detail in salary_slip.earnings + salary_slip.deductions:
+				amounts[detail.salary_component] = amounts.get(detail.salary_component, 0) + detail.amount
+
+			for component, amount in amounts.items():
+				self.assertEqual(flt(row[component]), flt(amount))
@@ -1,4 +1,28 @@
-# import frappe
+import ast
+import unicodedata
+from datetime import date
+from functools import lru_cache
+
+from RestrictedPython import compile_restricted_eval
+
+from frappe.utils import ceil, floor, getdate
+from frappe.utils.safe_exec import UNSAFE_ATTRIBUTES, WHITELISTED_SAFE_EVAL_GLOBALS, FrappeTransformer
+
+# maximum number of compiled condition and formula code objects kept per process
+COMPILED_EXPRESSION_CACHE_SIZE = 1024
+
+# globals available to salary component conditions and formulas,
+# copy before passing to `frappe.safe_eval` as it updates the globals in place
+FORMULA_GLOBALS = {
+	"int": int,
+	"float": float,
+	"long": int,
+	"round": round,
+	"date": date,
+	"getdate": getdate,
+	"ceil": ceil,
+	"floor": floor,
+}
 
 
 def sanitize_expression(string: str | None = None) -> str | None:
@@ -24,3 +48,49 @@ def sanitize_expression(string: str | None = None) -> str | None:
 	string = " ".join(parts)
 
 	return string
+
+
+@lru_cache(maxsize=COMPILED_EXPRESSION_CACHE_SIZE)
+def get_compiled_expression(expression: str):
+	"""
+	Compiles a sanitized condition or formula expression with the same restrictions as `frappe.safe_eval`.
+
+	Compiled code depends only on the expression, so the most recently used expressions
+	are cached per process and an edited formula is simply compiled again.
+
+	Raises:
+	    SyntaxError: If the expression is not valid python or uses a blocked operation.
+	"""
+	code = unicodedata.normalize("NFKC", expression)
+	validate_expression_syntax(code)
+	return compile_restricted_eval(code, filename="<safe_eval>", policy=FrappeTransformer).code
+
+
+def validate_expression_syntax(code: str) -> None:
+	"""Blocks the operations and attributes `frappe.safe_eval` does not allow in an expression"""
+	for node in ast.walk(ast.parse(code, mode="eval")):
+		if isinstance(node, ast.NamedExpr):
+			raise SyntaxError(f"Operation not allowed: line {node.lineno} column {node.col_offset}")
+
+		if isinstance(node, ast.Attribute) and node.attr in UNSAFE_ATTRIBUTES:
+			raise SyntaxError(f"Illegal rule {node.attr}. Cannot use {node.attr}")
+
+
+def safe_eval_compiled(code, eval_globals: dict | None = None, eval_locals: dict | None = None):
+	"""Evaluates code compiled by `get_compiled_expression` with the globals `frappe.safe_eval` allows"""
+	eval_globals = dict(eval_globals or {})
+	eval_globals["__builtins__"] = {}
+	eval_globals.update(WHITELISTED_SAFE_EVAL_GLOBALS)
+
+	return eval(code, eval_globals, eval_locals)  # nosemgrep
+
+
+def get_referenced_names(code) -> set[str]:
+	"""Returns names of variables referenced by code compiled by `get_compiled_expression`,
+	including those referenced within comprehensions"""
+	names = set(code.co_names)
+	for const in code.co_consts:
+		if hasattr(const, "co_names"):
+			names |= get_referenced_names(const)
+
+	return names
@@ -1,7 +1,8 @@
 import requests
 
 import frappe
-from frappe.utils import add_days, date_diff
+from frappe.model.naming import parse_naming_series
+from frappe.utils import add_days, cint, date_diff
 
 country_info = {}
 
@@ -48,3 +49,29 @@ def get_employee_email(employee_id: str) -> str | None:
 		or employee_emails.company_email
 		or employee_emails.personal_email
 	)
+
+
+def get_names_from_series(series: str, count: int, doc=None) -> list[str]:
+	"""Returns `count` consecutive names for a naming series like `HR-ATT-.YYYY.-.#####`,
+	reserving all of them with a single update to the series counter. Used for bulk inserts"""
+	if "#" not in series:
+		series += ".#####"
+
+	prefix, hashes = series.rsplit(".", 1)
+	prefix = parse_naming_series(prefix, doc=doc)
+
+	Series = frappe.qb.DocType("Series")
+	current = (
+		frappe.qb.from_(Series).select(Series.current).where(Series.name == prefix).for_update()
+	).run()
+
+	if current:
+		current = cint(current[0][0])
+		(
+			frappe.qb.update(Series).set(Series.current, current + count).where(Series.name == prefix)
+		).run()
+	else:
+		current = 0
+		frappe.qb.into(Series).insert(prefix, count).run()
+
+	return [prefix + str(current + idx).zfill(len(hashes)) for idx in range(1, count + 1)]
@@ -1,17 +1,158 @@
+from bisect import bisect_left, bisect_right
+from datetime import date as Date
+
 import frappe
+from frappe.utils import getdate
+
+HOLIDAY_CALENDAR_CACHE_KEY = "holiday_calendar"
+
+
+class HolidayCalendar:
+	"""Holidays of a Holiday List stored as a day bitmap per year for membership checks and
+	sorted date ordinals for counting and enumerating holidays in a date range"""
+
+	def __init__(self, holidays: list):
+		self.bitmaps = {}
+		self.weekly_off_bitmaps = {}
+		self.descriptions = {}
+
+		weekly_offs = set()
+		non_weekly = set()
+		for holiday in holidays:
+			ordinal = getdate(holiday.holiday_date).toordinal()
+			if holiday.weekly_off:
+				weekly_offs.add(ordinal)
+			else:
+				non_weekly.add(ordinal)
+
+			# prefer the description of a non-weekly holiday if the date is repeated
+			if ordinal not in self.descriptions or not holiday.weekly_off:
+				self.descriptions[ordinal] = holiday.description
+
+		# a date is a weekly off only if none of its entries is a regular holiday
+		weekly_offs -= non_weekly
+		self.ordinals = sorted(weekly_offs | non_weekly)
+		self.non_weekly_ordinals = sorted(non_weekly)
+
+		for ordinal in self.ordinals:
+			year, offset = self.get_year_and_offset(ordinal)
+			self.bitmaps[year] = self.bitmaps.get(year, 0) | (1 << offset)
+			if ordinal in weekly_offs:
+				self.weekly_off_bitmaps[year] = self.weekly_off_bitmaps.get(year, 0) | (1 << offset)
+
+	@staticmethod
+	def get_year_and_offset(ordinal: int) -> tuple[int, int]:
+		year = Date.fromordinal(ordinal).year
+		return year, ordinal - Date(year, 1, 1).toordinal()
+
+	def is_holiday(self, date, only_non_weekly: bool = False) -> bool:
+		year, offset = self.get_year_and_offset(getdate(date).toordinal())
+		bitmap = self.bitmaps.get(year, 0)
+		if only_non_weekly:
+			bitmap &= ~self.weekly_off_bitmaps.get(year, 0)
+
+		return bool(bitmap >> offset & 1)
+
+	def is_weekly_off(self, date) -> bool:
+		year, offset = self.get_year_and_offset(getdate(date).toordinal())
+		return bool(self.weekly_off_bitmaps.get(year, 0) >> offset & 1)
+
+	def get_bounds(
+		self, start_date, end_date, only_non_weekly: bool = False
+	) -> tuple[list, int, int]:
+		ordinals = self.non_weekly_ordinals if only_non_weekly else self.ordinals
+		start = bisect_left(ordinals, getdate(start_date).toordinal())
+		end = bisect_right(ordinals, getdate(end_date).toordinal())
+		return ordinals, start, end
+
+	def get_range(self, start_date, end_date, only_non_weekly: bool = False) -> list:
+		ordinals, start, end = self.get_bounds(start_date, end_date, only_non_weekly)
+		return ordinals[start:end]
+
+	def count(self, start_date, end_date, only_non_weekly: bool = False) -> int:
+		ordinals, start, end = self.get_bounds(start_date, end_date, only_non_weekly)
+		return max(end - start, 0)
+
+	def get_holiday_dates(self, start_date, end_date, only_non_weekly: bool = False) -> list:
+		return [
+			Date.fromordinal(ordinal)
+			for ordinal in self.get_range(start_date, end_date, only_non_weekly)
+		]
+
+	def get_holidays(self, start_date, end_date, only_non_weekly: bool = False) -> list:
+		"""Returns holidays with `holiday_date`, `description` and `weekly_off` between the dates"""
+		return [
+			frappe._dict(
+				holiday_date=Date.fromordinal(ordinal),
+				description=self.descriptions.get(ordinal),
+				weekly_off=self.is_weekly_off(Date.fromordinal(ordinal)),
+			)
+			for ordinal in self.get_range(start_date, end_date, only_non_weekly)
+		]
+
+
+def get_holiday_calendar(holiday_list: str) -> HolidayCalendar:
+	return get_holiday_calendars([holiday_list])[holiday_list]
+
+
+def get_holiday_calendars(holiday_lists: list) -> dict:
+	"""Returns the cached calendar of each holiday list, building the missing ones in a single query"""
+	calendars = {}
+	missing = []
+	for holiday_list in set(holiday_lists):
+		if not holiday_list:
+			continue
+
+		calendar = frappe.cache.hget(HOLIDAY_CALENDAR_CACHE_KEY, holiday_list)
+		if calendar is None:
+			missing.append(holiday_list)
+		else:
+			calendars[holiday_list] = calendar
+
+	if missing:
+		Holiday = frappe.qb.DocType("Holiday")
+		holidays = (
+			frappe.qb.from_(Holiday)
+			.select(Holiday.parent, Holiday.holiday_date, Holiday.description, Holiday.weekly_off)
+			.where(Holiday.parent.isin(missing))
+		).run(as_dict=True)
+
+		holidays_by_list = {holiday_list: [] for holiday_list in missing}
+		for holiday in holidays:
+			holidays_by_list[holiday.parent].append(holiday)
+
+		for holiday_list, holidays in holidays_by_list.items():
+			calendars[holiday_list] = HolidayCalendar(holidays)
+			frappe.cache.hset(HOLIDAY_CALENDAR_CACHE_KEY, holiday_list, calendars[holiday_list])
+
+	return calendars
+
+
+def is_holiday(holiday_list: str, date=None, only_non_weekly: bool = False) -> bool:
+	"""Returns True if the date (defaults to today) is a holiday in the holiday list"""
+	if not holiday_list:
+		return False
+
+	return get_holiday_calendar(holiday_list).is_holiday(date or getdate(), only_non_weekly)
 
 
 def get_holiday_dates_between(holiday_list: str, start_date: str, end_date: str) -> list:
-	Holiday = frappe.qb.DocType("Holiday")
-	return (
-		frappe.qb.from_(Holiday)
-		.select(Holiday.holiday_date)
-		.where((Holiday.parent == holiday_list) & (Holiday.holiday_date.between(start_date, end_date)))
-		.orderby(Holiday.holiday_date)
-	).run(pluck=True)
+	if not holiday_list:
+		return []
 
+	return get_holiday_calendar(holiday_list).get_holiday_dates(start_date, end_date)
 
-def invalidate_cache(doc, method=None):
-	from hrms.payroll.doctype.salary_slip.salary_slip import HOLIDAYS_BETWEEN_DATES
 
-	frappe.cache.delete_value(HOLIDAYS_BETWEEN_DATES)
+def get_holidays_by_holiday_list(
+	holiday_lists: list, start_date, end_date, only_non_weekly: bool = False
+) -> dict:
+	"""Returns holidays with `holiday_date` and `description` between the dates by holiday list"""
+	return {
+		holiday_list: holidays
+		for holiday_list, calendar in get_holiday_calendars(holiday_lists).items()
+		if (holidays := calendar.get_holidays(start_date, end_date, only_non_weekly))
+	}
+
+
+def invalidate_cache(doc, method=None):
+	frappe.cache.hdel(HOLIDAY_CALENDAR_CACHE_KEY, doc.name)